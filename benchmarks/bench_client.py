@@ -0,0 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from smartpm.endpoints.activity import Activity
+from smartpm.endpoints.projects import Projects
+from smartpm.endpoints.scenarios import Scenarios
+
+def bench_get_projects(benchmark, client):
+    """Round trip of a small response through SmartPMClient."""
+    result = benchmark(Projects(client).get_projects)
+    assert len(result) == 20
+
+def bench_get_scenario_details(benchmark, client, ids):
+    """Round trip of a single object response."""
+    benchmark(Scenarios(client).get_scenario_details, *ids)
+
+def bench_get_activities(benchmark, client, ids):
+    """Round trip of a 2k activity response, including decoding."""
+    result = benchmark(Activity(client).get_activities, *ids)
+    assert len(result) == 2000
+
+def bench_concurrent_requests(benchmark, client, portfolio):
+    """Throughput of 40 scenario detail requests from 8 threads sharing the client's connection pool."""
+    scenarios = [(project_id, scenario_id) for project_id in portfolio.project_ids() for scenario_id in portfolio.scenario_ids(project_id)]
+    scenarios_api = Scenarios(client)
+
+    def run():
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            return list(executor.map(lambda ids: scenarios_api.get_scenario_details(*ids), scenarios))
+
+    result = benchmark(run)
+    assert len(result) == len(scenarios)
@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+PACKAGE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../'))
+
+def import_in_subprocess(module):
+    # A fresh interpreter each round, so nothing is already imported
+    subprocess.run([sys.executable, '-c', f'import {module}'], cwd=PACKAGE_ROOT, check=True)
+
+def bench_import_interpreter(benchmark):
+    """Start-up of a bare interpreter, the baseline of the import benchmarks."""
+    benchmark.pedantic(subprocess.run, args=([sys.executable, '-c', 'pass'],), kwargs={'check': True}, rounds=10, iterations=1)
+
+def bench_import_endpoints(benchmark):
+    """Cold import of the client and an endpoint, which must not pull in pandas or matplotlib."""
+    benchmark.pedantic(import_in_subprocess, args=('smartpm.endpoints.activity',), rounds=10, iterations=1)
+
+def bench_import_visuals(benchmark):
+    """Cold import of the plotting module with numpy, pandas and matplotlib."""
+    benchmark.pedantic(import_in_subprocess, args=('smartpm.visuals',), rounds=5, iterations=1)
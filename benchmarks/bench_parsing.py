@@ -0,0 +1,6 @@
+import json
+
+def bench_decode_activities(benchmark, activity_payload):
+    """JSON decode of an activities response with 1k, 10k and 100k activities."""
+    result = benchmark.pedantic(json.loads, args=(activity_payload,), rounds=5, iterations=1, warmup_rounds=1)
+    assert result[0]['activityId'] == 'A000000'
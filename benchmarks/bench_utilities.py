@@ -0,0 +1,40 @@
+import matplotlib.pyplot as plt
+
+from smartpm.endpoints.activity import Activity
+from smartpm.endpoints.projects import Projects
+
+def bench_count_activities_by_completion(benchmark, client, ids):
+    result = benchmark(Activity(client).count_activities_by_completion, *ids)
+    assert result['complete'] + result['incomplete'] == 2000
+
+def bench_get_baseline_activities_by_month(benchmark, client, ids, portfolio):
+    start = portfolio.project_start(ids[0])
+    benchmark(Activity(client).get_baseline_activities_by_month, *ids, True, start.month, start.year)
+
+def bench_get_current_activities_by_month(benchmark, client, ids, portfolio):
+    start = portfolio.project_start(ids[0])
+    benchmark(Activity(client).get_current_activities_by_month, *ids, True, start.month, start.year)
+
+def bench_get_extreme_date(benchmark, client, ids):
+    benchmark(Activity(client).get_extreme_date, *ids, use_actual=False, find_latest=True)
+
+def bench_get_extreme_baseline_date(benchmark, client, ids):
+    benchmark(Activity(client).get_extreme_baseline_date, *ids, find_latest=True)
+
+def bench_diff_data_dates(benchmark, client, ids, portfolio):
+    dates = [date.isoformat() for date in portfolio.data_dates(ids[0])]
+    result = benchmark(Activity(client).diff_data_dates, *ids, dates[0], dates[-1])
+    assert len(result['changed']) > 0
+
+def bench_plot_activity_distribution(benchmark, client, ids):
+    def run():
+        try:
+            return Activity(client).plot_activity_distribution(*ids)
+        finally:
+            plt.close('all')
+
+    benchmark.pedantic(run, rounds=3, iterations=1)
+
+def bench_get_projects_dataframe(benchmark, client):
+    result = benchmark(Projects(client).get_projects_dataframe)
+    assert len(result) == 20
@@ -0,0 +1,21 @@
+import pytest
+
+from smartpm import visuals
+from smartpm.visuals import render_to_bytes
+
+# Each plotting function with the portfolio responses it draws
+PLOTS = {
+    'plot_percent_complete_curve': lambda portfolio, ids: (portfolio.percent_complete_curve(*ids),),
+    'plot_earned_schedule_curve': lambda portfolio, ids: (portfolio.earned_schedule_curve(*ids),),
+    'plot_schedule_delay': lambda portfolio, ids: (portfolio.delay_table(*ids),),
+    'plot_schedule_changes': lambda portfolio, ids: (portfolio.changes_summary(*ids),),
+    'plot_activity_distribution_by_month': lambda portfolio, ids: (portfolio.activities(*ids), portfolio.scenario_details(*ids)),
+    'plot_gantt': lambda portfolio, ids: (portfolio.activities(*ids), portfolio.scenario_details(*ids)),
+}
+
+@pytest.mark.parametrize('plot', list(PLOTS))
+def bench_render_png(benchmark, plot, portfolio, ids):
+    """Headless render of each plotting function to PNG."""
+    args = PLOTS[plot](portfolio, ids)
+    image = benchmark.pedantic(render_to_bytes, args=(getattr(visuals, plot),) + args, rounds=5, iterations=1, warmup_rounds=1)
+    assert image.startswith(b'\x89PNG')
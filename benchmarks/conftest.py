@@ -0,0 +1,191 @@
+import gc
+import json
+import math
+import os
+import sys
+import logging
+import threading
+import tracemalloc
+import warnings
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import pytest
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    # Without the plugin there is no `benchmark` fixture, skip collecting instead of failing every benchmark
+    warnings.warn("pytest-benchmark is not installed, benchmarks are skipped. Install it with `pip install pytest-benchmark`")
+    collect_ignore_glob = ['bench_*.py']
+
+from smartpm.client import SmartPMClient
+from smartpm.testing.stub_server import StubServer, encode_json
+from smartpm.testing.synthetic import SyntheticPortfolio
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Activity counts of the payload size benchmarks
+PAYLOAD_SIZES = [1000, 10000, 100000]
+
+# Regression that fails a run with --benchmark-compare, unless --benchmark-compare-fail is given
+REGRESSION_THRESHOLD = 'median:25%'
+
+# Activity counts of the memory benchmarks
+MEMORY_SIZES = [1000, 5000, 20000]
+
+# Peak and retained memory limits of the memory benchmarks, written with --memory-update
+MEMORY_THRESHOLDS = os.path.join(os.path.dirname(__file__), 'memory_thresholds.json')
+
+# Margin added to measured values when --memory-update writes new thresholds
+MEMORY_HEADROOM = 1.25
+
+# Portfolio served by the stub for client and utility benchmarks
+PORTFOLIO = dict(projects=20, scenarios=2, activities=2000, uploads=12, seed=42)
+
+def pytest_addoption(parser):
+    parser.addoption('--memory-update', action='store_true', help='Write the measured memory use as the new thresholds in memory_thresholds.json')
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Runs before pytest-benchmark reads its options
+    if 'collect_ignore_glob' in globals():
+        return
+    from pytest_benchmark.utils import parse_compare_fail
+    if config.getoption('benchmark_compare') and not config.getoption('benchmark_compare_fail'):
+        config.option.benchmark_compare_fail = [parse_compare_fail(REGRESSION_THRESHOLD)]
+
+@pytest.fixture(scope='session', autouse=True)
+def headless():
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+@pytest.fixture(scope='session')
+def portfolio():
+    return SyntheticPortfolio(**PORTFOLIO)
+
+@pytest.fixture(scope='session')
+def stub(portfolio):
+    with StubServer(portfolio) as server:
+        yield server
+
+@pytest.fixture
+def client(stub):
+    return SmartPMClient('benchmark-key', 'benchmark-company', base_url=stub.base_url)
+
+@pytest.fixture(scope='session')
+def ids(portfolio):
+    """Project and default scenario ID of the first project."""
+    project_id = portfolio.project_ids()[0]
+    return project_id, portfolio.scenario_ids(project_id)[0]
+
+@pytest.fixture(scope='session', params=PAYLOAD_SIZES, ids=lambda size: f'{size // 1000}k')
+def activity_payload(request):
+    """Encoded activities response with 1k, 10k and 100k activities."""
+    portfolio = SyntheticPortfolio(projects=1, activities=request.param, seed=42)
+    project_id = portfolio.project_ids()[0]
+    return encode_json(portfolio.activities(project_id, portfolio.scenario_ids(project_id)[0]))
+
+class _RSSSampler(threading.Thread):
+    """Sample the resident set size from /proc while a measured call runs, None where /proc is not available."""
+    def __init__(self, interval=0.005):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = self.start_rss = self._read()
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def _read():
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            rss = self._read()
+            if rss is not None:
+                self.peak = max(self.peak, rss)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        return None if self.start_rss is None else self.peak - self.start_rss
+
+def measure_memory(func, *args, **kwargs):
+    """
+    Measure the Python memory a call allocates.
+
+    Returns
+    -------
+    dict
+        `peak_mb` allocated at once during the call, `result_mb` still held by the returned value,
+        `retained_mb` still allocated after the result is dropped (leaks, caches, pyplot figures) and
+        `rss_mb` growth of the resident set size, None if it cannot be read
+    """
+    gc.collect()
+    sampler = _RSSSampler()
+    sampler.start()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        result = func(*args, **kwargs)
+        with_result, peak = tracemalloc.get_traced_memory()
+        del result
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+        rss = sampler.stop()
+
+    mb = 1024 * 1024
+    return {
+        'peak_mb': (peak - baseline) / mb,
+        'result_mb': (with_result - retained) / mb,
+        'retained_mb': max(0, retained - baseline) / mb,
+        'rss_mb': None if rss is None else rss / mb,
+    }
+
+@pytest.fixture(scope='session')
+def memory_thresholds(request):
+    """Thresholds by benchmark ID, rewritten from the measurements at the end of the session with --memory-update."""
+    thresholds = {}
+    if os.path.exists(MEMORY_THRESHOLDS):
+        with open(MEMORY_THRESHOLDS) as f:
+            thresholds = json.load(f)
+
+    measured = {}
+    yield thresholds, measured
+
+    if request.config.getoption('memory_update') and measured:
+        for name, usage in measured.items():
+            thresholds[name] = {key: math.ceil(max(usage[key], 1.0) * MEMORY_HEADROOM * 10) / 10 for key in ('peak_mb', 'retained_mb')}
+        with open(MEMORY_THRESHOLDS, 'w') as f:
+            json.dump(dict(sorted(thresholds.items())), f, indent=2)
+            f.write('\n')
+
+@pytest.fixture
+def memory(request, memory_thresholds):
+    """
+    Measure a call with `measure_memory` and fail if its peak or retained memory exceeds the threshold of the benchmark.
+    Benchmarks without a threshold only report their measurements.
+    """
+    thresholds, measured = memory_thresholds
+
+    def check(func, *args, **kwargs):
+        usage = measure_memory(func, *args, **kwargs)
+        name = request.node.name
+        measured[name] = usage
+        logger.info("%s: peak %.1f MB, result %.1f MB, retained %.1f MB, RSS %s MB", name, usage['peak_mb'], usage['result_mb'],
+                    usage['retained_mb'], 'n/a' if usage['rss_mb'] is None else '%.1f' % usage['rss_mb'])
+        limits = thresholds.get(name)
+        if limits and not request.config.getoption('memory_update'):
+            for key, limit in limits.items():
+                assert usage[key] <= limit, f"{name} {key} is {usage[key]:.1f} MB, over the threshold of {limit} MB"
+        return usage
+
+    return check
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from conftest import MEMORY_SIZES
+from smartpm.client import SmartPMClient
+from smartpm.endpoints.activity import Activity
+from smartpm.endpoints.projects import Projects
+from smartpm.endpoints.scenarios import Scenarios
+from smartpm.testing.stub_server import StubServer, encode_json
+from smartpm.testing.synthetic import SyntheticPortfolio
+
+# Endpoint methods and utilities measured at each size, called with the client, the portfolio and the first scenario
+CALLS = {
+    'get_activities': lambda client, portfolio, ids: Activity(client).get_activities(*ids),
+    'get_scenario_details': lambda client, portfolio, ids: Scenarios(client).get_scenario_details(*ids),
+    'get_percent_complete_curve': lambda client, portfolio, ids: Scenarios(client).get_percent_complete_curve(*ids),
+    'get_projects_dataframe': lambda client, portfolio, ids: Projects(client).get_projects_dataframe(),
+    'count_activities_by_completion': lambda client, portfolio, ids: Activity(client).count_activities_by_completion(*ids),
+    'get_current_activities_by_month': lambda client, portfolio, ids: Activity(client).get_current_activities_by_month(
+        *ids, True, portfolio.project_start(ids[0]).month, portfolio.project_start(ids[0]).year),
+    'get_baseline_activities_by_month': lambda client, portfolio, ids: Activity(client).get_baseline_activities_by_month(
+        *ids, True, portfolio.project_start(ids[0]).month, portfolio.project_start(ids[0]).year),
+    'get_extreme_date': lambda client, portfolio, ids: Activity(client).get_extreme_date(*ids, use_actual=False, find_latest=True),
+    'diff_data_dates': lambda client, portfolio, ids: Activity(client).diff_data_dates(
+        *ids, portfolio.data_dates(ids[0])[0].isoformat(), portfolio.data_dates(ids[0])[-1].isoformat()),
+    'plot_activity_distribution': lambda client, portfolio, ids: Activity(client).plot_activity_distribution(*ids),
+}
+
+@pytest.fixture(scope='module', params=MEMORY_SIZES, ids=lambda size: f'{size // 1000}k')
+def sized(request):
+    """Client, portfolio and first scenario of a stub serving one project with 1k, 5k or 20k activities."""
+    portfolio = SyntheticPortfolio(projects=5, scenarios=1, activities=request.param, uploads=6, seed=42)
+    project_id = portfolio.project_ids()[0]
+    ids = (project_id, portfolio.scenario_ids(project_id)[0])
+    with StubServer(portfolio) as server:
+        client = SmartPMClient('memory-key', 'memory-company', base_url=server.base_url)
+        # Warm up the stub's response cache and the lazy imports, so neither is counted
+        import smartpm.visuals  # noqa: F401
+        for call in ('get_activities', 'get_scenario_details', 'get_percent_complete_curve', 'get_projects_dataframe', 'diff_data_dates'):
+            CALLS[call](client, portfolio, ids)
+        yield client, portfolio, ids
+
+def bench_decode_activities(memory, sized):
+    """Peak memory of decoding an activities response."""
+    _, portfolio, ids = sized
+    payload = encode_json(portfolio.activities(*ids))
+    memory(json.loads, payload)
+
+@pytest.mark.parametrize('call', list(CALLS))
+def bench_call(memory, sized, call):
+    """Peak and retained memory of each endpoint method and utility."""
+    client, portfolio, ids = sized
+    memory(CALLS[call], client, portfolio, ids)
@@ -0,0 +1,99 @@
+"""
+Throughput and tail latency of a portfolio crawl against the stub server under each fault profile.
+
+    python benchmarks/resilience.py
+    python benchmarks/resilience.py --profiles healthy throttled --workers 16 --max-retries 3 --json results.json
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from smartpm.client import SmartPMClient, create_session
+from smartpm.crawl import ResultStore, crawl_portfolio
+from smartpm.metrics import ListSink
+from smartpm.testing.faults import PROFILES
+from smartpm.testing.stub_server import StubServer
+from smartpm.testing.synthetic import SyntheticPortfolio
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list of values, None if it is empty."""
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))]
+
+def run_profile(name, portfolio, endpoints, workers, max_retries, backoff_factor):
+    """
+    Crawl the portfolio through a stub server that injects the faults of a profile.
+
+    Returns
+    -------
+    dict
+        Task counts, wall time, throughput, retries and p50/p95/p99 call latency in seconds
+    """
+    sink = ListSink()
+    with StubServer(portfolio, faults=PROFILES[name]()) as server, tempfile.TemporaryDirectory() as root:
+        client = SmartPMClient('resilience-key', 'resilience-company', base_url=server.base_url,
+                               session=create_session(pool_maxsize=workers), max_retries=max_retries,
+                               backoff_factor=backoff_factor, timeout=30)
+        client.add_event_sink(sink)
+
+        start = time.perf_counter()
+        summary = crawl_portfolio(client, ResultStore(root), endpoints=endpoints, max_workers=workers)
+        elapsed = time.perf_counter() - start
+
+    durations = [event.duration for event in sink.events]
+    return {
+        'profile': name,
+        'completed': summary['completed'],
+        'failed': len(summary['failed']),
+        'seconds': elapsed,
+        'tasks_per_second': summary['completed'] / elapsed,
+        'calls': len(sink.events),
+        'retries': sum(event.retries for event in sink.events),
+        'p50': percentile(durations, 0.50),
+        'p95': percentile(durations, 0.95),
+        'p99': percentile(durations, 0.99),
+    }
+
+def _ms(seconds):
+    return f"{seconds * 1000:>9.1f}" if seconds is not None else f"{'-':>9}"
+
+def print_report(results):
+    print(f"{'profile':<12}{'done':>7}{'failed':>8}{'seconds':>9}{'tasks/s':>9}{'retries':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for r in results:
+        print(f"{r['profile']:<12}{r['completed']:>7}{r['failed']:>8}{r['seconds']:>9.2f}{r['tasks_per_second']:>9.1f}"
+              f"{r['retries']:>9}{_ms(r['p50'])}{_ms(r['p95'])}{_ms(r['p99'])}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure crawl throughput and tail latency under injected faults')
+    parser.add_argument('--profiles', nargs='+', choices=sorted(PROFILES), default=list(PROFILES))
+    parser.add_argument('--projects', type=int, default=10)
+    parser.add_argument('--activities', type=int, default=1000)
+    parser.add_argument('--endpoints', nargs='+', default=['scenario_details', 'activities', 'delay_table', 'changes_summary'])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--max-retries', type=int, default=5)
+    parser.add_argument('--backoff-factor', type=float, default=0.1)
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    portfolio = SyntheticPortfolio(projects=args.projects, scenarios=2, activities=args.activities, seed=0)
+    results = []
+    for name in args.profiles:
+        print(f"Running profile {name}...", file=sys.stderr)
+        results.append(run_profile(name, portfolio, args.endpoints, args.workers, args.max_retries, args.backoff_factor))
+    print_report(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
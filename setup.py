@@ -7,6 +7,12 @@ setup(
     install_requires=[
         'requests',
     ],
+    extras_require={
+        'pandas': ['numpy', 'pandas'],
+        'plot': ['numpy', 'pandas', 'matplotlib'],
+        'telemetry': ['opentelemetry-api'],
+        'all': ['numpy', 'pandas', 'matplotlib', 'opentelemetry-api'],
+    },
     author='Hagen Fritz',
     author_email='hfritz@r-o.com',
     description='A Python SDK for interacting with the SmartPM API',
@@ -0,0 +1,87 @@
+import collections
+import hashlib
+import threading
+import time
+
+def cache_key(api_key, company_id, endpoint, params=None):
+    """
+    Key of a cached GET response. Responses differ per company and API key, so both are part of the key,
+    the API key as a hash so it is not kept in memory or in logs in the clear.
+
+    Parameters
+    ----------
+    api_key : str
+        API key the request was made with
+    company_id : str
+        ID of the company the request was made for
+    endpoint : str
+        Endpoint path relative to the base URL
+    params : dict, default None
+        Query parameters, None values are left out as they are not sent
+
+    Returns
+    -------
+    str
+    """
+    query = '&'.join(f'{name}={value}' for name, value in sorted((params or {}).items()) if value is not None)
+    key_hash = hashlib.sha256(str(api_key).encode()).hexdigest()[:16]
+    return f'{key_hash}:{company_id}:{endpoint}?{query}'
+
+class MemoryCache:
+    """
+    Thread-safe in-memory cache of response bodies, shared by the clients of a `smartpm.manager.ClientManager`.
+
+    Entries expire `ttl` seconds after they were stored, and the least recently used ones are evicted when the
+    bodies take more than `max_bytes`. Other backends, e.g. one backed by Redis, only need the same `get` and `set`.
+
+    Parameters
+    ----------
+    max_bytes : int, default 64 MiB
+        Most bytes of response bodies kept
+    ttl : float, default 300
+        Seconds an entry is served for. If None, entries only leave the cache when evicted
+    """
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=300):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached body, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[1] > self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, content):
+        """Store a body and evict the least recently used entries if the cache is over its size limit."""
+        if len(content) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (content, time.monotonic())
+            self.size += len(content)
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        content, _ = self._entries.pop(key)
+        self.size -= len(content)
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
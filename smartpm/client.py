@@ -1,39 +1,242 @@
+import email.utils
+import threading
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
 from smartpm.exceptions import SmartPMError, AuthenticationError, NotFoundError, RateLimitExceededError, BadRequestError, NoCommentsFoundError
+from smartpm.logging_config import logger
+from smartpm.metrics import RequestEvent, emit
+from smartpm.cache import cache_key
+from smartpm.transport import build_response, transport_from_env
+
+# Status codes that are worth retrying when retries are enabled
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Errors that are worth retrying, a ChunkedEncodingError means the connection dropped while reading the body
+RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError)
+
+# Longest wait between retries in seconds, even if the server asks for more with Retry-After
+MAX_RETRY_WAIT = 60.0
+
+# Seconds spent opening connections by the current thread, read by the client after each request
+_connect_time = threading.local()
+
+class _TimedConnectMixin:
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_time.seconds = getattr(_connect_time, 'seconds', 0.0) + time.perf_counter() - start
+
+class _TimedHTTPConnection(_TimedConnectMixin, HTTPConnection):
+    pass
+
+class _TimedHTTPSConnection(_TimedConnectMixin, HTTPSConnection):
+    pass
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+class TimingAdapter(HTTPAdapter):
+    """HTTP adapter that records how long opening new connections takes, so it can be split from the time to first byte."""
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _TimedHTTPConnectionPool, 'https': _TimedHTTPSConnectionPool}
+
+def create_session(pool_maxsize=10):
+    """
+    Create a session with connection pooling and connection timing.
+
+    Parameters
+    ----------
+    pool_maxsize : int, default 10
+        Number of connections kept open per host, raise it when many threads share the session
+
+    Returns
+    -------
+    requests.Session
+    """
+    session = requests.Session()
+    adapter = TimingAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def _retry_after(response):
+    # Retry-After is either a number of seconds or an HTTP date
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
 
 class SmartPMClient:
     BASE_URL = 'https://live.smartpmtech.com/public'
 
-    def __init__(self, api_key, company_id):
+    def __init__(self, api_key, company_id, base_url=None, session=None, max_retries=0, backoff_factor=0.5, timeout=None, transport=None,
+                 scheduler=None, cache=None):
+        """
+        Parameters
+        ----------
+        api_key : str
+            SmartPM API key
+        company_id : str
+            ID of the company to make requests for
+        base_url : str, default None
+            Root URL of the API, e.g. the `base_url` of `smartpm.testing.stub_server.StubServer`. If None, uses `BASE_URL`
+        session : requests.Session, default None
+            Session to make requests with, see `create_session`. If None, a new session is created
+        max_retries : int, default 0
+            Number of times a request is retried after a connection error, a truncated body or a 429/5xx response
+        backoff_factor : float, default 0.5
+            Retries wait `backoff_factor * 2 ** attempt` seconds, unless the response has a Retry-After header
+        timeout : float, default None
+            Seconds to wait for the server to respond. If None, waits indefinitely
+        transport : smartpm.transport.Transport, default None
+            Sends the requests, e.g. a `RecordingTransport` or `ReplayTransport`. If None, picked by
+            `smartpm.transport.transport_from_env`, which sends over `session` unless recording or replay is configured
+        scheduler : smartpm.scheduler.RequestScheduler, default None
+            Rate limits the requests and sends them in order of priority, and can be shared by several clients.
+            If None, requests are sent right away
+        cache : smartpm.cache.MemoryCache, default None
+            Cache of GET responses, keyed by company and API key, and can be shared by several clients. If None, nothing is cached
+        """
         self.api_key = api_key
         self.company_id = company_id
         self.headers = {
             'X-API-KEY': self.api_key,
             'X-COMPANY-ID': self.company_id
         }
+        self.base_url = (base_url or self.BASE_URL).rstrip('/')
+        self.session = session or create_session()
+        self.transport = transport or transport_from_env(self.session)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.scheduler = scheduler
+        self.cache = cache
+        self.event_sinks = []
+
+    def add_event_sink(self, sink):
+        """
+        Send an event for every HTTP call to a sink.
+
+        Parameters
+        ----------
+        sink : callable
+            Called with a `smartpm.metrics.RequestEvent` after each call, e.g. `smartpm.metrics.HistogramSink`
+
+        Returns
+        -------
+        callable
+            The sink, so it can be passed to `remove_event_sink` later
+        """
+        self.event_sinks.append(sink)
+        return sink
+
+    def remove_event_sink(self, sink):
+        """Stop sending events to a sink."""
+        self.event_sinks.remove(sink)
+
+    def _request(self, method, endpoint, params=None, data=None):
+        url = f'{self.base_url}/{endpoint}'
+        event = RequestEvent(method, endpoint, params)
+        start = time.perf_counter()
+        attempt = 0
+        key = cache_key(self.api_key, self.company_id, endpoint, params) if self.cache is not None and method == 'GET' else None
+        try:
+            if key is not None:
+                content = self.cache.get(key)
+                if content is not None:
+                    event.cache_hit = True
+                    event.status = 200
+                    event.response_bytes = len(content)
+                    return build_response(method, url, 200, {'Content-Type': 'application/json'}, content, params=params)
+            if self.scheduler is not None:
+                event.priority = self.scheduler.resolve()
+            while True:
+                response = status = None
+                if self.scheduler is not None:
+                    event.queue_wait += self.scheduler.acquire(event.priority)
+                _connect_time.seconds = 0.0
+                sent = time.perf_counter()
+                try:
+                    response = self.transport.send(method, url, headers=self.headers, params=params, data=data, timeout=self.timeout)
+                    headers_received = time.perf_counter()
+                    content = response.content
+                    received = time.perf_counter()
+                    self.transport.received(method, url, response, received - sent, headers=self.headers, params=params, data=data)
+                except RETRY_EXCEPTIONS:
+                    if attempt >= self.max_retries:
+                        raise
+                else:
+                    event.status = response.status_code
+                    event.connect = _connect_time.seconds
+                    event.ttfb = headers_received - sent - event.connect
+                    event.download = received - headers_received
+                    event.response_bytes = len(content)
+                    status = response.status_code
+                    if status not in RETRY_STATUSES:
+                        break
+
+                wait = _retry_after(response)
+                if wait is None:
+                    wait = self.backoff_factor * 2 ** attempt
+                wait = min(wait, MAX_RETRY_WAIT)
+                paused = self.scheduler is not None and status == 429
+                if paused:
+                    # The rate limit is shared, so hold back the other queued requests too, also when this one
+                    # is not retried. A retry waits in the queue
+                    self.scheduler.pause(wait)
+                if status is not None and attempt >= self.max_retries:
+                    break
+
+                attempt += 1
+                event.retries = attempt
+                logger.debug("Retrying %s %s in %.2fs (attempt %s of %s)", method, endpoint, wait, attempt, self.max_retries)
+                if not paused:
+                    time.sleep(wait)
+
+            self._handle_response(response)
+            if key is not None:
+                self.cache.set(key, content)
+            return response
+        except Exception as e:
+            event.error = type(e).__name__
+            raise
+        finally:
+            event.duration = time.perf_counter() - start
+            if self.event_sinks:
+                emit(self.event_sinks, event)
 
     def _get(self, endpoint, params=None):
-        url = f'{self.BASE_URL}/{endpoint}'
-        response = requests.get(url, headers=self.headers, params=params)
-        self._handle_response(response)
+        response = self._request('GET', endpoint, params=params)
         return response.json()
 
     def _post(self, endpoint, data=None):
-        url = f'{self.BASE_URL}/{endpoint}'
-        response = requests.post(url, headers=self.headers, json=data)
-        self._handle_response(response)
+        response = self._request('POST', endpoint, data=data)
         return response.json()
 
     def _put(self, endpoint, data=None):
-        url = f'{self.BASE_URL}/{endpoint}'
-        response = requests.put(url, headers=self.headers, json=data)
-        self._handle_response(response)
+        response = self._request('PUT', endpoint, data=data)
         return response.json()
 
     def _delete(self, endpoint):
-        url = f'{self.BASE_URL}/{endpoint}'
-        response = requests.delete(url, headers=self.headers)
-        self._handle_response(response)
+        response = self._request('DELETE', endpoint)
         return response.status_code == 204
 
     def _handle_response(self, response):
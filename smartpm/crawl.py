@@ -0,0 +1,358 @@
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from smartpm.client import SmartPMClient
+from smartpm.logging_config import logger
+from smartpm.scheduler import BATCH, request_priority
+from smartpm.endpoints.activity import Activity
+from smartpm.endpoints.changes import Changes
+from smartpm.endpoints.delay import Delay
+from smartpm.endpoints.projects import Projects
+from smartpm.endpoints.scenarios import Scenarios
+from smartpm.endpoints.schedule import Schedule
+from smartpm.endpoints.uploads import Uploads
+from smartpm.workqueue import WorkQueue, default_worker_id
+
+# Scenario-level endpoints that can be crawled, keyed by the name used in journals and result stores
+CRAWL_ENDPOINTS = {
+    'scenario_details': lambda client, project_id, scenario_id: Scenarios(client).get_scenario_details(project_id, scenario_id),
+    'activities': lambda client, project_id, scenario_id: Activity(client).get_activities(project_id, scenario_id),
+    'percent_complete_curve': lambda client, project_id, scenario_id: Scenarios(client).get_percent_complete_curve(project_id, scenario_id),
+    'earned_schedule_curve': lambda client, project_id, scenario_id: Scenarios(client).get_earned_schedule_curve(project_id, scenario_id),
+    'delay_table': lambda client, project_id, scenario_id: Delay(client).get_delay_table(project_id, scenario_id),
+    'changes_summary': lambda client, project_id, scenario_id: Changes(client).get_changes_summary(project_id, scenario_id),
+    'schedule_quality': lambda client, project_id, scenario_id: Schedule(client).get_schedule_quality(project_id, scenario_id),
+    'schedule_uploads': lambda client, project_id, scenario_id: Uploads(client).get_schedule_uploads(project_id, scenario_id),
+}
+
+# Project-level task that lists the scenarios of a project
+SCENARIOS_ENDPOINT = 'scenarios'
+
+# Portfolio-level task that lists the projects
+PROJECTS_ENDPOINT = 'projects'
+
+class ResultStore:
+    """
+    On-disk store of crawl results, one JSON file per (project, scenario, endpoint).
+
+    Files are laid out as `<root>/<project_id>/<scenario_id>/<endpoint>.json`, with project-level
+    results stored under `<root>/<project_id>/<endpoint>.json` and portfolio-level results, such as the
+    project list, under `<root>/<endpoint>.json`. Writes replace the file atomically.
+    """
+    def __init__(self, root):
+        self.root = root
+
+    def result_path(self, project_id, scenario_id, endpoint):
+        """Path of the result file for a task."""
+        parts = [self.root]
+        if project_id is not None:
+            parts.append(str(project_id))
+        if scenario_id is not None:
+            parts.append(str(scenario_id))
+        return os.path.join(*parts, f'{endpoint}.json')
+
+    def has_result(self, project_id, scenario_id, endpoint):
+        """Return True if a result has been stored for the task."""
+        return os.path.exists(self.result_path(project_id, scenario_id, endpoint))
+
+    def write_result(self, project_id, scenario_id, endpoint, data):
+        """
+        Store the response of a task.
+
+        Parameters
+        ----------
+        project_id : str or None
+            ID of the project, None for portfolio-level tasks
+        scenario_id : str or None
+            ID of the scenario, None for project-level tasks
+        endpoint : str
+            Name of the endpoint that was fetched
+        data : dict or list
+            Response JSON
+
+        Returns
+        -------
+        str
+            Path to the stored result
+        """
+        path = self.result_path(project_id, scenario_id, endpoint)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return path
+
+    def read_result(self, project_id, scenario_id, endpoint):
+        """Read the stored response of a task."""
+        with open(self.result_path(project_id, scenario_id, endpoint), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+def _list_projects(client, store, journal):
+    # Checkpointed like the scenario lists, so a restart goes straight to the unfinished tasks
+    if journal is not None and journal.is_done(None, None, PROJECTS_ENDPOINT) and store.has_result(None, None, PROJECTS_ENDPOINT):
+        return store.read_result(None, None, PROJECTS_ENDPOINT)
+
+    projects = Projects(client).get_projects()
+    store.write_result(None, None, PROJECTS_ENDPOINT, projects)
+    if journal is not None:
+        journal.mark_done(None, None, PROJECTS_ENDPOINT)
+
+    return projects
+
+def _list_scenarios(client, project_id, store, journal):
+    # The scenario list is checkpointed like any other task so a restart does not refetch it
+    if journal is not None and journal.is_done(project_id, None, SCENARIOS_ENDPOINT) \
+            and store.has_result(project_id, None, SCENARIOS_ENDPOINT):
+        return store.read_result(project_id, None, SCENARIOS_ENDPOINT)
+
+    scenarios = Scenarios(client).get_scenarios(project_id)
+    store.write_result(project_id, None, SCENARIOS_ENDPOINT, scenarios)
+    if journal is not None:
+        journal.mark_done(project_id, None, SCENARIOS_ENDPOINT)
+
+    return scenarios
+
+def crawl_portfolio(client, store, journal=None, endpoints=None, project_ids=None, default_scenario_only=False, max_workers=4,
+                    priority=BATCH):
+    """
+    Fetch scenario-level endpoints for every scenario in the portfolio and store the responses.
+    With a journal, every completed task is checkpointed and a restarted crawl skips work that already finished.
+
+    Parameters
+    ----------
+    client : SmartPMClient
+        Client used to make the requests
+    store : ResultStore
+        Store to write the responses to
+    journal : smartpm.journal.CrawlJournal, default None
+        Journal of completed tasks. If None, every task is fetched
+    endpoints : list of str, default None
+        Names of the endpoints to crawl, see `CRAWL_ENDPOINTS`. If None, crawls all of them
+    project_ids : list of str, default None
+        Projects to crawl. If None, crawls every project returned by `get_projects`
+    default_scenario_only : bool, default False
+        If True, only crawl the default scenario of each project
+    max_workers : int, default 4
+        Number of tasks to fetch concurrently
+    priority : str, default 'batch'
+        Priority class of the requests when the client has a `smartpm.scheduler.RequestScheduler`
+
+    Returns
+    -------
+    summary : dict
+        `completed` and `skipped` task counts and the list of `failed` (project_id, scenario_id, endpoint, error) tuples
+    """
+    endpoints = endpoints or list(CRAWL_ENDPOINTS)
+    unknown = set(endpoints) - set(CRAWL_ENDPOINTS)
+    if unknown:
+        raise ValueError(f"Unknown crawl endpoints: {sorted(unknown)}")
+
+    with request_priority(priority):
+        if project_ids is None:
+            projects = _list_projects(client, store, journal)
+            project_ids = [project['id'] for project in projects]
+            default_scenarios = {project['id']: project.get('defaultScenarioId') for project in projects}
+        else:
+            default_scenarios = {}
+
+        tasks = []
+        skipped = 0
+        for project_id in project_ids:
+            if default_scenario_only and default_scenarios.get(project_id):
+                scenario_ids = [default_scenarios[project_id]]
+            else:
+                scenarios = _list_scenarios(client, project_id, store, journal)
+                scenario_ids = [scenario['id'] for scenario in scenarios]
+                if default_scenario_only and scenario_ids:
+                    # The default scenario is not necessarily listed first
+                    scenario_ids = [scenario['id'] for scenario in scenarios if scenario.get('isDefault')] \
+                        or [Projects(client).get_project(project_id)['defaultScenarioId']]
+
+            for scenario_id in scenario_ids:
+                for endpoint in endpoints:
+                    if journal is not None and journal.is_done(project_id, scenario_id, endpoint):
+                        skipped += 1
+                    else:
+                        tasks.append((project_id, scenario_id, endpoint))
+
+    logger.info("Crawling %s tasks, %s already completed", len(tasks), skipped)
+
+    def run_task(task):
+        project_id, scenario_id, endpoint = task
+        with request_priority(priority):
+            data = CRAWL_ENDPOINTS[endpoint](client, project_id, scenario_id)
+        store.write_result(project_id, scenario_id, endpoint, data)
+        if journal is not None:
+            journal.mark_done(project_id, scenario_id, endpoint)
+
+    completed = 0
+    failed = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run_task, task): task for task in tasks}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                completed += 1
+            except Exception as e:
+                # Failed tasks are not journaled, so the next run retries them
+                logger.warning("Task %s failed: %s", futures[future], e)
+                failed.append(futures[future] + (str(e),))
+
+    return {
+        'completed': completed,
+        'skipped': skipped,
+        'failed': failed
+    }
+
+def seed_work_queue(client, queue, store, endpoints=None, project_ids=None):
+    """
+    Add a task to the work queue for every scenario endpoint in the portfolio.
+    Tasks that are already queued are left as they are, so seeding again only adds new scenarios.
+
+    Parameters
+    ----------
+    client : SmartPMClient
+        Client used to list projects and scenarios
+    queue : smartpm.workqueue.WorkQueue
+        Queue to add the tasks to
+    store : ResultStore
+        Store the scenario lists are written to
+    endpoints : list of str, default None
+        Names of the endpoints to crawl, see `CRAWL_ENDPOINTS`. If None, crawls all of them
+    project_ids : list of str, default None
+        Projects to crawl. If None, crawls every project returned by `get_projects`
+
+    Returns
+    -------
+    int
+        Number of tasks added
+    """
+    endpoints = endpoints or list(CRAWL_ENDPOINTS)
+    unknown = set(endpoints) - set(CRAWL_ENDPOINTS)
+    if unknown:
+        raise ValueError(f"Unknown crawl endpoints: {sorted(unknown)}")
+
+    if project_ids is None:
+        project_ids = [project['id'] for project in Projects(client).get_projects()]
+
+    tasks = []
+    for project_id in project_ids:
+        scenarios = _list_scenarios(client, project_id, store, journal=None)
+        tasks.extend((project_id, scenario['id'], endpoint) for scenario in scenarios for endpoint in endpoints)
+
+    return queue.enqueue(tasks)
+
+def run_crawl_worker(client, queue, store, worker_id=None, process=None, poll_interval=1.0, wait=False):
+    """
+    Lease tasks from the work queue, fetch them and write the responses to the result store
+    until the queue is drained.
+
+    The response is written before the task is completed. If the lease expired in the meantime and another
+    worker fetched the same task, both write the same result file and only one of them completes the task.
+
+    Parameters
+    ----------
+    client : SmartPMClient
+        Client used to make the requests
+    queue : smartpm.workqueue.WorkQueue
+        Queue to lease tasks from
+    store : ResultStore
+        Store shared by all workers
+    worker_id : str, default None
+        ID of this worker. If None, one is generated from the host name and process ID
+    process : callable, default None
+        Called as `process(project_id, scenario_id, endpoint, data)` and the return value is stored instead of the raw response
+    poll_interval : float, default 1.0
+        Seconds to wait before polling again while other workers hold leases
+    wait : bool, default False
+        If True, keep polling while tasks are leased by other workers, so tasks whose lease expires are picked up
+
+    Returns
+    -------
+    stats : dict
+        Number of tasks `completed` and `failed` by this worker
+    """
+    worker_id = worker_id or default_worker_id()
+    stats = {'completed': 0, 'failed': 0}
+
+    while True:
+        task = queue.lease(worker_id)
+        if task is None:
+            counts = queue.counts()
+            if wait and counts['leased']:
+                time.sleep(poll_interval)
+                continue
+            break
+
+        project_id, scenario_id, endpoint = task['project_id'], task['scenario_id'], task['endpoint']
+        try:
+            data = CRAWL_ENDPOINTS[endpoint](client, project_id, scenario_id)
+            if process is not None:
+                data = process(project_id, scenario_id, endpoint, data)
+            store.write_result(project_id, scenario_id, endpoint, data)
+        except Exception as e:
+            logger.warning("Worker %s failed task %s (%s) on attempt %s: %s", worker_id, task['id'], endpoint, task['attempts'], e)
+            queue.fail(task['id'], worker_id, e)
+            stats['failed'] += 1
+            continue
+
+        if queue.complete(task['id'], worker_id):
+            stats['completed'] += 1
+        else:
+            logger.debug("Worker %s lost the lease on task %s", worker_id, task['id'])
+
+    logger.info("Worker %s finished: %s", worker_id, stats)
+    return stats
+
+def _crawl_worker_main(client_kwargs, queue_path, store_root, lease_seconds, max_attempts, process):
+    client = SmartPMClient(**client_kwargs)
+    queue = WorkQueue(queue_path, lease_seconds=lease_seconds, max_attempts=max_attempts)
+    return run_crawl_worker(client, queue, ResultStore(store_root), process=process, wait=True)
+
+def crawl_with_workers(client_kwargs, queue_path, store_root, workers=4, lease_seconds=300, max_attempts=3, process=None):
+    """
+    Drain a seeded work queue with a pool of worker processes.
+    More workers on other machines can run `run_crawl_worker` against the same queue and store at the same time.
+
+    Parameters
+    ----------
+    client_kwargs : dict
+        Arguments used to create a `SmartPMClient` in each worker, e.g. `{'api_key': ..., 'company_id': ...}`
+    queue_path : str
+        Path to the SQLite work queue, see `seed_work_queue`
+    store_root : str
+        Root directory of the shared `ResultStore`
+    workers : int, default 4
+        Number of worker processes
+    lease_seconds : float, default 300
+        Seconds before a leased task is handed to another worker
+    max_attempts : int, default 3
+        Number of times a task is tried before it is marked as failed
+    process : callable, default None
+        Module-level function applied to each response in the workers, see `run_crawl_worker`
+
+    Returns
+    -------
+    summary : dict
+        Task counts by status in the queue once the workers are done
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_crawl_worker_main, client_kwargs, queue_path, store_root, lease_seconds, max_attempts, process)
+            for _ in range(workers)
+        ]
+        for future in as_completed(futures):
+            future.result()
+
+    return WorkQueue(queue_path).counts()
@@ -0,0 +1,293 @@
+import hashlib
+import html
+import json
+import os
+import tempfile
+
+from smartpm.logging_config import logger
+from smartpm.rendering import render_batch
+
+# Charts on each project page: (chart name, plot from `smartpm.rendering.PLOTS`, endpoints passed to the plot, title)
+DASHBOARD_CHARTS = [
+    ('percent_complete', 'percent_complete_curve', ('percent_complete_curve',), 'Progress Curve'),
+    ('earned_schedule', 'earned_schedule_curve', ('earned_schedule_curve',), 'Earned Schedule'),
+    ('schedule_delay', 'schedule_delay', ('delay_table',), 'Schedule Delay'),
+    ('schedule_changes', 'schedule_changes', ('changes_summary',), 'Schedule Changes'),
+    ('activity_distribution', 'activity_distribution', ('activities', 'scenario_details'), 'Activity Distribution'),
+]
+
+MANIFEST_FILE = 'manifest.json'
+
+STYLE = """
+body { font-family: sans-serif; margin: 2em; color: #222; }
+table { border-collapse: collapse; }
+th, td { border-bottom: 1px solid #ddd; padding: 0.4em 0.8em; text-align: left; }
+th { background: #f4f4f4; }
+td.number { text-align: right; }
+img { max-width: 100%; margin-bottom: 2em; }
+"""
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>{style}</style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+def load_portfolio(store, projects):
+    """
+    Collect the crawled responses of the default scenario of each project.
+
+    Parameters
+    ----------
+    store : smartpm.crawl.ResultStore
+        Store the portfolio was crawled into
+    projects : list of dict
+        Projects as returned by `get_projects`
+
+    Returns
+    -------
+    portfolio : list of dict
+        One entry per project with the `project`, its `scenario_id` and the `data` of each crawled endpoint
+    """
+    endpoints = sorted({endpoint for _, _, chart_endpoints, _ in DASHBOARD_CHARTS for endpoint in chart_endpoints})
+
+    portfolio = []
+    for project in projects:
+        scenario_id = project.get('defaultScenarioId')
+        data = {}
+        if scenario_id is not None:
+            for endpoint in endpoints:
+                if store.has_result(project['id'], scenario_id, endpoint):
+                    data[endpoint] = store.read_result(project['id'], scenario_id, endpoint)
+        portfolio.append({'project': project, 'scenario_id': scenario_id, 'data': data})
+
+    return portfolio
+
+def data_hash(entry):
+    """Hash the project and the responses of a portfolio entry, which is what decides if its page is rebuilt."""
+    payload = json.dumps([entry['project'], entry.get('scenario_id'), entry['data']], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def project_summary(entry):
+    """
+    Summarize a portfolio entry into the values shown in the index table.
+
+    Parameters
+    ----------
+    entry : dict
+        Portfolio entry, see `load_portfolio`
+
+    Returns
+    -------
+    dict
+        `dataDate`, latest `actualPercentComplete` and `plannedPercentComplete`, latest cumulative
+        `endDateVariance` and the number of `activities`. Values that are not available are None
+    """
+    data = entry['data']
+    summary = {
+        'dataDate': (data.get('scenario_details') or {}).get('dataDate'),
+        'actualPercentComplete': None,
+        'plannedPercentComplete': None,
+        'endDateVariance': None,
+        'activities': len(data['activities']) if data.get('activities') is not None else None,
+    }
+
+    curve = (data.get('percent_complete_curve') or {}).get('data') or []
+    actuals = [point['ACTUAL'] for point in curve if point.get('ACTUAL') is not None]
+    planned = [point['PLANNED'] for point in curve if point.get('PLANNED') is not None]
+    if actuals:
+        summary['actualPercentComplete'] = actuals[-1]
+    if planned:
+        summary['plannedPercentComplete'] = planned[-1]
+
+    delay_table = data.get('delay_table') or []
+    if delay_table:
+        summary['endDateVariance'] = delay_table[-1]['endDateVariance']['cumulative']
+
+    return summary
+
+def _write_text(path, text):
+    # Pages are replaced atomically so a browser never sees a half-written file
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _remove_if_exists(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def _remove_charts(output_dir, project_id, keep=()):
+    # Charts of a project other than the `<chart>.<extension>` names in `keep`
+    for chart, _, _, _ in DASHBOARD_CHARTS:
+        for extension in ('png', 'svg'):
+            if f'{chart}.{extension}' not in keep:
+                _remove_if_exists(os.path.join(output_dir, 'charts', f'{project_id}-{chart}.{extension}'))
+
+def _format_value(value, suffix=''):
+    if value is None:
+        return '&ndash;'
+    if isinstance(value, float):
+        return f'{value:,.1f}{suffix}'
+    return f'{html.escape(str(value))}{suffix}'
+
+def _project_page(entry, charts, fmt):
+    project = entry['project']
+    summary = project_summary(entry)
+    name = html.escape(str(project.get('name', project['id'])))
+
+    body = [f'<p><a href="../index.html">&larr; Portfolio</a></p>', f'<h1>{name}</h1>']
+    body.append(f'<p>Data date: {_format_value(summary["dataDate"])}</p>')
+    for chart, title in charts:
+        body.append(f'<h2>{html.escape(title)}</h2>')
+        body.append(f'<img src="../charts/{html.escape(str(project["id"]))}-{chart}.{fmt}" alt="{html.escape(title)}">')
+    if not charts:
+        body.append('<p>No data has been crawled for this project.</p>')
+
+    return PAGE.format(title=name, style=STYLE, body='\n'.join(body))
+
+def _index_page(portfolio):
+    rows = []
+    for entry in sorted(portfolio, key=lambda entry: str(entry['project'].get('name', ''))):
+        project = entry['project']
+        summary = project_summary(entry)
+        rows.append(
+            '<tr>'
+            f'<td><a href="projects/{html.escape(str(project["id"]))}.html">{html.escape(str(project.get("name", project["id"])))}</a></td>'
+            f'<td>{_format_value(summary["dataDate"])}</td>'
+            f'<td class="number">{_format_value(summary["actualPercentComplete"], "%")}</td>'
+            f'<td class="number">{_format_value(summary["plannedPercentComplete"], "%")}</td>'
+            f'<td class="number">{_format_value(summary["endDateVariance"])}</td>'
+            f'<td class="number">{_format_value(summary["activities"])}</td>'
+            '</tr>'
+        )
+
+    body = (
+        '<h1>Portfolio</h1>\n<table>\n'
+        '<tr><th>Project</th><th>Data Date</th><th>Actual % Complete</th><th>Planned % Complete</th>'
+        '<th>End Date Variance (days)</th><th>Activities</th></tr>\n'
+        + '\n'.join(rows)
+        + '\n</table>'
+    )
+    return PAGE.format(title='Portfolio', style=STYLE, body=body)
+
+def build_dashboard(portfolio, output_dir, fmt='png', dpi=100, max_workers=None, use_threads=False, cache=None, force=False):
+    """
+    Write a static HTML dashboard with a page of pre-rendered charts per project and a portfolio index table.
+
+    The dashboard has no external dependencies and can be opened from disk or served as static files.
+    A manifest of data hashes is kept in the output directory, and only the projects whose data changed since
+    the last build are rendered again. The charts of all changed projects are rendered in one parallel batch.
+    Charts of changed projects are removed before they are rendered again, so a chart whose data is gone does
+    not linger, and the pages and charts of projects no longer in the portfolio are removed.
+
+    Parameters
+    ----------
+    portfolio : list of dict
+        One entry per project with the `project` (from `get_projects`), its `scenario_id` and the `data`
+        of each endpoint, keyed by the names in `smartpm.crawl.CRAWL_ENDPOINTS`. See `load_portfolio`
+    output_dir : str
+        Directory to write the dashboard to, created if needed
+    fmt : str, default 'png'
+        Image format of the charts, `png` or `svg`
+    dpi : int, default 100
+        Resolution of raster charts
+    max_workers : int, default None
+        Number of render workers. If None, uses the executor's default
+    use_threads : bool, default False
+        If True, render in a thread pool instead of a process pool
+    cache : smartpm.render_cache.RenderCache, default None
+        Cache of rendered images shared with other renders
+    force : bool, default False
+        If True, rebuild every project page
+
+    Returns
+    -------
+    summary : dict
+        Lists of `built`, `skipped` and `removed` project IDs and the `failed` projects mapped to their error
+    """
+    for directory in ('projects', 'charts'):
+        os.makedirs(os.path.join(output_dir, directory), exist_ok=True)
+
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    manifest = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    changed = []
+    skipped = []
+    for entry in portfolio:
+        project_id = str(entry['project']['id'])
+        digest = data_hash(entry)
+        page_path = os.path.join(output_dir, 'projects', f'{project_id}.html')
+        if manifest.get(project_id) == digest and os.path.exists(page_path):
+            skipped.append(project_id)
+        else:
+            changed.append((entry, digest))
+
+    logger.info("Building dashboard for %s changed projects, %s unchanged", len(changed), len(skipped))
+
+    current = {str(entry['project']['id']) for entry in portfolio}
+    removed = sorted(project_id for project_id in manifest if project_id not in current)
+    for project_id in removed:
+        manifest.pop(project_id)
+        _remove_if_exists(os.path.join(output_dir, 'projects', f'{project_id}.html'))
+        _remove_charts(output_dir, project_id)
+
+    # Render the charts of every changed project in a single batch
+    jobs = []
+    charts = {}
+    for entry, _ in changed:
+        project_id = str(entry['project']['id'])
+        charts[project_id] = []
+        for chart, plot, endpoints, title in DASHBOARD_CHARTS:
+            if all(entry['data'].get(endpoint) for endpoint in endpoints):
+                jobs.append((f'{project_id}-{chart}', plot, tuple(entry['data'][endpoint] for endpoint in endpoints)))
+                charts[project_id].append((chart, title))
+
+    results = render_batch(jobs, os.path.join(output_dir, 'charts'), formats=(fmt,), dpi=dpi, max_workers=max_workers, use_threads=use_threads, cache=cache) if jobs else []
+
+    # Map render failures back to their project, jobs were added in the same order as `charts`
+    failed = {}
+    job_projects = [project_id for project_id in charts for _ in charts[project_id]]
+    for project_id, result in zip(job_projects, results):
+        if result['error'] is not None:
+            failed.setdefault(project_id, result['error'])
+
+    built = []
+    for entry, digest in changed:
+        project_id = str(entry['project']['id'])
+        if project_id in failed:
+            # Not recorded in the manifest, so the next build retries it
+            manifest.pop(project_id, None)
+            continue
+        _write_text(os.path.join(output_dir, 'projects', f'{project_id}.html'), _project_page(entry, charts[project_id], fmt))
+        # Only now that the page links to the new charts, so a failed render leaves the old page and its charts intact
+        _remove_charts(output_dir, project_id, keep=[f'{chart}.{fmt}' for chart, _ in charts[project_id]])
+        manifest[project_id] = digest
+        built.append(project_id)
+
+    _write_text(os.path.join(output_dir, 'index.html'), _index_page(portfolio))
+    _write_text(manifest_path, json.dumps(manifest, indent=2, sort_keys=True))
+
+    return {
+        'built': built,
+        'skipped': skipped,
+        'removed': removed,
+        'failed': failed
+    }
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+from smartpm.logging_config import logger
+
+# Fields compared between two updates and whether they hold dates or numbers
+DIFF_FIELDS = {
+    'startDate': 'date',
+    'finishDate': 'date',
+    'plannedDuration': 'number',
+    'percentComplete': 'number',
+}
+
+def activities_to_frame(activities, fields=None):
+    """
+    Convert a `get_activities` response into a columnar DataFrame indexed by activity ID.
+
+    Parameters
+    ----------
+    activities : list of dict
+        Activities as returned by `get_activities`
+    fields : dict, default None
+        Mapping of field name to `date` or `number`. If None, uses `DIFF_FIELDS`
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame indexed by `activityId` with a `name` column and one typed column per field
+    """
+    fields = fields or DIFF_FIELDS
+
+    # Build each column in a single pass so the typed conversion below runs once per column
+    columns = {
+        'activityId': [entry.get('activityId') for entry in activities],
+        'name': [entry.get('name') for entry in activities],
+    }
+    for field in fields:
+        columns[field] = [entry.get(field) for entry in activities]
+
+    df = pd.DataFrame(columns)
+    for field, kind in fields.items():
+        if kind == 'date':
+            df[field] = pd.to_datetime(df[field], errors='coerce')
+        else:
+            df[field] = pd.to_numeric(df[field], errors='coerce')
+
+    if df['activityId'].duplicated().any():
+        logger.warning("Duplicate activity IDs found, keeping the last occurrence")
+        df = df.drop_duplicates(subset='activityId', keep='last')
+
+    return df.set_index('activityId')
+
+def diff_activities(old_activities, new_activities, fields=None):
+    """
+    Compare two sets of activities for the same scenario.
+
+    Parameters
+    ----------
+    old_activities : list of dict or pd.DataFrame
+        Activities for the earlier data date, either a `get_activities` response or the output of `activities_to_frame`
+    new_activities : list of dict or pd.DataFrame
+        Activities for the later data date, either a `get_activities` response or the output of `activities_to_frame`
+    fields : dict, default None
+        Mapping of field name to `date` or `number`. If None, uses `DIFF_FIELDS`
+
+    Returns
+    -------
+    dict
+        `added` : pd.DataFrame of activities only in the new data date
+        `removed` : pd.DataFrame of activities only in the old data date
+        `changed` : pd.DataFrame of activities where any field changed, with `<field>_old`, `<field>_new` and
+        `<field>_delta` columns. Date deltas are in days.
+    """
+    fields = fields or DIFF_FIELDS
+    old = old_activities if isinstance(old_activities, pd.DataFrame) else activities_to_frame(old_activities, fields)
+    new = new_activities if isinstance(new_activities, pd.DataFrame) else activities_to_frame(new_activities, fields)
+
+    added = new.loc[new.index.difference(old.index, sort=False)]
+    removed = old.loc[old.index.difference(new.index, sort=False)]
+
+    joined = old.join(new, how='inner', lsuffix='_old', rsuffix='_new')
+
+    changed_mask = np.zeros(len(joined), dtype=bool)
+    result = {'name': joined['name_new']}
+    for field, kind in fields.items():
+        old_values = joined[f'{field}_old']
+        new_values = joined[f'{field}_new']
+        if kind == 'date':
+            delta = (new_values - old_values) / pd.Timedelta(days=1)
+        else:
+            delta = new_values - old_values
+
+        # A field changed if the values differ, treating two missing values as equal
+        old_missing = old_values.isna().to_numpy()
+        new_missing = new_values.isna().to_numpy()
+        field_changed = (old_missing != new_missing) | (~old_missing & ~new_missing & (delta.to_numpy() != 0))
+        changed_mask |= field_changed
+
+        result[f'{field}_old'] = old_values
+        result[f'{field}_new'] = new_values
+        result[f'{field}_delta'] = delta
+
+    changed = pd.DataFrame(result)[changed_mask]
+    logger.debug("Diff: %s added, %s removed, %s changed", len(added), len(removed), len(changed))
+
+    return {
+        'added': added,
+        'removed': removed,
+        'changed': changed
+    }
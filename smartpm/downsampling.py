@@ -0,0 +1,136 @@
+import numpy as np
+
+METHODS = ('lttb', 'minmax')
+
+def _as_float(x):
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[s]').astype(np.int64).astype(float)
+    return x.astype(float)
+
+def lttb_indices(x, y, threshold):
+    """
+    Select the points that best preserve the shape of a series with Largest-Triangle-Three-Buckets.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Sorted x values (numbers or datetime64)
+    y : np.ndarray
+        y values, NaN points are never selected
+    threshold : int
+        Number of points to keep
+
+    Returns
+    -------
+    np.ndarray
+        Sorted indices of the selected points
+    """
+    valid = np.flatnonzero(~np.isnan(y))
+    n = len(valid)
+    if threshold >= n or threshold < 3:
+        return valid
+
+    xs = _as_float(x[valid])
+    ys = y[valid]
+
+    # The first and last points are always kept, the rest are split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = xs[end:next_end].mean()
+        avg_y = ys[end:next_end].mean()
+
+        # Pick the point forming the largest triangle with the previous selection and the next bucket's average
+        area = np.abs((xs[a] - avg_x) * (ys[start:end] - ys[a]) - (xs[a] - xs[start:end]) * (avg_y - ys[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return valid[selected]
+
+def minmax_indices(x, y, n_buckets):
+    """
+    Keep the first, last, minimum and maximum point of each bucket of a series.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Sorted x values
+    y : np.ndarray
+        y values, NaN points are never selected
+    n_buckets : int
+        Number of buckets, at most 4 points are kept per bucket
+
+    Returns
+    -------
+    np.ndarray
+        Sorted indices of the selected points
+    """
+    valid = np.flatnonzero(~np.isnan(y))
+    n = len(valid)
+    if n <= 4 * n_buckets:
+        return valid
+
+    ys = y[valid]
+    starts = np.linspace(0, n, n_buckets + 1).astype(np.int64)[:-1]
+    mins = np.minimum.reduceat(ys, starts)
+    maxs = np.maximum.reduceat(ys, starts)
+
+    # Map each point to its bucket and keep the points equal to their bucket's extremes (first one wins)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(np.append(starts, n)))
+    is_min = ys == mins[bucket]
+    is_max = ys == maxs[bucket]
+    first_min = np.flatnonzero(is_min)[np.unique(bucket[is_min], return_index=True)[1]]
+    first_max = np.flatnonzero(is_max)[np.unique(bucket[is_max], return_index=True)[1]]
+    ends = np.append(starts[1:] - 1, n - 1)
+
+    return valid[np.unique(np.concatenate([starts, ends, first_min, first_max]))]
+
+def downsample_series(dates, series, max_points, method='lttb'):
+    """
+    Reduce a set of series sharing the same dates to about `max_points` points in total.
+
+    Each series gets an equal share of `max_points`, and the points selected for every series are merged,
+    so all series keep the same dates and can still be shaded against each other. The number of points drawn
+    therefore depends on `max_points` and not on the number of series. For a plot, use the width of the figure
+    in pixels as `max_points`. A series without any value keeps its first and last point.
+
+    Parameters
+    ----------
+    dates : np.ndarray
+        Sorted dates shared by all series
+    series : dict of np.ndarray
+        y values of each series
+    max_points : int
+        Target number of points of all series together, at least 3 points are kept per series
+    method : str, default 'lttb'
+        `lttb` (Largest-Triangle-Three-Buckets) or `minmax` (first, last, min and max of each bucket)
+
+    Returns
+    -------
+    dates : np.ndarray
+        The selected dates
+    series : dict of np.ndarray
+        Every series at the selected dates
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}', expected one of {METHODS}")
+    if max_points is None or len(dates) <= max_points:
+        return dates, series
+
+    per_series = max(3, max_points // max(1, len(series)))
+    indices = []
+    for values in series.values():
+        if method == 'lttb':
+            selected = lttb_indices(dates, values, per_series)
+        else:
+            selected = minmax_indices(dates, values, max(1, per_series // 4))
+        indices.append(selected if len(selected) else np.array([0, len(dates) - 1]))
+
+    keep = np.unique(np.concatenate(indices)) if indices else np.arange(len(dates))
+    return dates[keep], {key: values[keep] for key, values in series.items()}
@@ -1,10 +1,8 @@
-import pandas as pd
-
 from smartpm.client import SmartPMClient
-from smartpm.visuals import plot_activity_distribution_by_month
 from smartpm.decorators import api_wrapper, utility
 from smartpm.logging_config import logger
 from smartpm.endpoints.scenarios import Scenarios
+from smartpm.tasks import TaskGraph
 
 class Activity:
     def __init__(self, client: SmartPMClient):
@@ -33,7 +31,7 @@ class Activity:
         <response.json> : list of dict
             project scenarios as a JSON object
         """
-        logger.debug(f"Fetching activities for project_id: {project_id} and scenario_id: {scenario_id}")
+        logger.debug("Fetching activities for project_id: %s and scenario_id: %s", project_id, scenario_id)
         params = {}
         if data_date:
             params['dataDate'] = data_date
@@ -63,20 +61,8 @@ class Activity:
             Dictionary with counts of complete and incomplete activities.
         """
         activities = self.get_activities(project_id, scenario_id)
-        
-        complete_count = 0
-        incomplete_count = 0
-
-        for activity in activities:
-            if activity.get('percentComplete', 0) == 100.0:
-                complete_count += 1
-            else:
-                incomplete_count += 1
-
-        return {
-            'complete': complete_count,
-            'incomplete': incomplete_count
-        }
+        from smartpm.preprocessing import completion_counts
+        return completion_counts(activities)
     
     @utility
     def plot_activity_distribution(self, project_id, scenario_id):
@@ -90,15 +76,46 @@ class Activity:
         scenario_id : str
             ID of the scenario to retrieve the percent complete curve for
         """
-        logger.debug(f"Plotting activity distribution for project_id: {project_id}, scenario_id: {scenario_id}")
+        logger.debug("Plotting activity distribution for project_id: %s, scenario_id: %s", project_id, scenario_id)
         scenarios_api = Scenarios(client=self.client)
-        scenario_details = scenarios_api.get_scenario_details(
-            project_id=project_id,
-            scenario_id=scenario_id
-        )
-        activity_data = self.get_activities(project_id, scenario_id)
+        # The two requests are independent, fetch them concurrently
+        graph = TaskGraph()
+        graph.add('scenario_details', scenarios_api.get_scenario_details, project_id=project_id, scenario_id=scenario_id)
+        graph.add('activity_data', self.get_activities, project_id, scenario_id)
+        results = graph.run()
+        scenario_details, activity_data = results['scenario_details'], results['activity_data']
+        from smartpm.visuals import plot_activity_distribution_by_month
         activity_dist = plot_activity_distribution_by_month(activity_data, scenario_details)
         return activity_dist
+
+    @utility
+    def plot_activity_gantt(self, project_id, scenario_id, group_by=None):
+        """
+        Retrieve activities and plots them as a Gantt chart of baseline, current and actual bars
+
+        Parameters
+        ----------
+        project_id : str
+            ID of the project containing the scenario
+        scenario_id : str
+            ID of the scenario to plot the activities of
+        group_by : str or callable, default None
+            Activity key or function of an activity to group rows by, e.g. a WBS code
+
+        Returns
+        -------
+        matplotlib.figure.Figure
+            The plotted figure
+        """
+        logger.debug("Plotting activity Gantt chart for project_id: %s, scenario_id: %s", project_id, scenario_id)
+        scenarios_api = Scenarios(client=self.client)
+        graph = TaskGraph()
+        graph.add('scenario_details', scenarios_api.get_scenario_details, project_id=project_id, scenario_id=scenario_id)
+        graph.add('activity_data', self.get_activities, project_id, scenario_id)
+        results = graph.run()
+        scenario_details, activity_data = results['scenario_details'], results['activity_data']
+        from smartpm.visuals import plot_gantt
+        return plot_gantt(activity_data, scenario_details, group_by=group_by)
     
     @utility
     def get_activity_by_id(self, project_id, scenario_id, activity_id):
@@ -148,6 +165,8 @@ class Activity:
         pd.DataFrame
             DataFrame containing the filtered activities with the specified columns.
         """
+        import pandas as pd
+
         filtered_data = []
 
         activity_data = self.get_activities(project_id, scenario_id)
@@ -194,6 +213,8 @@ class Activity:
         pd.DataFrame
             DataFrame containing the filtered activities with the specified columns.
         """
+        import pandas as pd
+
         filtered_data = []
 
         activities_data = self.get_activities(project_id, scenario_id)
@@ -249,6 +270,8 @@ class Activity:
         extreme_date : str
             The earliest or latest date as a string.
         """
+        import pandas as pd
+
         activities = self.get_activities(project_id, scenario_id)
 
         if find_latest:
@@ -285,6 +308,8 @@ class Activity:
         str
             The earliest or latest baseline date as a string.
         """
+        import pandas as pd
+
         activities = self.get_activities(project_id, scenario_id)
 
         if find_latest:
@@ -299,4 +324,42 @@ class Activity:
         else:
             extreme_date = min(dates, key=lambda date: pd.to_datetime(date))
 
-        return extreme_date
\ No newline at end of file
+        return extreme_date
+
+    @utility
+    def diff_data_dates(self, project_id, scenario_id, old_data_date, new_data_date, store=None):
+        """
+        Compare the activities of a scenario between two data dates.
+
+        Parameters
+        ----------
+        project_id : str
+            ID of the project containing the scenario
+        scenario_id : str
+            ID of the scenario to compare
+        old_data_date : str
+            Earlier data date in format `yyyy-MM-dd`
+        new_data_date : str
+            Later data date in format `yyyy-MM-dd`
+        store : smartpm.snapshots.SnapshotStore, default None
+            If provided, activities are read from stored snapshots when available instead of being fetched
+
+        Returns
+        -------
+        dict
+            `added`, `removed` and `changed` DataFrames, see `smartpm.diff.diff_activities`
+        """
+        logger.debug("Comparing activities for project_id: %s, scenario_id: %s between %s and %s", project_id, scenario_id, old_data_date, new_data_date)
+
+        def load_activities(data_date):
+            if store is not None and store.has_snapshot(project_id, scenario_id, data_date):
+                return store.read_snapshot(project_id, scenario_id, data_date)['activities']
+            return self.get_activities(project_id, scenario_id, data_date=data_date)
+
+        # Loaded one after the other rather than on a TaskGraph: both payloads can be large,
+        # and fetching them together doubles the peak memory of the call
+        old_activities = load_activities(old_data_date)
+        new_activities = load_activities(new_data_date)
+
+        from smartpm.diff import diff_activities
+        return diff_activities(old_activities, new_activities)
@@ -1,6 +1,5 @@
 from smartpm.client import SmartPMClient
 from smartpm.decorators import api_wrapper, utility
-from smartpm.visuals import plot_schedule_changes
 from smartpm.logging_config import logger
 
 class Changes:
@@ -23,7 +22,7 @@ class Changes:
         <response.json> : dict
             Changes summary data as a JSON object
         """
-        logger.debug(f"Fetching changes summary for project_id: {project_id}, scenario_id: {scenario_id}")
+        logger.debug("Fetching changes summary for project_id: %s, scenario_id: %s", project_id, scenario_id)
 
         endpoint = f'v1/projects/{project_id}/scenarios/{scenario_id}/change-log-summary'
         response = self.client._get(endpoint=endpoint)
@@ -43,8 +42,9 @@ class Changes:
         scenario_id : str
             ID of the scenario to retrieve the percent complete curve for
         """
-        logger.debug(f"Plotting changes summary for project_id: {project_id}, scenario_id: {scenario_id}")
+        logger.debug("Plotting changes summary for project_id: %s, scenario_id: %s", project_id, scenario_id)
         curve_data = self.get_changes_summary(project_id, scenario_id)
+        from smartpm.visuals import plot_schedule_changes
         plot_schedule_changes(curve_data)
 
     @api_wrapper
@@ -63,7 +63,7 @@ class Changes:
         <response.json> : dict
             Changes summary data as a JSON object
         """
-        logger.debug(f"Fetching changes details for project_id: {project_id}, scenario_id: {scenario_id}")
+        logger.debug("Fetching changes details for project_id: %s, scenario_id: %s", project_id, scenario_id)
 
         endpoint = f'v1/projects/{project_id}/scenarios/{scenario_id}/change-log'
         response = self.client._get(endpoint=endpoint)
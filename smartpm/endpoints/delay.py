@@ -1,6 +1,5 @@
 from smartpm.client import SmartPMClient
 from smartpm.decorators import api_wrapper, utility
-from smartpm.visuals import plot_schedule_delay
 from smartpm.logging_config import logger
 
 class Delay:
@@ -24,7 +23,7 @@ class Delay:
         <response.json> : dict
             Delay table data as a JSON object
         """
-        logger.debug(f"Fetching delay table for project_id: {project_id}, scenario_id: {scenario_id}")
+        logger.debug("Fetching delay table for project_id: %s, scenario_id: %s", project_id, scenario_id)
 
         endpoint = f'v1/projects/{project_id}/scenarios/{scenario_id}/delay'
         response = self.client._get(endpoint=endpoint)
@@ -44,6 +43,7 @@ class Delay:
         scenario_id : str
             ID of the scenario to retrieve the percent complete curve for
         """
-        logger.debug(f"Plotting schedule delay for project_id: {project_id}, scenario_id: {scenario_id}")
+        logger.debug("Plotting schedule delay for project_id: %s, scenario_id: %s", project_id, scenario_id)
         curve_data = self.get_delay_table(project_id, scenario_id)
+        from smartpm.visuals import plot_schedule_delay
         plot_schedule_delay(curve_data)
\ No newline at end of file
@@ -23,7 +23,7 @@ class Models:
         response : list of dict
             model for a schedule
         """
-        logger.debug(f"Fetching models for project_id: {project_id}")
+        logger.debug("Fetching models for project_id: %s", project_id)
 
         endpoint = f'v1/projects/{project_id}/models'
         response = self.client._get(endpoint=endpoint)
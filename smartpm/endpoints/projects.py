@@ -1,5 +1,3 @@
-import pandas as pd
-
 from smartpm.client import SmartPMClient
 from smartpm.decorators import api_wrapper, utility
 from smartpm.logging_config import logger 
@@ -25,7 +23,7 @@ class Projects:
         <response.json> : list of dict
             projects data as a JSON object
         """
-        logger.debug(f"Fetching projects as of: {as_of}")
+        logger.debug("Fetching projects as of: %s", as_of)
         params = {}
         if as_of:
             params['asOf'] = as_of
@@ -50,7 +48,7 @@ class Projects:
         <response.json> : list of dict
             projects data as a JSON object
         """
-        logger.debug(f"Fetching projects as of: {as_of}")
+        logger.debug("Fetching projects as of: %s", as_of)
         
         # Hard-code project plan filters into the params
         # Inactive: 0b657f37-e317-4d65-9ebd-b4f6f0aae4b1
@@ -89,7 +87,7 @@ class Projects:
         <response.json> : dict
             project details as a JSON object
         """
-        logger.debug(f"Fetching project with ID: {project_id}")
+        logger.debug("Fetching project with ID: %s", project_id)
         endpoint = f'v1/projects/{project_id}'
         response = self.client._get(endpoint=endpoint)
         return response
@@ -109,7 +107,7 @@ class Projects:
         <response.json> : list of dict
             project comments as a JSON object
         """
-        logger.debug(f"Fetching comments for project ID: {project_id}")
+        logger.debug("Fetching comments for project ID: %s", project_id)
         endpoint = f'v1/projects/{project_id}/comments'
         response = self.client._get(endpoint=endpoint)
         return response
@@ -129,15 +127,15 @@ class Projects:
         project : dict
             The project data if found, otherwise None
         """
-        logger.debug(f"Searching for project with name: {name}")
+        logger.debug("Searching for project with name: %s", name)
         projects = self.get_projects()
         
         for project in projects:
             if project.get('name') == name:
-                logger.info(f"Found project: {project['id']} - {project['name']}")
+                logger.info("Found project: %s - %s", project['id'], project['name'])
                 return project
         
-        logger.info(f"Project with name '{name}' not found.")
+        logger.info("Project with name '%s' not found.", name)
         return None
     
     @utility
@@ -150,6 +148,8 @@ class Projects:
         pd.DataFrame
             DataFrame containing projects data with selected columns.
         """
+        import pandas as pd
+
         projects = self.get_projects()
 
         # Extract relevant fields and metadata
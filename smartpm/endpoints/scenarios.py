@@ -1,5 +1,4 @@
 from smartpm.client import SmartPMClient
-from smartpm.visuals import plot_percent_complete_curve, plot_earned_schedule_curve
 from smartpm.decorators import api_wrapper, utility
 from smartpm.logging_config import logger
 
@@ -24,7 +23,7 @@ class Scenarios:
         <response.json> : list of dict
             project scenarios as a JSON object
         """
-        logger.debug(f"Fetching scenarios for project_id: {project_id}, as_of: {as_of}")
+        logger.debug("Fetching scenarios for project_id: %s, as_of: %s", project_id, as_of)
         params = {}
         if as_of:
             params['asOf'] = as_of
@@ -50,15 +49,15 @@ class Scenarios:
         matching_scenarios : list of dict
             List of scenarios matching the specified name
         """
-        logger.debug(f"Searching for scenarios with name: {scenario_name} in project_id: {project_id}")
+        logger.debug("Searching for scenarios with name: %s in project_id: %s", scenario_name, project_id)
         scenarios = self.get_scenarios(project_id)
         
         matching_scenarios = [scenario for scenario in scenarios if scenario.get('name') == scenario_name]
         
         if matching_scenarios:
-            logger.info(f"Found {len(matching_scenarios)} matching scenarios.")
+            logger.info("Found %s matching scenarios.", len(matching_scenarios))
         else:
-            logger.info(f"No scenarios found with name '{scenario_name}'.")
+            logger.info("No scenarios found with name '%s'.", scenario_name)
 
         return matching_scenarios
     
@@ -82,7 +81,7 @@ class Scenarios:
         <response.json> : dict
             scenario details as a JSON object
         """
-        logger.debug(f"Fetching scenario details for project_id: {project_id}, scenario_id: {scenario_id}, data_date: {data_date}")
+        logger.debug("Fetching scenario details for project_id: %s, scenario_id: %s, data_date: %s", project_id, scenario_id, data_date)
         params = {}
         if data_date:
             params['dataDate'] = data_date
@@ -109,7 +108,7 @@ class Scenarios:
         <response.json> : dict
             percent complete curve data as a JSON object
         """
-        logger.debug(f"Fetching percent complete curve data for project_id: {project_id}, scenario_id: {scenario_id}, delta: {delta}")
+        logger.debug("Fetching percent complete curve data for project_id: %s, scenario_id: %s, delta: %s", project_id, scenario_id, delta)
         params = {'delta': str(delta).lower()}
 
         endpoint = f'v2/projects/{project_id}/scenarios/{scenario_id}/percent-complete-curve'
@@ -130,8 +129,9 @@ class Scenarios:
         delta : bool, default False
             Return the change of progress between periods if True
         """
-        logger.debug(f"Plotting scenario progress for project_id: {project_id}, scenario_id: {scenario_id}, delta: {delta}")
+        logger.debug("Plotting scenario progress for project_id: %s, scenario_id: %s, delta: %s", project_id, scenario_id, delta)
         curve_data = self.get_percent_complete_curve(project_id, scenario_id, delta)
+        from smartpm.visuals import plot_percent_complete_curve
         plot_percent_complete_curve(curve_data)
     
     @api_wrapper
@@ -151,7 +151,7 @@ class Scenarios:
         <response.json> : dict
             earned schedule curve data as a JSON object
         """
-        logger.debug(f"Fetching earned schedule curve for project_id: {project_id}, scenario_id: {scenario_id}")
+        logger.debug("Fetching earned schedule curve for project_id: %s, scenario_id: %s", project_id, scenario_id)
         endpoint = f'v1/projects/{project_id}/scenarios/{scenario_id}/earned-schedule-curve'
         response = self.client._get(endpoint=endpoint)
         
@@ -170,6 +170,7 @@ class Scenarios:
         scenario_id : str
             ID of the scenario to retrieve the percent complete curve for
         """
-        logger.debug(f"Plotting earned schedule curve for project_id: {project_id}, scenario_id: {scenario_id}")
+        logger.debug("Plotting earned schedule curve for project_id: %s, scenario_id: %s", project_id, scenario_id)
         earned_days_data = self.get_earned_schedule_curve(project_id, scenario_id)
+        from smartpm.visuals import plot_earned_schedule_curve
         plot_earned_schedule_curve(earned_days_data)
\ No newline at end of file
@@ -27,7 +27,7 @@ class Schedule:
         <response.json> : dict
             Schedule quality data as a JSON object
         """
-        logger.debug(f"Fetching schedule quality for project_id: {project_id}, scenario_id: {scenario_id}, import_log_id: {import_log_id}, quality_profile_id: {quality_profile_id}")
+        logger.debug("Fetching schedule quality for project_id: %s, scenario_id: %s, import_log_id: %s, quality_profile_id: %s", project_id, scenario_id, import_log_id, quality_profile_id)
         params = {}
         if import_log_id:
             params['importLogId'] = import_log_id
@@ -59,10 +59,10 @@ class Schedule:
         metrics = schedule_quality_data.get('metrics', [])
         for metric in metrics:
             if metric.get('name') == metric_name:
-                logger.debug(f"Found {metric_name}")
+                logger.debug("Found %s", metric_name)
                 return metric
             
-        logger.warning(f"Could not find metric {metric_name}")
+        logger.warning("Could not find metric %s", metric_name)
         return None
 
     @utility
@@ -101,7 +101,7 @@ class Schedule:
         <response.json> : dict
             Schedule compression data as a JSON object
         """
-        logger.debug(f"Fetching schedule compression for project_id: {project_id}, scenario_id: {scenario_id}, data_date: {data_date}")
+        logger.debug("Fetching schedule compression for project_id: %s, scenario_id: %s, data_date: %s", project_id, scenario_id, data_date)
         params = {}
         if data_date:
             params['dataDate'] = data_date
@@ -138,7 +138,7 @@ class Schedule:
         <response.json> : dict
             Quality profile data as a JSON object
         """
-        logger.debug(f"Fetching quality profile for quality_profile_id: {quality_profile_id}")
+        logger.debug("Fetching quality profile for quality_profile_id: %s", quality_profile_id)
         endpoint = f'v1/quality-profiles/{quality_profile_id}'
         response = self.client._get(endpoint=endpoint)
         return response
\ No newline at end of file
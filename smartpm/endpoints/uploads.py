@@ -1,6 +1,12 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 from smartpm.client import SmartPMClient
-from smartpm.decorators import api_wrapper
+from smartpm.decorators import api_wrapper, utility
 from smartpm.logging_config import logger
+from smartpm.endpoints.activity import Activity
+from smartpm.endpoints.scenarios import Scenarios
+from smartpm.snapshots import normalize_data_date
 
 class Uploads:
     def __init__(self, client: SmartPMClient):
@@ -23,9 +29,56 @@ class Uploads:
         <response.json> : dict
             Schedule upload data as a JSON object
         """
-        logger.debug(f"Fetching delay table for project_id: {project_id}, scenario_id: {scenario_id}")
+        logger.debug("Fetching delay table for project_id: %s, scenario_id: %s", project_id, scenario_id)
 
         endpoint = f'v1/projects/{project_id}/scenarios/{scenario_id}/schedules'
         response = self.client._get(endpoint=endpoint)
 
-        return response
\ No newline at end of file
+        return response
+
+    @utility
+    def backfill_snapshots(self, project_id, scenario_id, store, max_workers=4):
+        """
+        Fetch the activities and scenario details for every schedule upload and store them as snapshots.
+        Data dates that are already in the store are skipped, so an interrupted backfill resumes where it left off.
+
+        Parameters
+        ----------
+        project_id : str
+            ID of the project containing the scenario
+        scenario_id : str
+            ID of the scenario to backfill
+        store : smartpm.snapshots.SnapshotStore
+            Store to write the snapshots to
+        max_workers : int, default 4
+            Number of data dates to fetch concurrently
+
+        Returns
+        -------
+        fetched : list of str
+            Data dates that were fetched and stored by this call
+        """
+        logger.debug("Backfilling snapshots for project_id: %s, scenario_id: %s", project_id, scenario_id)
+        uploads = self.get_schedule_uploads(project_id, scenario_id)
+        data_dates = sorted({normalize_data_date(upload['dataDate']) for upload in uploads if upload.get('dataDate')})
+        pending = [data_date for data_date in data_dates if not store.has_snapshot(project_id, scenario_id, data_date)]
+        logger.info("%s of %s snapshots already stored", len(data_dates) - len(pending), len(data_dates))
+
+        scenarios_api = Scenarios(client=self.client)
+        activity_api = Activity(client=self.client)
+
+        def fetch_snapshot(data_date):
+            details = scenarios_api.get_scenario_details(project_id, scenario_id, data_date=data_date)
+            activities = activity_api.get_activities(project_id, scenario_id, data_date=data_date)
+            store.write_snapshot(project_id, scenario_id, data_date, details, activities)
+            return data_date
+
+        fetched = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Each data date is fetched in a copy of the caller's context, so it keeps its request priority
+            futures = [executor.submit(contextvars.copy_context().run, fetch_snapshot, data_date) for data_date in pending]
+            # Snapshots that complete are kept even if another data date fails, so a rerun only fetches the rest
+            for future in as_completed(futures):
+                fetched.append(future.result())
+
+        return sorted(fetched)
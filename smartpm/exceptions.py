@@ -21,3 +21,11 @@ class BadRequestError(SmartPMError):
 class NoCommentsFoundError(NotFoundError):
     """Exception raised when no comments are found for a project."""
     pass
+
+class SnapshotExistsError(SmartPMError):
+    """Exception raised when writing a snapshot that has already been stored."""
+    pass
+
+class RecordingNotFoundError(SmartPMError):
+    """Exception raised when a replayed request has no recorded response."""
+    pass
@@ -0,0 +1,158 @@
+import json
+import threading
+import time
+
+from smartpm.logging_config import logger
+
+# Subscribed hooks. The tuple is replaced rather than mutated, so calls in flight never see a half-updated list
+_hooks = ()
+_lock = threading.Lock()
+
+class CallEvent:
+    """
+    A call to a decorated SDK function, passed to every hook.
+
+    Attributes
+    ----------
+    name : str
+        Qualified name of the function, e.g. `Projects.get_projects`
+    kind : str
+        `api_wrapper` or `utility`
+    args : tuple
+        Positional arguments, without `self`
+    kwargs : dict
+        Keyword arguments
+    start : float
+        `time.perf_counter()` when the call started
+    duration : float
+        Seconds the call took, None until it ends
+    result : object
+        Return value, None until it ends or if it raised
+    error : Exception
+        Exception raised by the call, None if it succeeded
+    """
+    __slots__ = ('name', 'kind', 'args', 'kwargs', 'start', 'duration', 'result', 'error', '_payload_size')
+
+    def __init__(self, name, kind, args, kwargs):
+        self.name = name
+        self.kind = kind
+        self.args = args
+        self.kwargs = kwargs
+        self.start = time.perf_counter()
+        self.duration = None
+        self.result = None
+        self.error = None
+        self._payload_size = None
+
+    @property
+    def payload_size(self):
+        """Size in bytes of the result encoded as JSON. Only computed if a hook asks for it."""
+        if self._payload_size is None and self.result is not None:
+            try:
+                self._payload_size = len(json.dumps(self.result, separators=(',', ':'), default=str).encode('utf-8'))
+            except (TypeError, ValueError):
+                self._payload_size = 0  # not JSON-like, e.g. a DataFrame or figure
+        return self._payload_size
+
+class Hook:
+    """
+    Base class of instrumentation hooks. Override the methods for the stages you need.
+    Hooks run in the thread making the call and should return quickly.
+    """
+    def on_call_start(self, event):
+        """Called before the function runs."""
+
+    def on_call_end(self, event):
+        """Called after the function returned, with `duration` and `result` set."""
+
+    def on_call_error(self, event):
+        """Called after the function raised, with `duration` and `error` set. The exception is re-raised afterwards."""
+
+class LoggingHook(Hook):
+    """Log every call and its duration at DEBUG level, and errors at WARNING level."""
+    def on_call_start(self, event):
+        logger.debug("Calling %s function: %s", event.kind, event.name)
+
+    def on_call_end(self, event):
+        logger.debug("%s returned in %.3fs", event.name, event.duration)
+
+    def on_call_error(self, event):
+        logger.warning("%s failed after %.3fs: %r", event.name, event.duration, event.error)
+
+def subscribe(hook):
+    """
+    Start sending call events to a hook.
+
+    Parameters
+    ----------
+    hook : Hook
+        Hook to call for every decorated SDK function
+
+    Returns
+    -------
+    Hook
+        The hook, so it can be passed to `unsubscribe` later
+    """
+    global _hooks
+    with _lock:
+        if hook not in _hooks:
+            _hooks = _hooks + (hook,)
+    return hook
+
+def unsubscribe(hook):
+    """Stop sending call events to a hook. Unknown hooks are ignored."""
+    global _hooks
+    with _lock:
+        _hooks = tuple(subscribed for subscribed in _hooks if subscribed is not hook)
+
+def subscribed_hooks():
+    """Return the hooks that are currently subscribed."""
+    return _hooks
+
+def _notify(hooks, stage, event):
+    for hook in hooks:
+        try:
+            getattr(hook, stage)(event)
+        except Exception:
+            # A broken hook must never break the call it observes
+            logger.exception("Instrumentation hook %r failed in %s", hook, stage)
+
+def instrument(func, kind):
+    """
+    Wrap a function so that subscribed hooks see every call to it.
+    When no hook is subscribed, the wrapper only checks an empty tuple before calling the function.
+
+    Parameters
+    ----------
+    func : callable
+        Function or method to wrap
+    kind : str
+        Kind of function reported in events, e.g. `api_wrapper`
+
+    Returns
+    -------
+    callable
+        The wrapped function
+    """
+    name = func.__qualname__
+
+    def wrapper(*args, **kwargs):
+        hooks = _hooks
+        if not hooks:
+            return func(*args, **kwargs)
+
+        # Drop `self` from methods so events only carry the caller's arguments
+        event = CallEvent(name, kind, args[1:] if '.' in name else args, kwargs)
+        _notify(hooks, 'on_call_start', event)
+        try:
+            event.result = func(*args, **kwargs)
+        except Exception as e:
+            event.duration = time.perf_counter() - event.start
+            event.error = e
+            _notify(hooks, 'on_call_error', event)
+            raise
+        event.duration = time.perf_counter() - event.start
+        _notify(hooks, 'on_call_end', event)
+        return event.result
+
+    return wrapper
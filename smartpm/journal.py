@@ -0,0 +1,78 @@
+import json
+import os
+import threading
+
+from smartpm.logging_config import logger
+
+class CrawlJournal:
+    """
+    Append-only journal of completed crawl tasks.
+
+    Each completed (project, scenario, endpoint) tuple is written as one JSON line and flushed to disk
+    before the task counts as done, so a crawl that is killed partway can be restarted from the journal.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._completed = set()
+        self._needs_newline = False
+        self._load()
+
+    @staticmethod
+    def _key(project_id, scenario_id, endpoint):
+        return (None if project_id is None else str(project_id), None if scenario_id is None else str(scenario_id), endpoint)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.read().split('\n')
+
+        # The last line is partial if the process died while writing it
+        self._needs_newline = lines[-1] != ''
+        for line in lines:
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                logger.warning("Skipping unreadable journal entry in %s", self.path)
+                continue
+            self._completed.add(self._key(entry['projectId'], entry['scenarioId'], entry['endpoint']))
+
+        logger.debug("Loaded %s completed tasks from %s", len(self._completed), self.path)
+
+    def is_done(self, project_id, scenario_id, endpoint):
+        """Return True if the task has been recorded as completed."""
+        return self._key(project_id, scenario_id, endpoint) in self._completed
+
+    def mark_done(self, project_id, scenario_id, endpoint):
+        """
+        Record a task as completed.
+
+        Parameters
+        ----------
+        project_id : str or None
+            ID of the project, None for portfolio-level tasks such as listing the projects
+        scenario_id : str or None
+            ID of the scenario, None for project-level tasks
+        endpoint : str
+            Name of the endpoint that was fetched
+        """
+        entry = json.dumps({'projectId': project_id, 'scenarioId': scenario_id, 'endpoint': endpoint})
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                if self._needs_newline:
+                    f.write('\n')
+                    self._needs_newline = False
+                f.write(entry + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._completed.add(self._key(project_id, scenario_id, endpoint))
+
+    def __len__(self):
+        return len(self._completed)
@@ -2,15 +2,34 @@ import logging
 
 # Create a logger
 logger = logging.getLogger('smartpm')
-logger.setLevel(logging.DEBUG)
 
-# Create console handler and set level to debug
-ch = logging.StreamHandler()
-ch.setLevel(logging.DEBUG)
+# Libraries should not configure output, the application decides where records go and at which level.
+# Without any handler configured, records are dropped instead of going through logging's last resort handler
+logger.addHandler(logging.NullHandler())
 
-# Create formatter and add it to the handler
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-ch.setFormatter(formatter)
+def enable_console_logging(level=logging.DEBUG):
+    """
+    Print SDK log records to the console, e.g. when exploring the API from a snippet.
 
-# Add the handler to the logger
-logger.addHandler(ch)
+    Parameters
+    ----------
+    level : int, default logging.DEBUG
+        Lowest level of records to print
+
+    Returns
+    -------
+    logging.Handler
+        The added handler, which can be removed with `logger.removeHandler`
+    """
+    # Create console handler and set level
+    ch = logging.StreamHandler()
+    ch.setLevel(level)
+
+    # Create formatter and add it to the handler
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    ch.setFormatter(formatter)
+
+    # Add the handler to the logger
+    logger.setLevel(level)
+    logger.addHandler(ch)
+    return ch
@@ -0,0 +1,180 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from smartpm.cache import MemoryCache
+from smartpm.client import SmartPMClient, create_session
+from smartpm.crawl import ResultStore, crawl_portfolio
+from smartpm.logging_config import logger
+from smartpm.scheduler import RequestScheduler
+
+class ClientManager:
+    """
+    Hand out a `SmartPMClient` per company that all share one connection pool, response cache and set of event sinks,
+    with the rate limit of each company and API key tracked by its own `smartpm.scheduler.RequestScheduler`.
+
+    >>> manager = ClientManager(api_key, rate=10)
+    >>> manager.add_event_sink(HistogramSink())
+    >>> Projects(manager.client('company-a')).get_projects()
+    >>> manager.crawl_companies(['company-a', 'company-b'], 'crawl-results')
+
+    Parameters
+    ----------
+    api_key : str
+        API key used for companies that are not given their own key
+    base_url : str, default None
+        Root URL of the API. If None, uses `SmartPMClient.BASE_URL`
+    session : requests.Session, default None
+        Session shared by every client. If None, one is created with `pool_maxsize` connections and closed with the manager,
+        a session passed in is left open for the caller to close
+    pool_maxsize : int, default 32
+        Connections kept open to the API when the session is created here, shared by all companies
+    cache : smartpm.cache.MemoryCache, default None
+        Cache of GET responses shared by every client, entries are keyed by company and API key. If None, a `MemoryCache`
+        is created, pass False to disable caching
+    rate : float, default None
+        Requests per second allowed for each company and API key. If None, requests are not rate limited
+    burst : float, default None
+        Burst of each rate limit, see `smartpm.scheduler.TokenBucket`
+    weights : dict, default None
+        Weights of the priority classes of each scheduler, see `smartpm.scheduler.RequestScheduler`
+    **client_kwargs
+        Other arguments of every `SmartPMClient`, e.g. `max_retries` or `timeout`
+    """
+    def __init__(self, api_key, base_url=None, session=None, pool_maxsize=32, cache=None, rate=None, burst=None, weights=None,
+                 **client_kwargs):
+        self.api_key = api_key
+        self.base_url = base_url
+        self._owns_session = session is None
+        self.session = session or create_session(pool_maxsize=pool_maxsize)
+        self.cache = MemoryCache() if cache is None else cache or None
+        self.rate = rate
+        self.burst = burst
+        self.weights = weights
+        self.client_kwargs = client_kwargs
+        self.event_sinks = []
+        self.schedulers = {}
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def client(self, company_id, api_key=None):
+        """
+        Return the client of a company, created on first use.
+
+        Parameters
+        ----------
+        company_id : str
+            ID of the company to make requests for
+        api_key : str, default None
+            API key of the company. If None, uses the manager's key
+
+        Returns
+        -------
+        SmartPMClient
+        """
+        api_key = api_key or self.api_key
+        with self._lock:
+            client = self._clients.get((company_id, api_key))
+            if client is None:
+                scheduler = None
+                if self.rate is not None:
+                    scheduler = self.schedulers[(company_id, api_key)] = RequestScheduler(self.rate, self.burst, self.weights)
+                client = SmartPMClient(api_key, company_id, base_url=self.base_url, session=self.session, scheduler=scheduler,
+                                       cache=self.cache, **self.client_kwargs)
+                for sink in self.event_sinks:
+                    client.add_event_sink(sink)
+                self._clients[(company_id, api_key)] = client
+                logger.debug("Created client for company %s", company_id)
+            return client
+
+    def clients(self):
+        """Return the clients created so far."""
+        with self._lock:
+            return list(self._clients.values())
+
+    def add_event_sink(self, sink):
+        """
+        Send the events of every client, including clients created later, to a sink.
+
+        Parameters
+        ----------
+        sink : callable
+            Called with a `smartpm.metrics.RequestEvent` after each call, e.g. `smartpm.metrics.HistogramSink`
+
+        Returns
+        -------
+        callable
+            The sink, so it can be passed to `remove_event_sink` later
+        """
+        with self._lock:
+            self.event_sinks.append(sink)
+            for client in self._clients.values():
+                client.add_event_sink(sink)
+        return sink
+
+    def remove_event_sink(self, sink):
+        """Stop sending the events of every client to a sink."""
+        with self._lock:
+            self.event_sinks.remove(sink)
+            for client in self._clients.values():
+                client.remove_event_sink(sink)
+
+    def stats(self):
+        """
+        Queue times of each rate limit, see `smartpm.scheduler.RequestScheduler.stats`.
+
+        Returns
+        -------
+        dict
+            (company_id, api_key) mapped to the stats of its scheduler
+        """
+        with self._lock:
+            return {key: scheduler.stats() for key, scheduler in self.schedulers.items()}
+
+    def crawl_companies(self, company_ids, store_root, max_companies=4, **crawl_kwargs):
+        """
+        Crawl the portfolios of several companies in parallel, each into its own `ResultStore` under `store_root`.
+
+        Parameters
+        ----------
+        company_ids : list of str
+            Companies to crawl, with the manager's API key
+        store_root : str
+            Directory the results are stored in, one `<store_root>/<company_id>` store per company
+        max_companies : int, default 4
+            Number of companies crawled at the same time. Each of them fetches `max_workers` tasks concurrently,
+            so keep `max_companies * max_workers` within the connection pool
+        **crawl_kwargs
+            Arguments of `smartpm.crawl.crawl_portfolio`, e.g. `endpoints` or `max_workers`
+
+        Returns
+        -------
+        summaries : dict
+            Company ID mapped to the summary of its crawl, see `crawl_portfolio`. If a crawl failed
+            before fetching any task, e.g. when listing the projects, its summary is `{'error': message}`
+        """
+        def crawl(company_id):
+            return crawl_portfolio(self.client(company_id), ResultStore(os.path.join(store_root, str(company_id))), **crawl_kwargs)
+
+        summaries = {}
+        with ThreadPoolExecutor(max_workers=max_companies) as executor:
+            futures = {executor.submit(crawl, company_id): company_id for company_id in company_ids}
+            for future in as_completed(futures):
+                company_id = futures[future]
+                try:
+                    summaries[company_id] = future.result()
+                except Exception as e:
+                    logger.warning("Crawl of company %s failed: %s", company_id, e)
+                    summaries[company_id] = {'error': str(e)}
+        return summaries
+
+    def close(self):
+        """Close the shared connections, unless the session was passed in."""
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
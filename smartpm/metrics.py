@@ -0,0 +1,297 @@
+import bisect
+import re
+import threading
+import time
+
+from smartpm.logging_config import logger
+
+# Upper bounds in seconds of the request latency histogram buckets
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_ID_SEGMENT_NAMES = {}
+
+def endpoint_template(endpoint):
+    """
+    Replace the IDs in an endpoint path with placeholders, so requests to the same endpoint can be grouped.
+
+    Paths alternate between collections and IDs after the version, e.g.
+    `v1/projects/123/scenarios/456/delay` becomes `v1/projects/{project_id}/scenarios/{scenario_id}/delay`.
+
+    Parameters
+    ----------
+    endpoint : str
+        Endpoint path relative to the base URL
+
+    Returns
+    -------
+    str
+        Endpoint path with ID placeholders
+    """
+    segments = endpoint.strip('/').split('/')
+    for i in range(2, len(segments), 2):
+        collection = segments[i - 1]
+        name = _ID_SEGMENT_NAMES.get(collection)
+        if name is None:
+            name = _ID_SEGMENT_NAMES[collection] = '{' + re.sub(r's$', '', collection).replace('-', '_') + '_id}'
+        segments[i] = name
+    return '/'.join(segments)
+
+class RequestEvent:
+    """
+    One HTTP call made by `SmartPMClient`, including its retries.
+
+    Attributes
+    ----------
+    method : str
+        HTTP method
+    endpoint : str
+        Endpoint path that was requested
+    endpoint_template : str
+        Endpoint path with ID placeholders, see `endpoint_template`
+    params : dict
+        Query parameters
+    status : int
+        Status code of the last attempt, None if no response was received
+    start : float
+        Wall clock time the call started, in seconds since the epoch
+    connect : float
+        Seconds spent opening connections, 0 when a pooled connection was reused
+    ttfb : float
+        Seconds from sending the request until the response headers arrived, excluding `connect`
+    download : float
+        Seconds spent reading the response body
+    duration : float
+        Total seconds of the call, including retries, waiting between them and `queue_wait`
+    response_bytes : int
+        Size of the response body of the last attempt
+    retries : int
+        Number of attempts after the first one
+    cache_hit : bool
+        True if the response was served from a cache without making a request
+    error : str
+        Error of a failed call, None if it succeeded
+    priority : str
+        Priority class the call was queued in, None if the client has no `smartpm.scheduler.RequestScheduler`
+    queue_wait : float
+        Seconds the attempts of the call waited in the scheduler's queue
+    """
+    __slots__ = ('method', 'endpoint', 'endpoint_template', 'params', 'status', 'start', 'connect', 'ttfb',
+                 'download', 'duration', 'response_bytes', 'retries', 'cache_hit', 'error', 'priority', 'queue_wait')
+
+    def __init__(self, method, endpoint, params=None):
+        self.method = method
+        self.endpoint = endpoint
+        self.endpoint_template = endpoint_template(endpoint)
+        self.params = params
+        self.status = None
+        self.start = time.time()
+        self.connect = 0.0
+        self.ttfb = 0.0
+        self.download = 0.0
+        self.duration = 0.0
+        self.response_bytes = 0
+        self.retries = 0
+        self.cache_hit = False
+        self.error = None
+        self.priority = None
+        self.queue_wait = 0.0
+
+    def to_dict(self):
+        """Return the event as a dictionary, e.g. to write it as a JSON line."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+def emit(sinks, event):
+    """Send an event to every sink. A failing sink is logged and never breaks the request."""
+    for sink in sinks:
+        try:
+            sink(event)
+        except Exception:
+            logger.exception("Request event sink %r failed", sink)
+
+class ListSink:
+    """Keep every event in memory, e.g. for tests or to dump the events of a short script."""
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        with self._lock:
+            self.events.append(event)
+
+class HistogramSink:
+    """
+    In-memory latency histogram and byte, retry and cache counters per endpoint template.
+    Thread-safe, so one sink can be shared by several clients.
+
+    Parameters
+    ----------
+    buckets : tuple of float, default DEFAULT_BUCKETS
+        Upper bounds in seconds of the latency buckets
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        key = (event.method, event.endpoint_template, str(event.status) if event.status is not None else 'error')
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    'buckets': [0] * (len(self.buckets) + 1),
+                    'count': 0,
+                    'sum': 0.0,
+                    'connect': 0.0,
+                    'ttfb': 0.0,
+                    'download': 0.0,
+                    'bytes': 0,
+                    'retries': 0,
+                    'cache_hits': 0,
+                }
+            series['buckets'][bisect.bisect_left(self.buckets, event.duration)] += 1
+            series['count'] += 1
+            series['sum'] += event.duration
+            series['connect'] += event.connect
+            series['ttfb'] += event.ttfb
+            series['download'] += event.download
+            series['bytes'] += event.response_bytes
+            series['retries'] += event.retries
+            series['cache_hits'] += int(event.cache_hit)
+
+    def snapshot(self):
+        """
+        Return a copy of the collected series.
+
+        Returns
+        -------
+        dict
+            (method, endpoint_template, status) mapped to `buckets` counts (the last one is +Inf), `count`,
+            `sum` of durations, summed `connect`, `ttfb` and `download` seconds, `bytes`, `retries` and `cache_hits`
+        """
+        with self._lock:
+            return {key: dict(series, buckets=list(series['buckets'])) for key, series in self._series.items()}
+
+    def quantile(self, q, endpoint_template=None):
+        """
+        Estimate a latency quantile from the buckets, interpolating linearly inside the bucket it falls in.
+
+        Parameters
+        ----------
+        q : float
+            Quantile between 0 and 1, e.g. 0.95
+        endpoint_template : str, default None
+            Only count requests to this endpoint. If None, counts all requests
+
+        Returns
+        -------
+        float
+            Estimated latency in seconds, None if no request was recorded. Latencies past the last bucket are
+            reported as the last bucket's upper bound
+        """
+        counts = [0] * (len(self.buckets) + 1)
+        for (_, template, _), series in self.snapshot().items():
+            if endpoint_template is None or template == endpoint_template:
+                counts = [a + b for a, b in zip(counts, series['buckets'])]
+
+        total = sum(counts)
+        if total == 0:
+            return None
+
+        rank = q * total
+        cumulative = 0
+        for i, count in enumerate(counts):
+            if count and cumulative + count >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def to_prometheus(self, prefix='smartpm'):
+        """
+        Render the collected metrics in the Prometheus text exposition format.
+
+        Parameters
+        ----------
+        prefix : str, default 'smartpm'
+            Prefix of the metric names
+
+        Returns
+        -------
+        str
+            Text that can be served on a `/metrics` endpoint or written for the node exporter's textfile collector
+        """
+        series = sorted(self.snapshot().items())
+        lines = []
+
+        def labels(method, template, status, **extra):
+            pairs = [('method', method), ('endpoint', template), ('status', status)] + list(extra.items())
+            return '{' + ','.join('%s="%s"' % (name, str(value).replace('\\', '\\\\').replace('"', '\\"')) for name, value in pairs) + '}'
+
+        lines.append(f'# HELP {prefix}_request_duration_seconds Duration of SmartPM API calls including retries.')
+        lines.append(f'# TYPE {prefix}_request_duration_seconds histogram')
+        for (method, template, status), values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), values['buckets']):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{prefix}_request_duration_seconds_bucket{labels(method, template, status, le=le)} {cumulative}')
+            lines.append(f'{prefix}_request_duration_seconds_sum{labels(method, template, status)} {values["sum"]!r}')
+            lines.append(f'{prefix}_request_duration_seconds_count{labels(method, template, status)} {values["count"]}')
+
+        counters = [
+            ('request_phase_seconds_total', 'Seconds spent in each phase of SmartPM API calls.', None),
+            ('response_bytes_total', 'Bytes received from the SmartPM API.', 'bytes'),
+            ('request_retries_total', 'Retried SmartPM API calls.', 'retries'),
+            ('cache_hits_total', 'SmartPM API calls served from a cache.', 'cache_hits'),
+        ]
+        for name, help_text, field in counters:
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} counter')
+            for (method, template, status), values in series:
+                if field is None:
+                    for phase in ('connect', 'ttfb', 'download'):
+                        lines.append(f'{prefix}_{name}{labels(method, template, status, phase=phase)} {values[phase]!r}')
+                else:
+                    lines.append(f'{prefix}_{name}{labels(method, template, status)} {values[field]}')
+
+        return '\n'.join(lines) + '\n'
+
+class OpenTelemetrySink:
+    """
+    Record every request as an OpenTelemetry span, with the latency phases and sizes as attributes.
+
+    Parameters
+    ----------
+    tracer : opentelemetry.trace.Tracer, default None
+        Tracer to create the spans with. If None, uses the tracer of the global tracer provider,
+        which requires the `opentelemetry-api` package
+    """
+    def __init__(self, tracer=None):
+        if tracer is None:
+            from opentelemetry import trace
+            tracer = trace.get_tracer('smartpm')
+        self.tracer = tracer
+
+    def __call__(self, event):
+        start_ns = int(event.start * 1e9)
+        attributes = {
+            'http.request.method': event.method,
+            'url.template': event.endpoint_template,
+            'url.path': event.endpoint,
+            'smartpm.connect_seconds': event.connect,
+            'smartpm.ttfb_seconds': event.ttfb,
+            'smartpm.download_seconds': event.download,
+            'smartpm.response_bytes': event.response_bytes,
+            'smartpm.retries': event.retries,
+            'smartpm.cache_hit': event.cache_hit,
+        }
+        if event.status is not None:
+            attributes['http.response.status_code'] = event.status
+        if event.error is not None:
+            attributes['error.type'] = event.error
+
+        span = self.tracer.start_span(f'{event.method} {event.endpoint_template}', start_time=start_ns, attributes=attributes)
+        span.end(end_time=start_ns + int(event.duration * 1e9))
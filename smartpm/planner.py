@@ -0,0 +1,171 @@
+from smartpm.crawl import CRAWL_ENDPOINTS
+from smartpm.logging_config import logger
+from smartpm.tasks import TaskGraph
+
+def _preprocessed(name):
+    # Defer importing numpy until an output is computed
+    def compute(response):
+        from smartpm import preprocessing
+        return getattr(preprocessing, name)(response)
+    compute.__name__ = name
+    return compute
+
+# Outputs that can be queried for each scenario: name -> (responses it is computed from, see `CRAWL_ENDPOINTS`,
+# and a function of those responses in the same order). Every response name can also be queried as is
+OUTPUTS = {
+    'completion_counts': (('activities',), _preprocessed('completion_counts')),
+    'activity_count': (('activities',), len),
+    'data_date': (('scenario_details',), lambda details: details.get('dataDate')),
+    'percent_complete_series': (('percent_complete_curve',), _preprocessed('percent_complete_series')),
+    'earned_schedule_series': (('earned_schedule_curve',), _preprocessed('earned_schedule_series')),
+    'delay_series': (('delay_table',), _preprocessed('delay_series')),
+    'change_series': (('changes_summary',), _preprocessed('change_series')),
+    'quality_grade': (('schedule_quality',), lambda quality: quality.get('grade')),
+    'upload_count': (('schedule_uploads',), len),
+}
+
+def register_output(name, sources, compute):
+    """
+    Make a new output available to `QueryPlanner`.
+
+    Parameters
+    ----------
+    name : str
+        Name to query the output by
+    sources : list of str
+        Responses the output is computed from, see `smartpm.crawl.CRAWL_ENDPOINTS`
+    compute : callable
+        Function of the responses, in the order of `sources`, that returns the output
+    """
+    unknown = [source for source in sources if source not in CRAWL_ENDPOINTS]
+    if unknown:
+        raise ValueError(f"Unknown responses: {unknown}")
+    OUTPUTS[name] = (tuple(sources), compute)
+
+def _output_definition(name):
+    if name in OUTPUTS:
+        return OUTPUTS[name]
+    if name in CRAWL_ENDPOINTS:
+        return (name,), lambda response: response
+    raise ValueError(f"Unknown output {name!r}, expected one of {sorted(set(OUTPUTS) | set(CRAWL_ENDPOINTS))}")
+
+class QueryPlan:
+    """
+    Requests needed for a set of outputs of a set of scenarios, made by `QueryPlanner.plan`.
+
+    Attributes
+    ----------
+    scenarios : list of tuple
+        (project_id, scenario_id) of each scenario, without duplicates
+    outputs : list of str
+        Outputs computed for every scenario
+    requests : list of tuple
+        (response name, project_id, scenario_id) of each request, every response fetched once
+    naive_requests : int
+        Requests that calling one SDK method per output and scenario would make
+    """
+    def __init__(self, scenarios, outputs):
+        self.scenarios = list(dict.fromkeys((project_id, scenario_id) for project_id, scenario_id in scenarios))
+        self.outputs = list(dict.fromkeys(outputs))
+        definitions = [_output_definition(output) for output in self.outputs]
+
+        sources = list(dict.fromkeys(source for output_sources, _ in definitions for source in output_sources))
+        self.requests = [(source, project_id, scenario_id) for project_id, scenario_id in self.scenarios for source in sources]
+        self.naive_requests = len(scenarios) * sum(len(output_sources) for output_sources, _ in definitions)
+
+    def __len__(self):
+        return len(self.requests)
+
+    def describe(self):
+        """Summarize the plan, e.g. `3 outputs of 20 scenarios from 40 requests instead of 120`."""
+        return (f"{len(self.outputs)} outputs of {len(self.scenarios)} scenarios from {len(self.requests)} requests "
+                f"instead of {self.naive_requests}")
+
+class QueryPlanner:
+    """
+    Compute many outputs for many scenarios from the fewest requests.
+
+    Declare the outputs wanted, e.g. `['completion_counts', 'delay_series', 'quality_grade']` (see `OUTPUTS`), and the
+    planner fetches each response they need once per scenario, concurrently, and computes every output from the
+    shared responses:
+
+    >>> planner = QueryPlanner(client)
+    >>> results = planner.query([(project_id, scenario_id)], ['completion_counts', 'delay_series', 'quality_grade'])
+    >>> results[(project_id, scenario_id)]['quality_grade']
+
+    Parameters
+    ----------
+    client : SmartPMClient
+        Client used to make the requests
+    sequential : bool, default None
+        If True, fetch one response after the other, see `smartpm.tasks.TaskGraph`
+    """
+    def __init__(self, client, sequential=None):
+        self.client = client
+        self.sequential = sequential
+
+    def plan(self, scenarios, outputs):
+        """
+        Work out the requests needed for the outputs of the scenarios, without making them.
+
+        Parameters
+        ----------
+        scenarios : list of tuple
+            (project_id, scenario_id) of each scenario
+        outputs : list of str
+            Names of the outputs, see `OUTPUTS`, or of raw responses, see `smartpm.crawl.CRAWL_ENDPOINTS`
+
+        Returns
+        -------
+        QueryPlan
+        """
+        return QueryPlan(scenarios, outputs)
+
+    def execute(self, plan):
+        """
+        Make the requests of a plan concurrently and compute its outputs.
+
+        Parameters
+        ----------
+        plan : QueryPlan
+            Plan made by `plan`
+
+        Returns
+        -------
+        dict
+            (project_id, scenario_id) mapped to a dict of each output's value
+
+        Raises
+        ------
+        SmartPMError
+            If a request fails. Requests that had not started are not made
+        """
+        logger.debug("Executing query plan: %s", plan.describe())
+        graph = TaskGraph(sequential=self.sequential)
+        for source, project_id, scenario_id in plan.requests:
+            graph.add(f'{source}:{project_id}:{scenario_id}', CRAWL_ENDPOINTS[source], self.client, project_id, scenario_id)
+
+        for project_id, scenario_id in plan.scenarios:
+            for output in plan.outputs:
+                sources, compute = _output_definition(output)
+                names = [f'{source}:{project_id}:{scenario_id}' for source in sources]
+                graph.add(f'={output}:{project_id}:{scenario_id}',
+                          lambda compute=compute, names=names, **responses: compute(*[responses[name] for name in names]),
+                          after=names)
+
+        results = graph.run()
+        return {
+            (project_id, scenario_id): {output: results[f'={output}:{project_id}:{scenario_id}'] for output in plan.outputs}
+            for project_id, scenario_id in plan.scenarios
+        }
+
+    def query(self, scenarios, outputs):
+        """
+        Plan and execute a query, see `plan` and `execute`.
+
+        Returns
+        -------
+        dict
+            (project_id, scenario_id) mapped to a dict of each output's value
+        """
+        return self.execute(self.plan(scenarios, outputs))
@@ -0,0 +1,156 @@
+import numpy as np
+
+def to_datetime64(values):
+    """
+    Parse ISO 8601 date strings into a NumPy datetime64 array in one step.
+
+    Parameters
+    ----------
+    values : list of str
+        Dates in format `yyyy-MM-dd` or `yyyy-MM-ddTHH:mm:ss`. None becomes NaT
+
+    Returns
+    -------
+    np.ndarray
+        Array of dtype `datetime64[s]`
+    """
+    return np.array(values, dtype='datetime64[s]')
+
+def to_float_array(values):
+    """
+    Convert numeric values into a float array, with None as NaN.
+
+    Parameters
+    ----------
+    values : list
+        Numbers or None
+
+    Returns
+    -------
+    np.ndarray
+        Array of dtype `float64`
+    """
+    return np.array(values, dtype=float)
+
+def percent_complete_series(json_data):
+    """
+    Prepare the response of `get_percent_complete_curve` for plotting.
+
+    Parameters
+    ----------
+    json_data : dict
+        Dictionary containing percent complete types and scenario data with progress information.
+
+    Returns
+    -------
+    dates : np.ndarray
+        Dates of the points as `datetime64[s]`
+    series : dict of np.ndarray
+        Percent complete for each key of `percentCompleteTypes`, NaN where a point has no value
+    """
+    scenario_data = json_data['data']
+    keys = list(json_data['percentCompleteTypes'])
+
+    dates = to_datetime64([point['DATE'] for point in scenario_data])
+    values = to_float_array([[point.get(key) for key in keys] for point in scenario_data]).reshape(len(scenario_data), len(keys))
+
+    return dates, {key: values[:, i] for i, key in enumerate(keys)}
+
+def earned_schedule_series(json_data):
+    """
+    Prepare the response of `get_earned_schedule_curve` for plotting.
+
+    Parameters
+    ----------
+    json_data : dict
+        Dictionary containing the date and days data.
+
+    Returns
+    -------
+    dates : np.ndarray
+        Dates of the points as `datetime64[s]`
+    series : dict of np.ndarray
+        `earnedDays`, `plannedDays` and `predictiveDays`, NaN where a point has no value
+    """
+    data = json_data['data']
+    keys = ['earnedDays', 'plannedDays', 'predictiveDays']
+
+    dates = to_datetime64([point['date'] for point in data])
+    values = to_float_array([[point[key] for key in keys] for point in data]).reshape(len(data), len(keys))
+
+    return dates, {key: values[:, i] for i, key in enumerate(keys)}
+
+def delay_series(json_data):
+    """
+    Prepare the response of `get_delay_table` for plotting.
+
+    Parameters
+    ----------
+    json_data : list of dict
+        The schedule variance data.
+
+    Returns
+    -------
+    dates : np.ndarray
+        Data dates as `datetime64[s]`
+    series : dict of np.ndarray
+        Cumulative `endDateVariance`, `criticalPathDelay` and `acceleration` (delay recovery with the sign flipped)
+    """
+    dates = to_datetime64([point['dataDate'] for point in json_data])
+    values = to_float_array([
+        [point['endDateVariance']['cumulative'], point['criticalPathDelay']['cumulative'], point['delayRecovery']['cumulative']]
+        for point in json_data
+    ]).reshape(len(json_data), 3)
+
+    return dates, {
+        'endDateVariance': values[:, 0],
+        'criticalPathDelay': values[:, 1],
+        'acceleration': -values[:, 2],  # values are inverse in response
+    }
+
+def change_series(json_data):
+    """
+    Prepare the response of `get_changes_summary` for plotting.
+
+    Parameters
+    ----------
+    json_data : list of dict
+        List of dictionaries containing the schedule change data.
+
+    Returns
+    -------
+    dates : np.ndarray
+        Data dates as `datetime64[s]`
+    series : dict of np.ndarray
+        Values of each metric in the first entry, over time
+    """
+    metrics = list(json_data[0]['metrics'])
+
+    dates = to_datetime64([entry['dataDate'] for entry in json_data])
+    values = to_float_array([[entry['metrics'][metric] for metric in metrics] for entry in json_data]).reshape(len(json_data), len(metrics))
+
+    return dates, {metric: values[:, i] for i, metric in enumerate(metrics)}
+
+def completion_counts(activities):
+    """
+    Count complete and incomplete activities of a `get_activities` response.
+
+    Parameters
+    ----------
+    activities : list of dict
+        Activities as returned by `get_activities`
+
+    Returns
+    -------
+    dict
+        `complete` activities, with a `percentComplete` of 100, and `incomplete` activities
+    """
+    complete_count = sum(1 for activity in activities if activity.get('percentComplete', 0) == 100.0)
+    return {
+        'complete': complete_count,
+        'incomplete': len(activities) - complete_count
+    }
+
+def has_values(values):
+    """Return True if any value is non-zero, ignoring NaN."""
+    return bool(np.any(np.nan_to_num(values)))
@@ -0,0 +1,340 @@
+import contextlib
+import contextvars
+import sys
+import threading
+import time
+
+from smartpm.instrumentation import Hook, subscribe, unsubscribe
+
+# Innermost call being profiled in the current context. A context variable rather than a thread-local,
+# so work submitted with `contextvars.copy_context()` is attributed to the call that submitted it
+_current_call = contextvars.ContextVar('smartpm_profiled_call', default=None)
+
+def request_key(event):
+    """
+    Identify the response a request fetches, so identical fetches can be grouped.
+
+    Parameters
+    ----------
+    event : smartpm.metrics.RequestEvent
+        Request made by the client
+
+    Returns
+    -------
+    tuple
+        Method, endpoint and sorted query parameters
+    """
+    params = tuple(sorted((name, repr(value)) for name, value in (event.params or {}).items() if value is not None))
+    return (event.method, event.endpoint, params)
+
+def _format_call(name, args, kwargs):
+    arguments = [repr(arg) for arg in args] + [f'{key}={value!r}' for key, value in kwargs.items()]
+    return f"{name}({', '.join(arguments)})"
+
+class CallNode:
+    """
+    A profiled call to an `api_wrapper` or `utility` function.
+
+    Attributes
+    ----------
+    name : str
+        Qualified name of the function, e.g. `Activity.plot_activity_distribution`
+    kind : str
+        `api_wrapper`, `utility` or `section` for blocks marked with `CallProfiler.section`
+    args : tuple
+        Positional arguments, without `self`
+    kwargs : dict
+        Keyword arguments
+    duration : float
+        Seconds the call took, None while it runs
+    error : Exception
+        Exception raised by the call, None if it succeeded
+    parent : CallNode
+        Call this call was made from, None for top-level calls
+    children : list of CallNode
+        Calls made from this call, in the order they started
+    requests : list of smartpm.metrics.RequestEvent
+        HTTP requests made directly by this call, not by its children
+    """
+    __slots__ = ('name', 'kind', 'args', 'kwargs', 'duration', 'error', 'parent', 'children', 'requests', '_event', '_token')
+
+    def __init__(self, name, kind, args, kwargs, parent=None):
+        self.name = name
+        self.kind = kind
+        self.args = args
+        self.kwargs = kwargs
+        self.duration = None
+        self.error = None
+        self.parent = parent
+        self.children = []
+        self.requests = []
+        self._event = None
+        self._token = None
+
+    @property
+    def label(self):
+        """The call as it would be written in code, e.g. `Scenarios.get_scenarios(40000)`."""
+        if self.kind == 'section':
+            return self.name
+        return _format_call(self.name, self.args, self.kwargs)
+
+    def walk(self):
+        """Yield this call and every call below it, depth first."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def all_requests(self):
+        """Return the requests made by this call and every call below it, in the order they were made."""
+        return sorted((request for node in self.walk() for request in node.requests), key=lambda request: request.start)
+
+    def duplicates(self):
+        """
+        Find identical requests made more than once within this call.
+
+        Returns
+        -------
+        list of dict
+            One entry per repeated fetch, with the `key` of the request (see `request_key`), the number of `requests`,
+            the number of `wasted` requests after the first one, their `wasted_seconds` and `wasted_bytes`,
+            and the `callers` directly below this call that made them. Requests served from a cache are not counted
+        """
+        groups = {}
+        for node in self.walk():
+            for request in node.requests:
+                if not request.cache_hit and request.error is None:
+                    groups.setdefault(request_key(request), []).append((node, request))
+
+        duplicates = []
+        for key, made in groups.items():
+            if len(made) < 2:
+                continue
+            made.sort(key=lambda pair: pair[1].start)
+            wasted = [request for _, request in made[1:]]
+            duplicates.append({
+                'key': key,
+                'requests': len(made),
+                'wasted': len(wasted),
+                'wasted_seconds': sum(request.duration for request in wasted),
+                'wasted_bytes': sum(request.response_bytes for request in wasted),
+                'callers': sorted({self._caller(node) for node, _ in made}),
+            })
+        return sorted(duplicates, key=lambda duplicate: -duplicate['wasted_seconds'])
+
+    def _caller(self, node):
+        # The call directly below this one that led to the request
+        while node.parent is not None and node.parent is not self:
+            node = node.parent
+        return node.name
+
+class CallProfiler(Hook):
+    """
+    Record the tree of `api_wrapper` and `utility` calls with the HTTP requests each of them made, and find
+    identical requests repeated within one top-level call.
+
+    Use it as a context manager around the code to profile:
+
+    >>> with CallProfiler(client) as profiler:
+    ...     Activity(client).plot_activity_distribution(project_id, scenario_id)
+    >>> profiler.print_report()
+
+    Parameters
+    ----------
+    *clients : SmartPMClient
+        Clients whose requests are recorded
+    """
+    def __init__(self, *clients):
+        self.clients = clients
+        self.roots = []
+        self.unattributed = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start recording calls and requests."""
+        subscribe(self)
+        for client in self.clients:
+            client.add_event_sink(self)
+        return self
+
+    def stop(self):
+        """Stop recording. The recorded calls are kept."""
+        unsubscribe(self)
+        for client in self.clients:
+            if self in client.event_sinks:
+                client.remove_event_sink(self)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _open(self, name, kind, args, kwargs):
+        parent = _current_call.get()
+        node = CallNode(name, kind, args, kwargs, parent)
+        if parent is None:
+            with self._lock:
+                self.roots.append(node)
+        else:
+            parent.children.append(node)
+        node._token = _current_call.set(node)
+        return node
+
+    @contextlib.contextmanager
+    def section(self, name):
+        """
+        Group the calls made in a block into one top-level call, e.g. the body of a loop in a script,
+        so requests repeated by separate SDK calls within the block are reported.
+
+        Parameters
+        ----------
+        name : str
+            Name of the block in the report
+        """
+        node = self._open(name, 'section', (), {})
+        start = time.perf_counter()
+        try:
+            yield node
+        except Exception as e:
+            node.error = e
+            raise
+        finally:
+            node.duration = time.perf_counter() - start
+            _current_call.reset(node._token)
+
+    def on_call_start(self, event):
+        node = self._open(event.name, event.kind, event.args, event.kwargs)
+        node._event = event
+
+    def _end(self, event):
+        # Calls end in the context they started in, so the innermost open call is this one,
+        # unless the call started before profiling did
+        node = _current_call.get()
+        if node is None or node._event is not event:
+            return
+        node.duration = event.duration
+        node.error = event.error
+        node._event = None
+        _current_call.reset(node._token)
+
+    on_call_end = _end
+    on_call_error = _end
+
+    def __call__(self, request):
+        node = _current_call.get()
+        if node is None:
+            with self._lock:
+                self.unattributed.append(request)
+        else:
+            node.requests.append(request)
+
+    def duplicates(self):
+        """
+        Find identical requests repeated within each top-level call.
+
+        Returns
+        -------
+        list of tuple
+            (top-level CallNode, duplicate) pairs, see `CallNode.duplicates`
+        """
+        return [(root, duplicate) for root in self.roots for duplicate in root.duplicates()]
+
+    def summary(self):
+        """
+        Totals of the recorded requests.
+
+        Returns
+        -------
+        dict
+            `calls` at the top level, `requests` and `request_seconds` in total, the `wasted_requests`
+            and `wasted_seconds` spent refetching responses already fetched within the same top-level call,
+            and the `repeated_across_calls` requests that an earlier top-level call had already made
+        """
+        requests = [request for root in self.roots for request in root.all_requests()] + self.unattributed
+        duplicates = [duplicate for _, duplicate in self.duplicates()]
+
+        seen = set()
+        repeated = 0
+        for root in self.roots:
+            keys = {request_key(request) for request in root.all_requests() if not request.cache_hit and request.error is None}
+            repeated += len(keys & seen)
+            seen |= keys
+
+        return {
+            'calls': len(self.roots),
+            'requests': len(requests),
+            'request_seconds': sum(request.duration for request in requests),
+            'wasted_requests': sum(duplicate['wasted'] for duplicate in duplicates),
+            'wasted_seconds': sum(duplicate['wasted_seconds'] for duplicate in duplicates),
+            'repeated_across_calls': repeated,
+        }
+
+    def format_tree(self, max_depth=None):
+        """
+        Render the recorded calls as an indented tree, with the requests made by each call.
+
+        Parameters
+        ----------
+        max_depth : int, default None
+            Deepest level to show, 0 for top-level calls only. If None, shows every level
+
+        Returns
+        -------
+        str
+        """
+        lines = []
+
+        def add(node, depth):
+            requests = node.all_requests()
+            status = f' !{type(node.error).__name__}' if node.error is not None else ''
+            lines.append(f"{'  ' * depth}{node.label}  {(node.duration or 0) * 1000:.1f} ms, {len(requests)} requests{status}")
+            if max_depth is not None and depth >= max_depth:
+                return
+            for request in node.requests:
+                lines.append(f"{'  ' * (depth + 1)}{request.method} {request.endpoint}  {request.status}  "
+                             f"{request.duration * 1000:.1f} ms  {request.response_bytes} B")
+            for child in node.children:
+                add(child, depth + 1)
+
+        for root in self.roots:
+            add(root, 0)
+        return '\n'.join(lines)
+
+    def format_report(self):
+        """Render the repeated fetches of each top-level call and the wasted requests and time in total."""
+        lines = []
+        duplicates = self.duplicates()
+        if duplicates:
+            lines.append('Repeated fetches within a top-level call:')
+            for root, duplicate in duplicates:
+                method, endpoint, params = duplicate['key']
+                query = '?' + '&'.join(f'{name}={value}' for name, value in params) if params else ''
+                lines.append(f"  {root.label}: {method} {endpoint}{query} fetched {duplicate['requests']} times by "
+                             f"{', '.join(duplicate['callers'])}, {duplicate['wasted_seconds'] * 1000:.1f} ms wasted")
+        else:
+            lines.append('No repeated fetches within a top-level call.')
+
+        summary = self.summary()
+        share = summary['wasted_requests'] / summary['requests'] if summary['requests'] else 0.0
+        lines.append(f"Wasted {summary['wasted_requests']} of {summary['requests']} requests ({share:.0%}) and "
+                     f"{summary['wasted_seconds'] * 1000:.1f} of {summary['request_seconds'] * 1000:.1f} ms of request time "
+                     f"in {summary['calls']} top-level calls")
+        if summary['repeated_across_calls']:
+            lines.append(f"{summary['repeated_across_calls']} requests repeated a fetch already made by an earlier top-level call")
+        return '\n'.join(lines)
+
+    def print_report(self, tree=False, file=None):
+        """
+        Print the repeated fetches and totals, see `format_report`.
+
+        Parameters
+        ----------
+        tree : bool, default False
+            If True, print the call tree first, see `format_tree`
+        file : file-like, default None
+            Stream to print to. If None, prints to stdout
+        """
+        file = file or sys.stdout
+        if tree:
+            print(self.format_tree(), file=file)
+        print(self.format_report(), file=file)
@@ -0,0 +1,97 @@
+import datetime
+import hashlib
+import json
+import os
+import tempfile
+
+def _today():
+    # The curve plots draw a line at the current date, so an image rendered on another day is stale
+    return datetime.date.today()
+
+class RenderCache:
+    """
+    Size-bounded on-disk cache of rendered images.
+
+    Entries are keyed by a hash of the plot, its input data, the render options and the current date, as the
+    curve plots mark today's date. When the cache grows beyond `max_bytes`, the least recently used entries are
+    evicted. The cache only touches the filesystem and never imports matplotlib, so it can be shared by worker
+    processes and checked before any plotting module is loaded.
+    """
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(plot_name, args, options):
+        """
+        Hash a plot, its input data, its render options and the current date into a cache key.
+
+        Parameters
+        ----------
+        plot_name : str
+            Name of the plotting function
+        args : tuple
+            Input data passed to the plotting function
+        options : dict
+            Format, resolution and style options
+
+        Returns
+        -------
+        str
+            Hex digest identifying the rendered image
+        """
+        payload = json.dumps([plot_name, args, options, _today().isoformat()], sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        """Return the cached image bytes, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        # Reads refresh the modification time, which is what eviction orders by
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return data
+
+    def put(self, key, data):
+        """Store image bytes and evict the least recently used entries if the cache is over its size limit."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # evicted by another process
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,163 @@
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from smartpm.logging_config import logger
+
+# Plot functions that can be batch rendered, keyed by the name used in render jobs
+PLOTS = {
+    'percent_complete_curve': 'plot_percent_complete_curve',
+    'earned_schedule_curve': 'plot_earned_schedule_curve',
+    'schedule_delay': 'plot_schedule_delay',
+    'schedule_changes': 'plot_schedule_changes',
+    'activity_distribution': 'plot_activity_distribution_by_month',
+    'gantt': 'plot_gantt',
+}
+
+FORMATS = ('png', 'svg', 'pdf')
+
+# Default figure size in inches of each plotting function
+FIGURE_SIZES = {
+    'plot_percent_complete_curve': (14, 6),
+    'plot_earned_schedule_curve': (14, 6),
+    'plot_schedule_delay': (14, 6),
+    'plot_schedule_changes': (14, 10),
+    'plot_activity_distribution_by_month': (14, 8),
+    'plot_gantt': (14, 10),
+}
+
+def _init_worker():
+    # Select the non-interactive backend in case anything in the worker process goes through pyplot
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+def render_figure(name, plot, args, output_dir, formats=('png',), dpi=100, cache=None):
+    """
+    Render one figure headless and save it in each format.
+
+    Parameters
+    ----------
+    name : str
+        File name of the figure without extension
+    plot : str
+        Name of the plot, see `PLOTS`
+    args : tuple
+        Positional arguments of the plot function, e.g. `(delay_table,)` or `(activities, scenario_details)`
+    output_dir : str
+        Directory to write the files to
+    formats : tuple of str, default ('png',)
+        File formats to write, any of `png`, `svg` and `pdf`
+    dpi : int, default 100
+        Resolution of raster formats
+    cache : smartpm.render_cache.RenderCache, default None
+        Cache of rendered images. If every format is cached, the figure is not drawn
+
+    Returns
+    -------
+    result : dict
+        `name`, written `files`, `seconds` spent plotting and saving and whether the images were `cached`
+    """
+    start = time.perf_counter()
+    function_name = PLOTS[plot]
+    figsize = FIGURE_SIZES[function_name]
+
+    images = {}
+    keys = {}
+    if cache is not None:
+        for fmt in formats:
+            keys[fmt] = cache.make_key(function_name, args, {'fmt': fmt, 'dpi': dpi, 'figsize': figsize})
+            images[fmt] = cache.get(keys[fmt])
+    cached = all(images.get(fmt) is not None for fmt in formats)
+
+    if not cached:
+        # Plotting modules are only imported when something has to be drawn, so cache hits never load matplotlib
+        from matplotlib.figure import Figure
+        from smartpm import visuals
+
+        # A standalone figure is never registered with pyplot, so jobs can run in threads and nothing is left behind
+        fig = Figure(figsize=figsize)
+        try:
+            getattr(visuals, function_name)(*args, ax=fig.add_subplot(), show=False)
+            for fmt in formats:
+                buffer = io.BytesIO()
+                fig.savefig(buffer, format=fmt, dpi=dpi)
+                images[fmt] = buffer.getvalue()
+                if cache is not None:
+                    cache.put(keys[fmt], images[fmt])
+        finally:
+            visuals.release_figure(fig)
+
+    files = []
+    for fmt in formats:
+        path = os.path.join(output_dir, f'{name}.{fmt}')
+        with open(path, 'wb') as f:
+            f.write(images[fmt])
+        files.append(path)
+
+    return {
+        'name': name,
+        'files': files,
+        'seconds': time.perf_counter() - start,
+        'cached': cached
+    }
+
+def render_batch(jobs, output_dir, formats=('png',), dpi=100, max_workers=None, use_threads=False, cache=None):
+    """
+    Render many figures headless with a pool of worker processes or threads.
+
+    Parameters
+    ----------
+    jobs : list of tuple
+        (name, plot, args) tuples, see `render_figure`. For example
+        `('project-123-delay', 'schedule_delay', (delay_table,))`
+    output_dir : str
+        Directory to write the files to, created if needed
+    formats : tuple of str, default ('png',)
+        File formats to write, any of `png`, `svg` and `pdf`
+    dpi : int, default 100
+        Resolution of raster formats
+    max_workers : int, default None
+        Number of workers. If None, uses the executor's default
+    use_threads : bool, default False
+        If True, render in a thread pool instead of a process pool. Threads avoid copying the data to
+        worker processes but share one interpreter, so processes are faster for CPU-bound batches
+    cache : smartpm.render_cache.RenderCache, default None
+        Cache of rendered images shared by the workers
+
+    Returns
+    -------
+    results : list of dict
+        One entry per job in the order given, with `name`, `files`, `seconds`, `cached` and `error` (None on success)
+    """
+    unknown_formats = set(formats) - set(FORMATS)
+    if unknown_formats:
+        raise ValueError(f"Unsupported formats: {sorted(unknown_formats)}")
+    unknown_plots = {plot for _, plot, _ in jobs} - set(PLOTS)
+    if unknown_plots:
+        raise ValueError(f"Unknown plots: {sorted(unknown_plots)}")
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    results = [None] * len(jobs)
+    start = time.perf_counter()
+    if use_threads:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    else:
+        executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker)
+
+    with executor:
+        futures = {
+            executor.submit(render_figure, name, plot, args, output_dir, formats, dpi, cache): i
+            for i, (name, plot, args) in enumerate(jobs)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = dict(future.result(), error=None)
+            except Exception as e:
+                logger.warning("Rendering %s failed: %s", jobs[i][0], e)
+                results[i] = {'name': jobs[i][0], 'files': [], 'seconds': None, 'cached': False, 'error': str(e)}
+
+    logger.info("Rendered %s figures in %.2fs", len(jobs), time.perf_counter() - start)
+    return results
@@ -0,0 +1,245 @@
+import collections
+import contextlib
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+
+from smartpm.logging_config import logger
+
+# Priority classes of requests
+INTERACTIVE = 'interactive'
+BATCH = 'batch'
+
+# Share of the rate limit each class gets while all of them have requests waiting
+DEFAULT_WEIGHTS = {INTERACTIVE: 8, BATCH: 1}
+
+# Queue times kept per class to compute percentiles from
+QUEUE_TIME_SAMPLES = 1024
+
+# Priority class of the requests made in the current context. A context variable, so work submitted
+# with `contextvars.copy_context()`, e.g. the tasks of `smartpm.tasks.TaskGraph`, keeps the caller's priority
+_priority = contextvars.ContextVar('smartpm_priority', default=None)
+
+@contextlib.contextmanager
+def request_priority(name):
+    """
+    Make the requests sent within a block with a priority class, e.g. `batch` for a nightly crawl.
+
+    >>> with request_priority(BATCH):
+    ...     crawl_portfolio(client, store)
+
+    Parameters
+    ----------
+    name : str
+        Priority class, one of the weights of the client's `RequestScheduler`
+    """
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority():
+    """Return the priority class set by `request_priority` for the current context, None if none is set."""
+    return _priority.get()
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else None
+
+class TokenBucket:
+    """
+    Allow `rate` requests per second on average, with bursts of up to `burst` requests.
+    Not thread-safe on its own, callers hold a lock around it.
+
+    Parameters
+    ----------
+    rate : float
+        Tokens added per second
+    burst : float, default None
+        Most tokens the bucket holds. If None, one second's worth of tokens, and at least one
+    """
+    def __init__(self, rate, burst=None):
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, got {rate}")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+
+    def take(self):
+        """
+        Take a token if one is available.
+
+        Returns
+        -------
+        float
+            0.0 if a token was taken, otherwise the seconds until the next one is available
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+    def block(self, seconds):
+        """Hand out no tokens for the next `seconds` and start empty afterwards, e.g. after a 429 response."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+class RequestScheduler:
+    """
+    Order the requests of one or more clients by priority class within a shared rate limit.
+
+    Requests wait in a weighted fair queue: while several classes have requests waiting, each class gets a share of
+    the rate proportional to its weight, and a request of a class with nothing waiting is sent ahead of the backlog of
+    the others. With the default weights, a dashboard's `interactive` requests jump ahead of a crawl's queued `batch`
+    requests, while the crawl still gets one in nine requests when both are busy.
+
+    >>> scheduler = RequestScheduler(rate=10)
+    >>> client = SmartPMClient(api_key, company_id, scheduler=scheduler)
+    >>> with request_priority(BATCH):
+    ...     crawl_portfolio(client, store)
+
+    Parameters
+    ----------
+    rate : float
+        Requests per second sent by all clients sharing the scheduler
+    burst : float, default None
+        Requests that can be sent at once after a quiet period, see `TokenBucket`
+    weights : dict, default None
+        Weight of each priority class. If None, uses `DEFAULT_WEIGHTS`
+    default_priority : str, default 'interactive'
+        Class of requests made outside of `request_priority`
+    """
+    def __init__(self, rate, burst=None, weights=None, default_priority=INTERACTIVE):
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        if default_priority not in self.weights:
+            raise ValueError(f"Default priority {default_priority!r} has no weight")
+        self.default_priority = default_priority
+        self.bucket = TokenBucket(rate, burst)
+
+        self._queue = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._last_finish = {}
+        self._waiting = collections.Counter()
+        self._stats = {name: {'requests': 0, 'queue_seconds': 0.0, 'max_queue_seconds': 0.0,
+                              'samples': collections.deque(maxlen=QUEUE_TIME_SAMPLES)} for name in self.weights}
+        self._condition = threading.Condition()
+
+    def resolve(self, priority=None):
+        """
+        Return the class a request is queued in.
+
+        Parameters
+        ----------
+        priority : str, default None
+            Class to use. If None, uses the class set by `request_priority`, or `default_priority`
+
+        Returns
+        -------
+        str
+        """
+        priority = priority or current_priority() or self.default_priority
+        if priority not in self.weights:
+            raise ValueError(f"Unknown priority {priority!r}, expected one of {sorted(self.weights)}")
+        return priority
+
+    def acquire(self, priority=None):
+        """
+        Wait until a request may be sent.
+
+        Parameters
+        ----------
+        priority : str, default None
+            Class of the request, see `resolve`
+
+        Returns
+        -------
+        float
+            Seconds the request waited in the queue
+        """
+        priority = self.resolve(priority)
+        start = time.perf_counter()
+        with self._condition:
+            # Self-clocked fair queuing: the finish tag of a request follows the last one of its class,
+            # or the tag of the request sent last if the class had nothing waiting
+            finish = max(self._virtual_time, self._last_finish.get(priority, 0.0)) + 1.0 / self.weights[priority]
+            self._last_finish[priority] = finish
+            entry = (finish, next(self._sequence))
+            heapq.heappush(self._queue, entry)
+            self._waiting[priority] += 1
+            self._condition.notify_all()
+
+            try:
+                while True:
+                    if self._queue[0] is entry:
+                        wait = self.bucket.take()
+                        if wait == 0.0:
+                            heapq.heappop(self._queue)
+                            self._virtual_time = finish
+                            break
+                        self._condition.wait(wait)
+                    else:
+                        self._condition.wait()
+            except BaseException:
+                # An interrupted wait, e.g. KeyboardInterrupt, must not leave its entry at the head of the queue
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                raise
+            finally:
+                self._waiting[priority] -= 1
+                self._condition.notify_all()
+
+            waited = time.perf_counter() - start
+            stats = self._stats[priority]
+            stats['requests'] += 1
+            stats['queue_seconds'] += waited
+            stats['max_queue_seconds'] = max(stats['max_queue_seconds'], waited)
+            stats['samples'].append(waited)
+        return waited
+
+    def pause(self, seconds):
+        """
+        Send no request for a while, e.g. when the API answered 429, so queued requests do not hit the limit too.
+
+        Parameters
+        ----------
+        seconds : float
+            Seconds to wait before sending the next request
+        """
+        logger.debug("Pausing request scheduler for %.2fs", seconds)
+        with self._condition:
+            self.bucket.block(seconds)
+            self._condition.notify_all()
+
+    def stats(self):
+        """
+        Queue times per priority class.
+
+        Returns
+        -------
+        dict
+            Class mapped to the number of `requests` sent and `waiting`, the `mean`, `p50`, `p95` and `max` seconds
+            spent in the queue. Percentiles cover the last `QUEUE_TIME_SAMPLES` requests and are None before the first
+        """
+        with self._condition:
+            return {
+                name: {
+                    'requests': stats['requests'],
+                    'waiting': self._waiting[name],
+                    'mean': stats['queue_seconds'] / stats['requests'] if stats['requests'] else None,
+                    'p50': _percentile(stats['samples'], 0.50),
+                    'p95': _percentile(stats['samples'], 0.95),
+                    'max': stats['max_queue_seconds'],
+                }
+                for name, stats in self._stats.items()
+            }
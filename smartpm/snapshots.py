@@ -0,0 +1,180 @@
+import gzip
+import json
+import os
+import stat
+import tempfile
+
+from smartpm.exceptions import SnapshotExistsError
+from smartpm.logging_config import logger
+
+SNAPSHOT_SUFFIX = '.json.gz'
+
+def normalize_data_date(data_date):
+    """
+    Normalize a data date to the `yyyy-MM-dd` format used by the API and the snapshot store.
+
+    Parameters
+    ----------
+    data_date : str
+        Data date as returned by the API, e.g. `2024-05-01` or `2024-05-01T00:00:00`
+
+    Returns
+    -------
+    str
+        Data date in format `yyyy-MM-dd`
+    """
+    return str(data_date)[:10]
+
+class SnapshotStore:
+    """
+    On-disk store of immutable scenario snapshots, one gzipped JSON file per data date.
+
+    Files are laid out as `<root>/<project_id>/<scenario_id>/<yyyy-MM-dd>.json.gz`.
+    A snapshot is written once and never overwritten.
+    """
+    def __init__(self, root):
+        self.root = root
+
+    def scenario_dir(self, project_id, scenario_id):
+        """Directory holding the snapshots of a scenario."""
+        return os.path.join(self.root, str(project_id), str(scenario_id))
+
+    def snapshot_path(self, project_id, scenario_id, data_date):
+        """
+        Path of the snapshot file for a scenario and data date.
+
+        Parameters
+        ----------
+        project_id : str
+            ID of the project containing the scenario
+        scenario_id : str
+            ID of the scenario
+        data_date : str
+            Data date of the snapshot
+
+        Returns
+        -------
+        str
+            Path to the snapshot file (which may not exist yet)
+        """
+        filename = normalize_data_date(data_date) + SNAPSHOT_SUFFIX
+        return os.path.join(self.scenario_dir(project_id, scenario_id), filename)
+
+    def has_snapshot(self, project_id, scenario_id, data_date):
+        """Return True if a snapshot has already been stored for the data date."""
+        return os.path.exists(self.snapshot_path(project_id, scenario_id, data_date))
+
+    def list_data_dates(self, project_id, scenario_id):
+        """
+        List the data dates that have been stored for a scenario.
+
+        Parameters
+        ----------
+        project_id : str
+            ID of the project containing the scenario
+        scenario_id : str
+            ID of the scenario
+
+        Returns
+        -------
+        list of str
+            Sorted data dates in format `yyyy-MM-dd`
+        """
+        scenario_dir = self.scenario_dir(project_id, scenario_id)
+        if not os.path.isdir(scenario_dir):
+            return []
+
+        return sorted(
+            filename[:-len(SNAPSHOT_SUFFIX)]
+            for filename in os.listdir(scenario_dir)
+            if filename.endswith(SNAPSHOT_SUFFIX)
+        )
+
+    def write_snapshot(self, project_id, scenario_id, data_date, details, activities):
+        """
+        Store the scenario details and activities for a data date.
+
+        The file is written to a temporary name and then linked into place, so readers never
+        see a partially written snapshot and an interrupted write leaves nothing behind.
+
+        Parameters
+        ----------
+        project_id : str
+            ID of the project containing the scenario
+        scenario_id : str
+            ID of the scenario
+        data_date : str
+            Data date of the snapshot
+        details : dict
+            Response of `get_scenario_details` for the data date
+        activities : list of dict
+            Response of `get_activities` for the data date
+
+        Returns
+        -------
+        str
+            Path to the stored snapshot
+
+        Raises
+        ------
+        SnapshotExistsError
+            If a snapshot for the data date has already been stored
+        """
+        path = self.snapshot_path(project_id, scenario_id, data_date)
+        if os.path.exists(path):
+            raise SnapshotExistsError(f'Snapshot already exists: {path}')
+
+        scenario_dir = os.path.dirname(path)
+        os.makedirs(scenario_dir, exist_ok=True)
+
+        snapshot = {
+            'projectId': project_id,
+            'scenarioId': scenario_id,
+            'dataDate': normalize_data_date(data_date),
+            'details': details,
+            'activities': activities
+        }
+
+        fd, tmp_path = tempfile.mkstemp(dir=scenario_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                f.write(json.dumps(snapshot).encode('utf-8'))
+            os.chmod(tmp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            try:
+                # os.link fails if the target exists, which makes the write-once check atomic
+                os.link(tmp_path, path)
+            except FileExistsError:
+                raise SnapshotExistsError(f'Snapshot already exists: {path}')
+            except OSError:
+                # Filesystems without hard links
+                if os.path.exists(path):
+                    raise SnapshotExistsError(f'Snapshot already exists: {path}')
+                os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        logger.debug("Stored snapshot %s", path)
+        return path
+
+    def read_snapshot(self, project_id, scenario_id, data_date):
+        """
+        Read a stored snapshot.
+
+        Parameters
+        ----------
+        project_id : str
+            ID of the project containing the scenario
+        scenario_id : str
+            ID of the scenario
+        data_date : str
+            Data date of the snapshot
+
+        Returns
+        -------
+        dict
+            Snapshot with `projectId`, `scenarioId`, `dataDate`, `details` and `activities` keys
+        """
+        path = self.snapshot_path(project_id, scenario_id, data_date)
+        with gzip.open(path, 'rb') as f:
+            return json.loads(f.read().decode('utf-8'))
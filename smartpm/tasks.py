@@ -0,0 +1,185 @@
+import atexit
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from smartpm.logging_config import logger
+
+# Threads shared by every task graph
+DEFAULT_MAX_WORKERS = 8
+
+# Set to 1 to run every task graph in the calling thread, one task after the other, e.g. while debugging
+SEQUENTIAL_ENV = 'SMARTPM_SEQUENTIAL'
+
+_sequential = os.getenv(SEQUENTIAL_ENV, '').lower() in ('1', 'true', 'yes')
+_executor = None
+_executor_lock = threading.Lock()
+
+def set_sequential(enabled=True):
+    """
+    Run task graphs in the calling thread, in the order their tasks were added, instead of concurrently.
+    Stack traces and debuggers then follow the code as if it had been written sequentially.
+
+    Parameters
+    ----------
+    enabled : bool, default True
+        If False, task graphs run concurrently again
+    """
+    global _sequential
+    _sequential = enabled
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix='smartpm-task')
+                atexit.register(_executor.shutdown, wait=False)
+    return _executor
+
+# States of a task
+PENDING, SCHEDULED, RUNNING, DONE, CANCELLED = 'pending', 'scheduled', 'running', 'done', 'cancelled'
+
+class _Task:
+    __slots__ = ('name', 'func', 'args', 'kwargs', 'after', 'context', 'state', 'result', 'error')
+
+    def __init__(self, name, func, args, kwargs, after):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.after = after
+        self.context = None
+        self.state = PENDING
+        self.result = None
+        self.error = None
+
+class TaskGraph:
+    """
+    Run a few dependent calls concurrently, so the time a composite utility takes is that of its
+    slowest chain of requests rather than the sum of all of them.
+
+    Tasks run on a thread pool shared by all graphs, in a copy of the caller's context so instrumentation
+    and profiling see them as part of the calling utility. The calling thread runs tasks too, rather than
+    only waiting, so graphs started from inside another graph's task always make progress.
+
+    >>> graph = TaskGraph()
+    >>> graph.add('details', scenarios_api.get_scenario_details, project_id, scenario_id)
+    >>> graph.add('activities', activity_api.get_activities, project_id, scenario_id)
+    >>> graph.add('plot', lambda details, activities: plot(activities, details), after=['details', 'activities'])
+    >>> graph.run()['plot']
+
+    Parameters
+    ----------
+    sequential : bool, default None
+        If True, run the tasks in the calling thread in the order they were added. If None, uses the
+        setting of `set_sequential`, which defaults to the `SMARTPM_SEQUENTIAL` environment variable
+    """
+    def __init__(self, sequential=None):
+        self.sequential = _sequential if sequential is None else sequential
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self._finished = threading.Condition(self._lock)
+
+    def add(self, name, func, *args, after=(), **kwargs):
+        """
+        Add a task to the graph.
+
+        Parameters
+        ----------
+        name : str
+            Name of the task, used as the key of its result
+        func : callable
+            Function to call
+        *args
+            Positional arguments of `func`
+        after : list of str, default ()
+            Tasks that have to finish first. Their results are passed to `func` as keyword arguments named after them
+        **kwargs
+            Keyword arguments of `func`
+
+        Returns
+        -------
+        str
+            The name of the task, to use in `after` of later tasks
+        """
+        if name in self._tasks:
+            raise ValueError(f"Task {name!r} already added")
+        unknown = [dependency for dependency in after if dependency not in self._tasks]
+        if unknown:
+            # Dependencies have to be added first, which also rules out cycles
+            raise ValueError(f"Task {name!r} depends on unknown tasks: {unknown}")
+        self._tasks[name] = _Task(name, func, args, kwargs, tuple(after))
+        return name
+
+    def _claim(self, task):
+        with self._lock:
+            if task.state != SCHEDULED:
+                return False
+            task.state = RUNNING
+            return True
+
+    def _execute(self, task):
+        try:
+            kwargs = dict(task.kwargs, **{dependency: self._tasks[dependency].result for dependency in task.after})
+            task.result = task.context.run(task.func, *task.args, **kwargs)
+        except BaseException as e:
+            task.error = e
+        with self._finished:
+            task.state = DONE
+            self._finished.notify_all()
+
+    def _execute_if_unclaimed(self, task):
+        if self._claim(task):
+            self._execute(task)
+
+    def run(self):
+        """
+        Run every task, each as soon as the tasks it depends on have finished.
+
+        Returns
+        -------
+        dict
+            Result of each task by name
+
+        Raises
+        ------
+        Exception
+            The error of the first failed task, in the order the tasks were added. Tasks that had not
+            started when a task failed are not run
+        """
+        tasks = list(self._tasks.values())
+
+        while True:
+            if any(task.error is not None for task in tasks):
+                with self._lock:
+                    for task in tasks:
+                        if task.state in (PENDING, SCHEDULED):
+                            task.state = CANCELLED
+            else:
+                for task in tasks:
+                    if task.state == PENDING and all(self._tasks[dependency].state == DONE and self._tasks[dependency].error is None
+                                                     for dependency in task.after):
+                        task.context = contextvars.copy_context()
+                        task.state = SCHEDULED
+                        if not self.sequential:
+                            _get_executor().submit(self._execute_if_unclaimed, task)
+
+            # Run a scheduled task here instead of waiting for a pool thread to pick it up
+            task = next((task for task in tasks if task.state == SCHEDULED and self._claim(task)), None)
+            if task is not None:
+                self._execute(task)
+                continue
+
+            with self._finished:
+                if all(task.state in (DONE, CANCELLED) for task in tasks):
+                    break
+                if any(task.state == RUNNING for task in tasks):
+                    self._finished.wait()
+
+        errors = [task for task in tasks if task.error is not None]
+        if errors:
+            logger.debug("Task %s failed: %r", errors[0].name, errors[0].error)
+            raise errors[0].error
+        return {task.name: task.result for task in tasks}
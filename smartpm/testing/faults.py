@@ -0,0 +1,130 @@
+import math
+import random
+import threading
+
+class FaultAction:
+    """
+    What the stub server does to one response.
+
+    Attributes
+    ----------
+    delay : float
+        Seconds to wait before answering
+    status : int
+        Status code to answer with instead of the real response, None to answer normally
+    headers : dict
+        Extra headers of the injected error, e.g. Retry-After
+    truncate : bool
+        If True, only half of the body is sent before the connection is closed
+    bandwidth : int
+        Bytes per second the body is streamed at, None to send it at once
+    """
+    __slots__ = ('delay', 'status', 'headers', 'truncate', 'bandwidth')
+
+    def __init__(self, delay=0.0, status=None, headers=None, truncate=False, bandwidth=None):
+        self.delay = delay
+        self.status = status
+        self.headers = headers or {}
+        self.truncate = truncate
+        self.bandwidth = bandwidth
+
+class FaultProfile:
+    """
+    Latency and failures injected by `smartpm.testing.stub_server.StubServer`, to see how the client copes
+    with a slow or throttling API.
+
+    Random choices come from a seeded generator and the 429 bursts follow the request count, so a profile
+    injects the same faults on every run with the same request order.
+
+    Parameters
+    ----------
+    name : str, default 'custom'
+        Name shown in reports
+    latency : tuple, default None
+        Distribution of the delay before each response: `('fixed', seconds)`, `('uniform', low, high)`
+        or `('lognormal', median, sigma)`. If None, no delay
+    error_rate : float, default 0.0
+        Share of requests answered with one of `error_statuses`
+    error_statuses : tuple of int, default (500, 502, 503)
+        Status codes of injected errors
+    rate_limit_every : int, default 0
+        After every `rate_limit_every` requests, a burst of 429 responses starts. 0 disables rate limiting
+    rate_limit_burst : int, default 5
+        Number of requests answered with 429 in each burst
+    retry_after : int, default 1
+        Seconds sent in the Retry-After header of 429 responses, None to leave the header out
+    truncate_rate : float, default 0.0
+        Share of responses whose body is cut off halfway
+    bandwidth : int, default None
+        Bytes per second bodies are streamed at. If None, bodies are sent at once
+    seed : int, default 0
+        Seed of the random choices
+    """
+    def __init__(self, name='custom', latency=None, error_rate=0.0, error_statuses=(500, 502, 503), rate_limit_every=0,
+                 rate_limit_burst=5, retry_after=1, truncate_rate=0.0, bandwidth=None, seed=0):
+        if latency is not None and latency[0] not in ('fixed', 'uniform', 'lognormal'):
+            raise ValueError(f"Unknown latency distribution: {latency[0]}")
+
+        self.name = name
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.rate_limit_every = rate_limit_every
+        self.rate_limit_burst = rate_limit_burst
+        self.retry_after = retry_after
+        self.truncate_rate = truncate_rate
+        self.bandwidth = bandwidth
+        self.seed = seed
+        self.reset()
+
+    def reset(self):
+        """Restart the random choices and the request count, e.g. between benchmark runs."""
+        self._random = random.Random(self.seed)
+        self._requests = 0
+        self._lock = threading.Lock()
+
+    def _sample_latency(self):
+        kind, *args = self.latency
+        if kind == 'fixed':
+            return args[0]
+        if kind == 'uniform':
+            return self._random.uniform(*args)
+        median, sigma = args
+        return self._random.lognormvariate(math.log(median), sigma)
+
+    def next_action(self):
+        """
+        Decide the faults of the next response.
+
+        Returns
+        -------
+        FaultAction
+        """
+        with self._lock:
+            self._requests += 1
+            delay = self._sample_latency() if self.latency else 0.0
+
+            cycle = self.rate_limit_every + self.rate_limit_burst
+            if self.rate_limit_every and (self._requests - 1) % cycle >= self.rate_limit_every:
+                headers = {'Retry-After': str(self.retry_after)} if self.retry_after is not None else {}
+                return FaultAction(delay, 429, headers)
+
+            if self.error_rate and self._random.random() < self.error_rate:
+                return FaultAction(delay, self._random.choice(self.error_statuses))
+
+            truncate = bool(self.truncate_rate) and self._random.random() < self.truncate_rate
+            return FaultAction(delay, truncate=truncate, bandwidth=self.bandwidth)
+
+    def __repr__(self):
+        return f'FaultProfile({self.name!r})'
+
+# Profiles used by the resilience benchmark, built fresh on every call so their request counts start at 0
+PROFILES = {
+    'healthy': lambda: FaultProfile('healthy'),
+    'slow': lambda: FaultProfile('slow', latency=('lognormal', 0.05, 0.8)),
+    'throttled': lambda: FaultProfile('throttled', latency=('uniform', 0.005, 0.02), rate_limit_every=40, rate_limit_burst=8),
+    'flaky': lambda: FaultProfile('flaky', latency=('uniform', 0.005, 0.02), error_rate=0.05, truncate_rate=0.02),
+    'congested': lambda: FaultProfile('congested', latency=('fixed', 0.02), bandwidth=512 * 1024),
+    'degraded': lambda: FaultProfile('degraded', latency=('lognormal', 0.05, 1.0), error_rate=0.03, rate_limit_every=60,
+                                     rate_limit_burst=5, truncate_rate=0.01, bandwidth=1024 * 1024),
+}
@@ -0,0 +1,246 @@
+import argparse
+import functools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from smartpm.logging_config import logger
+from smartpm.testing.faults import PROFILES
+from smartpm.testing.synthetic import SyntheticPortfolio
+
+# Routes of the SmartPM API the endpoint classes use, relative to `/public`.
+# Each route maps to a function of (portfolio, path match, query) that returns the response, or None for a 404
+ROUTES = [
+    (r'v1/projects', lambda portfolio, match, query: portfolio.projects(
+        plan_ids={value.split(':', 1)[1] for value in query.get('filters', []) if value.startswith('PROJECT_PLAN_ID:')})),
+    (r'v1/projects/(?P<project_id>[^/]+)', lambda portfolio, match, query: portfolio.project(match['project_id'])),
+    (r'v1/projects/(?P<project_id>[^/]+)/comments', lambda portfolio, match, query: portfolio.comments(match['project_id'])),
+    (r'v1/projects/(?P<project_id>[^/]+)/models', lambda portfolio, match, query: portfolio.models(match['project_id'])),
+    (r'v1/projects/(?P<project_id>[^/]+)/scenarios', lambda portfolio, match, query: portfolio.scenarios(match['project_id'])),
+    (r'v1/projects/(?P<project_id>[^/]+)/scenarios/(?P<scenario_id>[^/]+)', lambda portfolio, match, query: portfolio.scenario_details(
+        match['project_id'], match['scenario_id'], _first(query, 'dataDate'))),
+    (r'v1/projects/(?P<project_id>[^/]+)/scenarios/(?P<scenario_id>[^/]+)/activities', lambda portfolio, match, query: portfolio.activities(
+        match['project_id'], match['scenario_id'], _first(query, 'dataDate'))),
+    (r'v1/projects/(?P<project_id>[^/]+)/scenarios/(?P<scenario_id>[^/]+)/schedules', lambda portfolio, match, query: portfolio.schedule_uploads(
+        match['project_id'], match['scenario_id'])),
+    (r'v1/projects/(?P<project_id>[^/]+)/scenarios/(?P<scenario_id>[^/]+)/delay', lambda portfolio, match, query: portfolio.delay_table(
+        match['project_id'], match['scenario_id'])),
+    (r'v1/projects/(?P<project_id>[^/]+)/scenarios/(?P<scenario_id>[^/]+)/change-log-summary', lambda portfolio, match, query: portfolio.changes_summary(
+        match['project_id'], match['scenario_id'])),
+    (r'v1/projects/(?P<project_id>[^/]+)/scenarios/(?P<scenario_id>[^/]+)/change-log', lambda portfolio, match, query: portfolio.change_log(
+        match['project_id'], match['scenario_id'])),
+    (r'v1/projects/(?P<project_id>[^/]+)/scenarios/(?P<scenario_id>[^/]+)/earned-schedule-curve', lambda portfolio, match, query: portfolio.earned_schedule_curve(
+        match['project_id'], match['scenario_id'])),
+    (r'v2/projects/(?P<project_id>[^/]+)/scenarios/(?P<scenario_id>[^/]+)/percent-complete-curve', lambda portfolio, match, query: portfolio.percent_complete_curve(
+        match['project_id'], match['scenario_id'], _first(query, 'delta') == 'true')),
+    (r'v1/projects/(?P<project_id>[^/]+)/scenarios/(?P<scenario_id>[^/]+)/schedule-quality', lambda portfolio, match, query: portfolio.schedule_quality(
+        match['project_id'], match['scenario_id'], _first(query, 'importLogId'), _first(query, 'qualityProfileId'))),
+    (r'v1/projects/(?P<project_id>[^/]+)/scenarios/(?P<scenario_id>[^/]+)/schedule-compression', lambda portfolio, match, query: portfolio.schedule_compression(
+        match['project_id'], match['scenario_id'], _first(query, 'dataDate'))),
+    (r'v1/quality-profiles', lambda portfolio, match, query: portfolio.quality_profiles()),
+    (r'v1/quality-profiles/(?P<quality_profile_id>[^/]+)', lambda portfolio, match, query: portfolio.quality_profile(match['quality_profile_id'])),
+]
+
+_COMPILED_ROUTES = [(re.compile(pattern + '$'), handler) for pattern, handler in ROUTES]
+
+def _first(query, name):
+    values = query.get(name)
+    return values[0] if values else None
+
+def dispatch(portfolio, path, query=None):
+    """
+    Answer a request to the SmartPM API from a synthetic portfolio.
+
+    Parameters
+    ----------
+    portfolio : smartpm.testing.synthetic.SyntheticPortfolio
+        Portfolio to answer from
+    path : str
+        Request path, with or without the `/public/` prefix, e.g. `v1/projects/40000/scenarios`
+    query : dict of list, default None
+        Query parameters as parsed by `urllib.parse.parse_qs`
+
+    Returns
+    -------
+    status : int
+        HTTP status code
+    payload : dict or list
+        Response JSON
+    """
+    query = query or {}
+    path = path.strip('/')
+    if path.startswith('public/'):
+        path = path[len('public/'):]
+
+    for pattern, handler in _COMPILED_ROUTES:
+        match = pattern.match(path)
+        if match is None:
+            continue
+
+        ids = match.groupdict()
+        if 'project_id' in ids and not portfolio.has_project(ids['project_id']):
+            return 404, {'message': 'Project not found'}
+        if 'scenario_id' in ids and not portfolio.has_scenario(ids['project_id'], ids['scenario_id']):
+            return 404, {'message': 'Scenario not found'}
+
+        payload = handler(portfolio, match, query)
+        if payload is None:
+            return 404, {'message': 'Resource not found'}
+        return 200, payload
+
+    return 404, {'message': f'No route for {path}'}
+
+def encode_json(payload):
+    """Encode a response the way the API sends it, without whitespace."""
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """Serve the SmartPM API from the server's portfolio. Requests without an API key are rejected like the real API."""
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, without this small responses wait for the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if not self.headers.get('X-API-KEY'):
+            self.send_json(401, {'message': 'Unauthorized'})
+            return
+
+        faults = self.server.faults
+        if faults is None:
+            self.send_body(*self.server.respond(url.path, url.query))
+            return
+
+        action = faults.next_action()
+        if action.delay:
+            time.sleep(action.delay)
+        if action.status is not None:
+            self.send_json(action.status, {'message': f'Injected {action.status}'}, action.headers)
+        else:
+            status, body = self.server.respond(url.path, url.query)
+            self.send_body(status, body, truncate=action.truncate, bandwidth=action.bandwidth)
+
+    def send_json(self, status, payload, headers=None):
+        self.send_body(status, encode_json(payload), headers)
+
+    def send_body(self, status, body, headers=None, truncate=False, bandwidth=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        if truncate:
+            # Promise the whole body but close the connection halfway through it
+            body = body[:len(body) // 2]
+            self.close_connection = True
+        if not bandwidth:
+            self.wfile.write(body)
+            return
+
+        # Stream in chunks of 1/20 s worth of bytes
+        chunk_size = max(1, bandwidth // 20)
+        for offset in range(0, len(body), chunk_size):
+            self.wfile.write(body[offset:offset + chunk_size])
+            time.sleep(chunk_size / bandwidth)
+
+    def log_message(self, format, *args):
+        logger.debug("Stub server: " + format, *args)
+
+class StubServer:
+    """
+    Local stand-in for the SmartPM API, served from a synthetic portfolio in a background thread.
+
+    Use it as a context manager and point the client at `base_url`:
+
+    >>> with StubServer(SyntheticPortfolio(projects=5, activities=1000)) as server:
+    ...     client = SmartPMClient('any-key', 'any-company', base_url=server.base_url)
+
+    Parameters
+    ----------
+    portfolio : smartpm.testing.synthetic.SyntheticPortfolio, default None
+        Portfolio to serve. If None, a default `SyntheticPortfolio()`
+    host : str, default '127.0.0.1'
+        Interface to listen on
+    port : int, default 0
+        Port to listen on, 0 picks a free port
+    handler_class : type, default StubRequestHandler
+        Request handler, subclass `StubRequestHandler` to change how requests are answered
+    cache_size : int, default 64
+        Number of encoded responses kept in memory, so repeated requests measure the client rather than the generator
+    faults : smartpm.testing.faults.FaultProfile, default None
+        Latency and failures to inject into responses, see `smartpm.testing.faults.PROFILES`. If None, answers normally
+    """
+    def __init__(self, portfolio=None, host='127.0.0.1', port=0, handler_class=StubRequestHandler, cache_size=64, faults=None):
+        self.portfolio = portfolio or SyntheticPortfolio()
+        self.host = host
+        self.port = port
+        self.handler_class = handler_class
+        self.cache_size = cache_size
+        self.faults = faults
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """Base URL to pass to `SmartPMClient`."""
+        return f'http://{self.host}:{self.port}/public'
+
+    def _respond(self, path, query_string):
+        status, payload = dispatch(self.portfolio, path, parse_qs(query_string))
+        return status, encode_json(payload)
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._server = ThreadingHTTPServer((self.host, self.port), self.handler_class)
+        self._server.daemon_threads = True
+        self._server.portfolio = self.portfolio
+        self._server.faults = self.faults
+        self._server.respond = functools.lru_cache(maxsize=self.cache_size)(self._respond)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='smartpm-stub-server', daemon=True)
+        self._thread.start()
+        logger.debug("Stub server listening on %s", self.base_url)
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a synthetic SmartPM API locally')
+    parser.add_argument('--projects', type=int, default=10)
+    parser.add_argument('--scenarios', type=int, default=2)
+    parser.add_argument('--activities', type=int, default=500)
+    parser.add_argument('--uploads', type=int, default=12)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--faults', choices=sorted(PROFILES), help='Inject the latency and failures of a fault profile')
+    args = parser.parse_args()
+
+    portfolio = SyntheticPortfolio(args.projects, args.scenarios, args.activities, args.uploads, args.seed)
+    faults = PROFILES[args.faults]() if args.faults else None
+    server = StubServer(portfolio, args.host, args.port, faults=faults).start()
+    print(f"Serving {args.projects} projects at {server.base_url}, press Ctrl+C to stop")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,443 @@
+import collections
+import datetime
+import random
+import threading
+
+# Project plans of generated projects, the first three are the plans `get_active_projects` filters on
+PROJECT_PLAN_IDS = [
+    '1164d4b6-9635-42ca-b004-37907055b285',
+    '6698a06d-a690-4a8d-8bb9-07ebd96ba320',
+    '9beb9b50-649b-48b1-a367-9b937c75cee3',
+    '0b657f37-e317-4d65-9ebd-b4f6f0aae4b1',
+]
+
+SCENARIO_NAMES = ['Full Schedule', 'Critical Path', 'Near Critical', 'Owner Milestones', 'Procurement']
+
+CHANGE_METRICS = [
+    'CriticalChanges', 'NearCriticalChanges', 'ActivityChanges', 'LogicChanges',
+    'CalendarChanges', 'DurationChanges', 'DelayedActivityChanges'
+]
+
+QUALITY_METRICS = [
+    'MISSING_LOGIC', 'LOGIC_DENSITY', 'CRITICAL', 'HARD_CONSTRAINTS', 'NEGATIVE_FLOAT', 'HIGH_FLOAT',
+    'HIGH_DURATION', 'LAGS', 'LEADS', 'RELATIONSHIPS_FINISH_TO_START', 'RELATIONSHIPS_START_TO_START',
+    'RELATIONSHIPS_FINISH_TO_FINISH', 'RELATIONSHIPS_START_TO_FINISH', 'INVALID_DATES'
+]
+
+CITIES = ['Houston', 'Dallas', 'Austin', 'San Antonio', 'College Station', 'Denver', 'Phoenix']
+REGIONS = ['Central', 'North', 'South', 'West']
+STREETS = ['FIRST STREET', 'MAIN STREET', 'CEDAR AVENUE', 'LAMAR BOULEVARD', 'OAK PLAZA', 'RIVER WALK']
+
+FIRST_PROJECT_ID = 40000
+
+# Activity plans kept by each portfolio, the least recently used ones are generated again when needed
+PLAN_CACHE_SIZE = 64
+
+def _timestamp(date):
+    return f'{date.isoformat()}T00:00:00'
+
+def _add_months(date, months):
+    month = date.month - 1 + months
+    return datetime.date(date.year + month // 12, month % 12 + 1, 1)
+
+class SyntheticPortfolio:
+    """
+    Deterministic generator of SmartPM API responses for a portfolio of any size.
+
+    Every response is generated on demand from the seed and the IDs it is for, so a portfolio of thousands of
+    projects takes no memory until it is requested, and the same request always gets the same response.
+    Activities evolve with the data date: later data dates have more actuals and more slip.
+
+    Parameters
+    ----------
+    projects : int, default 10
+        Number of projects
+    scenarios : int, default 2
+        Number of scenarios per project
+    activities : int, default 500
+        Number of activities per scenario
+    uploads : int, default 12
+        Number of monthly schedule uploads per scenario, the last one is the latest data date
+    seed : int, default 0
+        Seed of the generator
+    start : datetime.date, default 2023-01-01
+        Earliest project start date
+    """
+    def __init__(self, projects=10, scenarios=2, activities=500, uploads=12, seed=0, start=datetime.date(2023, 1, 1)):
+        self.n_projects = projects
+        self.n_scenarios = scenarios
+        self.n_activities = activities
+        self.n_uploads = uploads
+        self.seed = seed
+        self.start = start
+        # Cached per instance, so the plans go away with the portfolio
+        self._plans = collections.OrderedDict()
+        self._plans_lock = threading.Lock()
+
+    def _random(self, *key):
+        # A string seed is hashed the same way on every run and platform
+        return random.Random('-'.join(str(part) for part in (self.seed,) + key))
+
+    # IDs
+    # ---
+    def project_ids(self):
+        """IDs of every project."""
+        return list(range(FIRST_PROJECT_ID, FIRST_PROJECT_ID + self.n_projects))
+
+    def scenario_ids(self, project_id):
+        """IDs of the scenarios of a project, the first one is the default scenario."""
+        return [int(project_id) * 100 + i for i in range(self.n_scenarios)]
+
+    def has_project(self, project_id):
+        """Return True if the project exists."""
+        try:
+            return FIRST_PROJECT_ID <= int(project_id) < FIRST_PROJECT_ID + self.n_projects
+        except (TypeError, ValueError):
+            return False
+
+    def has_scenario(self, project_id, scenario_id):
+        """Return True if the scenario exists in the project."""
+        try:
+            return self.has_project(project_id) and int(scenario_id) in self.scenario_ids(project_id)
+        except (TypeError, ValueError):
+            return False
+
+    # Dates
+    # -----
+    def project_start(self, project_id):
+        """Start date of a project, the first of a month."""
+        return _add_months(self.start, self._random('start', project_id).randrange(0, 12))
+
+    def project_finish(self, project_id):
+        """Baseline finish date of a project."""
+        return _add_months(self.project_start(project_id), self.n_uploads + self._random('length', project_id).randrange(6, 24))
+
+    def data_dates(self, project_id):
+        """Data dates of the monthly schedule uploads, oldest first."""
+        start = self.project_start(project_id)
+        return [_add_months(start, i + 1) for i in range(self.n_uploads)]
+
+    def resolve_data_date(self, project_id, data_date=None):
+        """
+        Get the upload a data date refers to.
+
+        Parameters
+        ----------
+        project_id : int
+            ID of the project
+        data_date : str, default None
+            Data date in format `yyyy-MM-dd`, optionally followed by a time. If None, the latest data date
+
+        Returns
+        -------
+        index : int
+            Index of the upload, None if the project has no upload on that date
+        date : datetime.date
+            The data date
+        """
+        dates = self.data_dates(project_id)
+        if not data_date:
+            return len(dates) - 1, dates[-1]
+        try:
+            date = datetime.date.fromisoformat(str(data_date)[:10])
+        except ValueError:
+            return None, None
+        return (dates.index(date), date) if date in dates else (None, date)
+
+    # Responses
+    # ---------
+    def project(self, project_id):
+        """Response of `v1/projects/{project_id}`."""
+        rng = self._random('project', project_id)
+        number = 200000 + rng.randrange(0, 99999)
+        city = rng.choice(CITIES)
+        return {
+            'id': int(project_id),
+            'name': f'{number} - {rng.randrange(100, 9999)} {rng.choice(STREETS)} ({city})',
+            'startDate': _timestamp(self.project_start(project_id)),
+            'endDate': _timestamp(self.project_finish(project_id)),
+            'city': city,
+            'state': 'TX',
+            'defaultScenarioId': self.scenario_ids(project_id)[0],
+            'projectPlanId': PROJECT_PLAN_IDS[int(project_id) % len(PROJECT_PLAN_IDS)],
+            'metadata': {'PROJECT_NUMBER': str(number), 'REGION': rng.choice(REGIONS)},
+        }
+
+    def projects(self, plan_ids=None):
+        """Response of `v1/projects`, optionally only the projects on the given project plans."""
+        projects = [self.project(project_id) for project_id in self.project_ids()]
+        if plan_ids:
+            projects = [project for project in projects if project['projectPlanId'] in plan_ids]
+        return projects
+
+    def comments(self, project_id):
+        """Response of `v1/projects/{project_id}/comments`."""
+        rng = self._random('comments', project_id)
+        return [{
+            'id': int(project_id) * 1000 + i,
+            'projectId': int(project_id),
+            'text': f'Weekly update {i + 1}: {rng.choice(["on track", "weather delay", "awaiting submittals", "inspection passed"])}',
+            'createdAt': f'{data_date.isoformat()}T15:00:00Z',
+        } for i, data_date in enumerate(self.data_dates(project_id))]
+
+    def models(self, project_id):
+        """Response of `v1/projects/{project_id}/models`."""
+        dates = self.data_dates(project_id)
+        return [
+            {'id': int(project_id) * 10, 'projectId': int(project_id), 'modelType': 'BASELINE', 'isOriginalModel': True,
+             'initialDataDate': f'{self.project_start(project_id).isoformat()}T00:00:00Z', 'name': 'Original Baseline'},
+            {'id': int(project_id) * 10 + 1, 'projectId': int(project_id), 'modelType': 'BASELINE', 'isOriginalModel': False,
+             'initialDataDate': f'{dates[len(dates) // 2].isoformat()}T00:00:00Z', 'name': 'Rebaseline'},
+            {'id': int(project_id) * 10 + 2, 'projectId': int(project_id), 'modelType': 'SCHEDULE', 'isOriginalModel': False,
+             'initialDataDate': f'{dates[-1].isoformat()}T00:00:00Z', 'name': 'Current Schedule'},
+        ]
+
+    def scenarios(self, project_id):
+        """Response of `v1/projects/{project_id}/scenarios`."""
+        return [{
+            'id': scenario_id,
+            'projectId': int(project_id),
+            'name': SCENARIO_NAMES[i % len(SCENARIO_NAMES)],
+            'isDefault': i == 0,
+        } for i, scenario_id in enumerate(self.scenario_ids(project_id))]
+
+    def scenario_details(self, project_id, scenario_id, data_date=None):
+        """Response of `v1/projects/{project_id}/scenarios/{scenario_id}` at a data date."""
+        index, date = self.resolve_data_date(project_id, data_date)
+        if index is None:
+            return None
+        delay = self.delay_table(project_id, scenario_id)[index]
+        return {
+            'id': int(scenario_id),
+            'projectId': int(project_id),
+            'name': SCENARIO_NAMES[self.scenario_ids(project_id).index(int(scenario_id)) % len(SCENARIO_NAMES)],
+            'dataDate': date.isoformat(),
+            'startDate': self.project_start(project_id).isoformat(),
+            'baselineEndDate': self.project_finish(project_id).isoformat(),
+            'endDate': delay['endDate'][:10],
+            'activityCount': self.n_activities,
+        }
+
+    def _plan(self, project_id, scenario_id):
+        with self._plans_lock:
+            if (project_id, scenario_id) in self._plans:
+                self._plans.move_to_end((project_id, scenario_id))
+                return self._plans[(project_id, scenario_id)]
+
+        plan = self._generate_plan(project_id, scenario_id)
+        with self._plans_lock:
+            self._plans[(project_id, scenario_id)] = plan
+            while len(self._plans) > PLAN_CACHE_SIZE:
+                self._plans.popitem(last=False)
+        return plan
+
+    def _generate_plan(self, project_id, scenario_id):
+        # Baseline plan and the slip each activity accumulates by the latest data date
+        rng = self._random('plan', project_id, scenario_id)
+        start = self.project_start(project_id)
+        span = (self.project_finish(project_id) - start).days
+        plan = []
+        for i in range(self.n_activities):
+            offset = int(span * i / max(self.n_activities, 1) * 0.9) + rng.randrange(0, 15)
+            duration = rng.choice([1, 2, 3, 5, 5, 10, 10, 15, 20, 30, 45])
+            slip = max(0, int(rng.gauss(3, 8)))
+            plan.append((offset, duration, slip, rng.random()))
+        return start, plan
+
+    def activities(self, project_id, scenario_id, data_date=None):
+        """Response of `v1/projects/{project_id}/scenarios/{scenario_id}/activities` at a data date."""
+        index, date = self.resolve_data_date(project_id, data_date)
+        if index is None:
+            return None
+        start, plan = self._plan(int(project_id), int(scenario_id))
+        progress = (index + 1) / self.n_uploads
+        wbs_count = max(1, min(20, self.n_activities // 25))
+
+        activities = []
+        for i, (offset, duration, slip, noise) in enumerate(plan):
+            baseline_start = start + datetime.timedelta(days=offset)
+            baseline_finish = baseline_start + datetime.timedelta(days=duration)
+            current_start = baseline_start + datetime.timedelta(days=int(slip * progress))
+            current_finish = current_start + datetime.timedelta(days=duration + int(slip * progress * noise))
+
+            actual_start = current_start if current_start <= date else None
+            actual_finish = current_finish if current_finish <= date else None
+            if actual_finish is not None:
+                percent = 100.0
+            elif actual_start is not None:
+                percent = round(100.0 * (date - current_start).days / max((current_finish - current_start).days, 1), 1)
+            else:
+                percent = 0.0
+
+            activities.append({
+                'activityId': f'A{i:06d}',
+                'name': f'Activity {i}',
+                'wbs': f'WBS.{i * wbs_count // max(self.n_activities, 1) + 1}',
+                'baseline': {
+                    'startDate': _timestamp(baseline_start),
+                    'finishDate': _timestamp(baseline_finish),
+                    'duration': duration,
+                },
+                'startDate': _timestamp(current_start),
+                'finishDate': _timestamp(current_finish),
+                'plannedDuration': (current_finish - current_start).days,
+                'actualStartDate': _timestamp(actual_start) if actual_start else None,
+                'actualFinishDate': _timestamp(actual_finish) if actual_finish else None,
+                'actualDuration': (min(current_finish, date) - current_start).days if actual_start else None,
+                'lateStartDate': _timestamp(current_start + datetime.timedelta(days=int(10 * noise))),
+                'lateFinishDate': _timestamp(current_finish + datetime.timedelta(days=int(10 * noise))),
+                'sourceStartDate': _timestamp(current_start),
+                'sourceFinishDate': _timestamp(current_finish),
+                'percentComplete': percent,
+                'critical': noise < 0.1,
+            })
+        return activities
+
+    def schedule_uploads(self, project_id, scenario_id):
+        """Response of `v1/projects/{project_id}/scenarios/{scenario_id}/schedules`."""
+        return [{
+            'id': int(scenario_id) * 1000 + i,
+            'importLogId': int(scenario_id) * 1000 + i,
+            'name': f'Update {i + 1:02d}',
+            'dataDate': _timestamp(date),
+            'uploadedDate': f'{(date + datetime.timedelta(days=3)).isoformat()}T12:00:00Z',
+        } for i, date in enumerate(self.data_dates(project_id))]
+
+    def delay_table(self, project_id, scenario_id):
+        """Response of `v1/projects/{project_id}/scenarios/{scenario_id}/delay`."""
+        rng = self._random('delay', project_id, scenario_id)
+        finish = self.project_finish(project_id)
+        variance = delay = recovery = 0
+        table = []
+        for i, date in enumerate(self.data_dates(project_id)):
+            period_delay = max(0, int(rng.gauss(4, 6)))
+            period_recovery = -max(0, int(rng.gauss(1, 3)))
+            delay += period_delay
+            recovery += period_recovery
+            period_variance = period_delay + period_recovery
+            variance += period_variance
+            table.append({
+                'period': i + 1,
+                'scheduleName': f'Update {i + 1:02d}',
+                'dataDate': _timestamp(date),
+                'endDate': _timestamp(finish + datetime.timedelta(days=variance)),
+                'endDateVariance': {'period': period_variance, 'cumulative': variance},
+                'criticalPathDelay': {'period': period_delay, 'cumulative': delay},
+                'delayRecovery': {'period': period_recovery, 'cumulative': recovery},
+            })
+        return table
+
+    def changes_summary(self, project_id, scenario_id):
+        """Response of `v1/projects/{project_id}/scenarios/{scenario_id}/change-log-summary`."""
+        rng = self._random('changes', project_id, scenario_id)
+        scale = max(1, self.n_activities // 50)
+        return [{
+            'dataDate': _timestamp(date),
+            'metrics': {metric: rng.randrange(0, 5 * scale) for metric in CHANGE_METRICS},
+        } for date in self.data_dates(project_id)]
+
+    def change_log(self, project_id, scenario_id):
+        """Response of `v1/projects/{project_id}/scenarios/{scenario_id}/change-log`."""
+        rng = self._random('change-log', project_id, scenario_id)
+        fields = ['DURATION', 'START_DATE', 'FINISH_DATE', 'LOGIC', 'CALENDAR']
+        changes = []
+        for entry in self.changes_summary(project_id, scenario_id):
+            for _ in range(entry['metrics']['ActivityChanges']):
+                changes.append({
+                    'dataDate': entry['dataDate'],
+                    'activityId': f'A{rng.randrange(0, max(self.n_activities, 1)):06d}',
+                    'changeType': 'MODIFIED',
+                    'field': rng.choice(fields),
+                    'isCritical': rng.random() < 0.1,
+                })
+        return changes
+
+    def percent_complete_curve(self, project_id, scenario_id, delta=False):
+        """Response of `v2/projects/{project_id}/scenarios/{scenario_id}/percent-complete-curve`."""
+        rng = self._random('curve', project_id, scenario_id)
+        start, finish = self.project_start(project_id), self.project_finish(project_id)
+        data_date = self.data_dates(project_id)[-1]
+        months = (finish.year - start.year) * 12 + finish.month - start.month + 1
+
+        points = []
+        actual = planned = late = 0.0
+        for i in range(months):
+            date = _add_months(start, i)
+            # S-curve of the planned progress, the late curve trails it and the actual lags behind
+            target = 100.0 * (3 * (i / (months - 1)) ** 2 - 2 * (i / (months - 1)) ** 3) if months > 1 else 100.0
+            late_target = 100.0 * max(0.0, (i - 1) / (months - 1)) ** 1.5 if months > 1 else 100.0
+            actual_target = target * (0.85 + 0.1 * rng.random())
+            point = {
+                'DATE': date.isoformat(),
+                'PLANNED': round(target - planned if delta else target, 2),
+                'LATE_DATE_PLANNED': round(late_target - late if delta else late_target, 2),
+                'ACTUAL': round(actual_target - actual if delta else actual_target, 2) if date <= data_date else None,
+            }
+            actual, planned, late = actual_target, target, late_target
+            points.append(point)
+
+        return {
+            'percentCompleteTypes': {'ACTUAL': 'Actual (Cumulative)', 'PLANNED': 'Planned (Early)', 'LATE_DATE_PLANNED': 'Planned (Late)'},
+            'data': points,
+        }
+
+    def earned_schedule_curve(self, project_id, scenario_id):
+        """Response of `v1/projects/{project_id}/scenarios/{scenario_id}/earned-schedule-curve`."""
+        rng = self._random('earned', project_id, scenario_id)
+        start = self.project_start(project_id)
+        dates = self.data_dates(project_id)
+        earned = 0
+        data = []
+        for date in dates:
+            planned = (date - start).days
+            earned = min(planned, earned + int((date - start).days / len(dates) * (0.7 + 0.3 * rng.random())) + 10)
+            data.append({
+                'date': date.isoformat(),
+                'earnedDays': earned,
+                'plannedDays': planned,
+                'predictiveDays': planned + int(rng.gauss(10, 5)),
+            })
+        return {'data': data}
+
+    def schedule_quality(self, project_id, scenario_id, import_log_id=None, quality_profile_id=None):
+        """Response of `v1/projects/{project_id}/scenarios/{scenario_id}/schedule-quality`."""
+        rng = self._random('quality', project_id, scenario_id, import_log_id, quality_profile_id)
+        metrics = [{
+            'name': name,
+            'value': round(rng.uniform(0, 20), 2),
+            'count': rng.randrange(0, max(self.n_activities // 10, 1)),
+            'passed': rng.random() < 0.7,
+        } for name in QUALITY_METRICS]
+        score = round(sum(metric['passed'] for metric in metrics) / len(metrics) * 100)
+        mark = 'A' if score >= 90 else 'B' if score >= 80 else 'C' if score >= 70 else 'D' if score >= 60 else 'F'
+        return {
+            'grade': {'mark': mark, 'score': score, 'indicator': 'GOOD' if score >= 70 else 'POOR'},
+            'qualityProfileId': quality_profile_id or 1,
+            'metrics': metrics,
+        }
+
+    def schedule_compression(self, project_id, scenario_id, data_date=None):
+        """Response of `v1/projects/{project_id}/scenarios/{scenario_id}/schedule-compression`."""
+        index, date = self.resolve_data_date(project_id, data_date)
+        if index is None:
+            return None
+        rng = self._random('compression', project_id, scenario_id, index)
+        return {
+            'dataDate': _timestamp(date),
+            'scheduleCompression': round(rng.uniform(-10, 30), 1),
+            'scheduleCompressionIndex': round(rng.uniform(0.8, 1.6), 2),
+        }
+
+    def quality_profiles(self):
+        """Response of `v1/quality-profiles`."""
+        return [self.quality_profile(profile_id) for profile_id in (1, 2)]
+
+    def quality_profile(self, quality_profile_id):
+        """Response of `v1/quality-profiles/{quality_profile_id}`, None if it does not exist."""
+        if str(quality_profile_id) not in ('1', '2'):
+            return None
+        return {
+            'id': int(quality_profile_id),
+            'name': 'SmartPM Default' if str(quality_profile_id) == '1' else 'Strict',
+            'metrics': [{'name': name, 'threshold': 5 if str(quality_profile_id) == '1' else 2} for name in QUALITY_METRICS],
+        }
@@ -0,0 +1,205 @@
+import os
+
+import pandas as pd
+
+from smartpm.diff import DIFF_FIELDS, activities_to_frame, diff_activities
+from smartpm.logging_config import logger
+
+# Fields tracked for each activity version
+TIMELINE_FIELDS = dict(DIFF_FIELDS, actualStartDate='date', actualFinishDate='date')
+
+INDEX_FILENAME = 'timeline.pkl'
+
+class ActivityTimeline:
+    """
+    As-of index over the stored snapshots of a scenario.
+
+    Each activity is stored as a list of versions with a `validFrom` data date (the update in which the
+    version first appeared) and a `validTo` data date (the update in which it changed or was removed,
+    NaT if it is still current). Consecutive snapshots where an activity did not change share a
+    single version, so queries never touch the snapshot files once the index is built.
+
+    The index is saved next to the snapshots and only the snapshots added since the last build
+    are read when it is refreshed.
+    """
+    def __init__(self, store, project_id, scenario_id, fields=None):
+        self.store = store
+        self.project_id = project_id
+        self.scenario_id = scenario_id
+        self.fields = fields or TIMELINE_FIELDS
+        self.data_dates = []
+        self._index = self._empty_index()
+        self.refresh()
+
+    def _empty_index(self):
+        index = activities_to_frame([], self.fields).reset_index()
+        index['validFrom'] = pd.Series(dtype='datetime64[ns]')
+        index['validTo'] = pd.Series(dtype='datetime64[ns]')
+        return index
+
+    @property
+    def _index_path(self):
+        return os.path.join(self.store.scenario_dir(self.project_id, self.scenario_id), INDEX_FILENAME)
+
+    def refresh(self):
+        """
+        Bring the index up to date with the snapshots in the store.
+
+        Returns
+        -------
+        list of str
+            Data dates that were added to the index
+        """
+        stored_dates = self.store.list_data_dates(self.project_id, self.scenario_id)
+
+        if not self.data_dates and os.path.exists(self._index_path):
+            saved = pd.read_pickle(self._index_path)
+            if saved['fields'] == self.fields:
+                self.data_dates = saved['data_dates']
+                self._index = saved['index']
+
+        indexed_dates = set(self.data_dates)
+        new_dates = [data_date for data_date in stored_dates if data_date not in indexed_dates]
+        if not new_dates:
+            return []
+
+        if self.data_dates and min(new_dates) < self.data_dates[-1]:
+            # A snapshot was backfilled before the end of the index, versions have to be rebuilt in order
+            logger.debug("Rebuilding timeline index for project_id: %s, scenario_id: %s", self.project_id, self.scenario_id)
+            self.data_dates = []
+            self._index = self._empty_index()
+            new_dates = stored_dates
+
+        for data_date in new_dates:
+            snapshot = self.store.read_snapshot(self.project_id, self.scenario_id, data_date)
+            self._add_version(data_date, snapshot['activities'])
+            self.data_dates.append(data_date)
+
+        self._index = self._index.sort_values(['activityId', 'validFrom'], kind='stable').reset_index(drop=True)
+        pd.to_pickle({'fields': self.fields, 'data_dates': self.data_dates, 'index': self._index}, self._index_path)
+
+        logger.debug("Indexed %s snapshots, %s activity versions", len(new_dates), len(self._index))
+        return new_dates
+
+    def _add_version(self, data_date, activities):
+        data_date = pd.Timestamp(data_date)
+        current_mask = self._index['validTo'].isna()
+        current = self._index[current_mask].set_index('activityId')
+        frame = activities_to_frame(activities, self.fields)
+
+        diff = diff_activities(current[['name'] + list(self.fields)], frame, self.fields)
+
+        # Close the versions of activities that changed or were removed in this update
+        closed_ids = diff['changed'].index.union(diff['removed'].index)
+        close_mask = current_mask & self._index['activityId'].isin(closed_ids)
+        self._index.loc[close_mask, 'validTo'] = data_date
+
+        opened = frame.loc[diff['changed'].index.union(diff['added'].index)].reset_index()
+        opened['validFrom'] = data_date
+        opened['validTo'] = pd.NaT
+        if len(opened):
+            self._index = pd.concat([self._index, opened], ignore_index=True) if len(self._index) else opened
+
+    def _versions(self, activity_id):
+        # The index is sorted by activity ID, so the versions of one activity are a contiguous slice
+        activity_ids = self._index['activityId']
+        start = activity_ids.searchsorted(activity_id, side='left')
+        stop = activity_ids.searchsorted(activity_id, side='right')
+        return self._index.iloc[start:stop]
+
+    def as_of(self, activity_id, date):
+        """
+        Get an activity as it was in the latest update on or before a date.
+
+        Parameters
+        ----------
+        activity_id : str
+            ID of the activity
+        date : str
+            Date in format `yyyy-MM-dd`
+
+        Returns
+        -------
+        dict or None
+            Activity fields with `validFrom` and `validTo`, or None if the activity did not exist at that date
+        """
+        date = pd.Timestamp(date)
+        versions = self._versions(activity_id)
+        if versions.empty:
+            return None
+
+        position = versions['validFrom'].searchsorted(date, side='right') - 1
+        if position < 0:
+            return None
+
+        version = versions.iloc[position]
+        if pd.notna(version['validTo']) and date >= version['validTo']:
+            return None  # removed before the date
+
+        return version.to_dict()
+
+    def activities_as_of(self, date):
+        """
+        Get every activity as it was in the latest update on or before a date.
+
+        Parameters
+        ----------
+        date : str
+            Date in format `yyyy-MM-dd`
+
+        Returns
+        -------
+        pd.DataFrame
+            DataFrame with one row per activity that existed at the date
+        """
+        date = pd.Timestamp(date)
+        mask = (self._index['validFrom'] <= date) & (self._index['validTo'].isna() | (self._index['validTo'] > date))
+        return self._index[mask].reset_index(drop=True)
+
+    def evolution(self, activity_id):
+        """
+        Get every version of an activity across the indexed updates.
+
+        Parameters
+        ----------
+        activity_id : str
+            ID of the activity
+
+        Returns
+        -------
+        pd.DataFrame
+            DataFrame with one row per version, ordered by `validFrom`
+        """
+        return self._versions(activity_id).reset_index(drop=True)
+
+    def forecast_between(self, start, end, field='finishDate'):
+        """
+        For each update, list the activities whose date field fell within a range.
+        For example, which activities were forecast to finish in March as of each update.
+
+        Parameters
+        ----------
+        start : str
+            First date of the range in format `yyyy-MM-dd`, inclusive
+        end : str
+            Last date of the range in format `yyyy-MM-dd`, inclusive
+        field : str, default 'finishDate'
+            Date field to filter on
+
+        Returns
+        -------
+        pd.DataFrame
+            DataFrame with `dataDate`, `activityId`, `name` and the date field
+        """
+        in_range = self._index[(self._index[field] >= pd.Timestamp(start)) & (self._index[field] <= pd.Timestamp(end))]
+
+        frames = []
+        for data_date in pd.to_datetime(self.data_dates):
+            valid = in_range[(in_range['validFrom'] <= data_date) & (in_range['validTo'].isna() | (in_range['validTo'] > data_date))]
+            frames.append(valid[['activityId', 'name', field]].assign(dataDate=data_date))
+
+        if not frames:
+            return pd.DataFrame(columns=['dataDate', 'activityId', 'name', field])
+
+        result = pd.concat(frames, ignore_index=True)
+        return result[['dataDate', 'activityId', 'name', field]]
@@ -0,0 +1,283 @@
+import functools
+import gzip
+import hashlib
+import http
+import json
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from smartpm.exceptions import RecordingNotFoundError
+from smartpm.logging_config import logger
+
+# Files of a recording directory
+INDEX_FILE = 'requests.jsonl'
+BODIES_DIR = 'bodies'
+BODY_SUFFIX = '.json.gz'
+
+# Response headers kept in recordings, everything else is left out
+RECORDED_HEADERS = ('Content-Type', 'Retry-After')
+
+# Environment variables read by `transport_from_env`
+RECORD_DIR_ENV = 'SMARTPM_RECORD_DIR'
+REPLAY_DIR_ENV = 'SMARTPM_REPLAY_DIR'
+REPLAY_LATENCY_ENV = 'SMARTPM_REPLAY_LATENCY'
+
+def request_key(method, url, params=None, data=None, company_id=None):
+    """
+    Identify a request independently of the host it was sent to and of the API key.
+
+    Parameters
+    ----------
+    method : str
+        HTTP method
+    url : str
+        Request URL, query parameters in the URL are merged with `params`
+    params : dict, default None
+        Query parameters
+    data : dict or list, default None
+        JSON body
+    company_id : str, default None
+        Value of the X-COMPANY-ID header
+
+    Returns
+    -------
+    str
+        Key like `GET /public/v1/projects?filters=...`, with sorted query parameters
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    for name, value in (params or {}).items():
+        if value is None:
+            continue
+        values = value if isinstance(value, (list, tuple)) else [value]
+        query.extend((name, str(v)) for v in values)
+
+    key = f'{method.upper()} {parts.path}'
+    if query:
+        key += '?' + urlencode(sorted(query))
+    if data is not None:
+        key += ' body=' + hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    if company_id is not None:
+        key += f' company={company_id}'
+    return key
+
+def build_response(method, url, status, headers, content, params=None):
+    """Build a `requests.Response` that behaves like one received from the network."""
+    response = requests.Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers or {})
+    response._content = content
+    response.request = requests.Request(method, url, params=params).prepare()
+    response.url = response.request.url
+    try:
+        response.reason = http.HTTPStatus(status).phrase
+    except ValueError:
+        response.reason = ''
+    return response
+
+class Transport:
+    """
+    Sends the HTTP requests of a `SmartPMClient`.
+
+    Subclasses implement `send`, which takes the JSON body as `data`, returns a `requests.Response`
+    and raises `requests.exceptions.ConnectionError` for errors that are worth retrying. The response body
+    may still be streaming when `send` returns, the client reads it and then calls `received`.
+    """
+    def send(self, method, url, headers=None, params=None, data=None, timeout=None):
+        raise NotImplementedError
+
+    def received(self, method, url, response, elapsed, headers=None, params=None, data=None):
+        """
+        Called by the client once it has read the body of a response returned by `send`.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method of the request
+        url : str
+            URL of the request, without the query parameters
+        response : requests.Response
+            The response, with its body already read
+        elapsed : float
+            Seconds from sending the request until the body was read
+        headers, params, data
+            Same as for `send`
+        """
+        pass
+
+    def close(self):
+        """Release resources held by the transport."""
+        pass
+
+class RequestsTransport(Transport):
+    """
+    Send requests over the network with a `requests.Session`.
+
+    Parameters
+    ----------
+    session : requests.Session
+        Session to send requests with, see `smartpm.client.create_session`
+    """
+    def __init__(self, session):
+        self.session = session
+
+    def send(self, method, url, headers=None, params=None, data=None, timeout=None):
+        return self.session.request(method, url, headers=headers, params=params, json=data, stream=True, timeout=timeout)
+
+class RecordingTransport(Transport):
+    """
+    Send requests through another transport and record every response to a directory, so it can be replayed
+    with `ReplayTransport`.
+
+    The directory holds `requests.jsonl`, one line per response with the request key, status, headers, elapsed time
+    and the SHA-256 of the body, and `bodies/<sha256>.json.gz` with the gzipped bodies. Identical bodies are stored
+    once. API keys are never recorded.
+
+    Parameters
+    ----------
+    directory : str
+        Directory to record to, created if needed. Recording into an existing directory appends to it
+    transport : Transport
+        Transport that sends the requests, e.g. `RequestsTransport`
+    """
+    def __init__(self, directory, transport):
+        self.directory = directory
+        self.transport = transport
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, BODIES_DIR), exist_ok=True)
+
+    def send(self, method, url, headers=None, params=None, data=None, timeout=None):
+        # The body is recorded in `received`, after the client has read it, so recording leaves its timings alone
+        return self.transport.send(method, url, headers=headers, params=params, data=data, timeout=timeout)
+
+    def received(self, method, url, response, elapsed, headers=None, params=None, data=None):
+        self.transport.received(method, url, response, elapsed, headers=headers, params=params, data=data)
+        content = response.content
+        digest = self._write_body(content)
+        entry = {
+            'key': request_key(method, url, params, data, (headers or {}).get('X-COMPANY-ID')),
+            'status': response.status_code,
+            'headers': {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+            'body': digest,
+            'elapsed': round(elapsed, 6),
+        }
+        with self._lock:
+            with open(os.path.join(self.directory, INDEX_FILE), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        logger.debug("Recorded %s (%s bytes)", entry['key'], len(content))
+
+    def _write_body(self, content):
+        digest = hashlib.sha256(content).hexdigest()
+        path = os.path.join(self.directory, BODIES_DIR, digest + BODY_SUFFIX)
+        if os.path.exists(path):
+            return digest
+
+        # Written to a temporary name first, so a concurrent writer of the same body never leaves a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return digest
+
+    def close(self):
+        self.transport.close()
+
+class ReplayTransport(Transport):
+    """
+    Serve recorded responses without touching the network.
+
+    A request recorded several times is answered with its responses in the order they were recorded,
+    and with the last one after that, so recorded retries replay the same way.
+
+    Parameters
+    ----------
+    directory : str
+        Directory written by `RecordingTransport`
+    latency : float or str, default None
+        Seconds to wait before each response, 'recorded' to wait as long as the recorded request took,
+        or None to answer immediately
+    """
+    def __init__(self, directory, latency=None):
+        self.directory = directory
+        self.latency = latency
+        self._entries = {}
+        self._served = {}
+        self._lock = threading.Lock()
+        self._read_body = functools.lru_cache(maxsize=256)(self._read_body)
+        self._load()
+
+    def _load(self):
+        path = os.path.join(self.directory, INDEX_FILE)
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # The last line is partial if the recording process died while writing it
+                    logger.warning("Skipping unreadable recording entry in %s", path)
+                    continue
+                self._entries.setdefault(entry['key'], []).append(entry)
+
+        logger.debug("Loaded %s recorded requests from %s", len(self._entries), path)
+
+    def _read_body(self, digest):
+        with gzip.open(os.path.join(self.directory, BODIES_DIR, digest + BODY_SUFFIX), 'rb') as f:
+            return f.read()
+
+    def send(self, method, url, headers=None, params=None, data=None, timeout=None):
+        key = request_key(method, url, params, data, (headers or {}).get('X-COMPANY-ID'))
+        entries = self._entries.get(key)
+        if not entries:
+            raise RecordingNotFoundError(f'No recorded response for {key}')
+
+        with self._lock:
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+        entry = entries[min(served, len(entries) - 1)]
+
+        delay = entry['elapsed'] if self.latency == 'recorded' else self.latency
+        if delay:
+            time.sleep(delay)
+
+        return build_response(method, url, entry['status'], entry['headers'], self._read_body(entry['body']), params)
+
+def transport_from_env(session):
+    """
+    Pick the transport from the environment, so existing scripts can be recorded and replayed without changes.
+
+    `SMARTPM_REPLAY_DIR` replays from a directory, with the latency taken from `SMARTPM_REPLAY_LATENCY`
+    (seconds or 'recorded'). `SMARTPM_RECORD_DIR` records to a directory. Otherwise requests go over the network.
+
+    Parameters
+    ----------
+    session : requests.Session
+        Session used to send requests over the network
+
+    Returns
+    -------
+    Transport
+    """
+    replay_dir = os.getenv(REPLAY_DIR_ENV)
+    if replay_dir:
+        latency = os.getenv(REPLAY_LATENCY_ENV) or None
+        if latency not in (None, 'recorded'):
+            latency = float(latency)
+        return ReplayTransport(replay_dir, latency=latency)
+
+    record_dir = os.getenv(RECORD_DIR_ENV)
+    if record_dir:
+        return RecordingTransport(record_dir, RequestsTransport(session))
+
+    return RequestsTransport(session)
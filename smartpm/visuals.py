@@ -1,10 +1,80 @@
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
 import datetime
+import io
+import numpy as np
 import pandas as pd
 
 from collections import defaultdict
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
 
-def plot_percent_complete_curve(json_data):
+from smartpm.logging_config import logger
+from smartpm.preprocessing import percent_complete_series, earned_schedule_series, delay_series, change_series, has_values, to_datetime64
+from smartpm.downsampling import downsample_series
+from smartpm.render_cache import RenderCache
+from smartpm.rendering import FIGURE_SIZES
+
+def create_figure(figsize, ax=None, show=True):
+    """
+    Get the figure and axes a plotting function draws on.
+
+    Parameters
+    ----------
+    figsize : tuple
+        Size of a new figure in inches
+    ax : matplotlib.axes.Axes, default None
+        Axes to draw on. If None, a new figure is created
+    show : bool, default True
+        If True, the new figure is created through pyplot so it can be displayed.
+        Otherwise it is a standalone `Figure` that is not tracked by pyplot, which is safe to
+        build in worker threads and is freed as soon as it is no longer referenced
+
+    Returns
+    -------
+    fig : matplotlib.figure.Figure
+    ax : matplotlib.axes.Axes
+    """
+    if ax is not None:
+        return ax.figure, ax
+
+    fig = plt.figure(figsize=figsize) if show else Figure(figsize=figsize)
+    return fig, fig.add_subplot()
+
+def release_figure(fig):
+    """
+    Free the memory held by a figure once it has been saved or displayed.
+
+    Parameters
+    ----------
+    fig : matplotlib.figure.Figure
+        Figure returned by one of the plotting functions
+    """
+    if getattr(fig.canvas, 'manager', None) is not None:
+        plt.close(fig)
+    fig.clear()
+
+def _downsample(fig, dates, series, max_points, method):
+    if max_points == 'auto':
+        # One point per horizontal pixel of the figure
+        max_points = int(fig.get_figwidth() * fig.dpi)
+    return downsample_series(dates, series, max_points, method)
+
+def _style_date_axis(ax):
+    # Customize x-axis to show the first of every month with the format "mm/dd/yy"
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d/%y'))
+    ax.xaxis.set_major_locator(mdates.MonthLocator(bymonthday=1, interval=2))
+
+    # Rotate the x-axis labels by -30 degrees and align them to the left
+    for label in ax.get_xticklabels():
+        label.set(rotation=-30, horizontalalignment='left')
+
+    # Remove top, right, and left spines
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_visible(False)
+
+def plot_percent_complete_curve(json_data, ax=None, show=True, max_points=None, downsample='lttb'):
     """
     Plot the progress curve from scenario data.
     Reproduces this figure from SmartPM: https://help.smartpmtech.com/the-progress-curve
@@ -13,15 +83,25 @@ def plot_percent_complete_curve(json_data):
     ----------
     json_data : dict
         Dictionary containing percent complete types and scenario data with progress information.
+    ax : matplotlib.axes.Axes, default None
+        Axes to draw on. If None, a new figure is created
+    show : bool, default True
+        If True, display the figure. Set to False to render headless and save or release the returned figure
+    max_points : int or 'auto', default None
+        Downsample long series to about this many points before drawing, `auto` uses the figure width in pixels.
+        If None, every point is drawn
+    downsample : str, default 'lttb'
+        Downsampling method, `lttb` or `minmax`, see `smartpm.downsampling`
+
+    Returns
+    -------
+    matplotlib.figure.Figure
+        The plotted figure
     """
     percent_complete_types = json_data['percentCompleteTypes']
-    scenario_data = json_data['data']
-
-    # Extract dates and values for each type of progress
-    dates = [datetime.datetime.strptime(point['DATE'], '%Y-%m-%d') for point in scenario_data]
 
-    # Extract data points for each type based on percentCompleteTypes
-    data_series = {key: [point.get(key, None) for point in scenario_data] for key in percent_complete_types.keys()}
+    # Extract dates and data points for each type based on percentCompleteTypes
+    dates, data_series = percent_complete_series(json_data)
 
     # Define colors and linestyles for each type
     colors = {
@@ -47,50 +127,43 @@ def plot_percent_complete_curve(json_data):
         "LATE_DATE_PLANNED": "-",
     }
 
-    plt.figure(figsize=(14, 6))
+    fig, ax = create_figure(FIGURE_SIZES['plot_percent_complete_curve'], ax, show)
+    dates, data_series = _downsample(fig, dates, data_series, max_points, downsample)
     ms = 4  # marker size
     lw = 2  # linewidth
 
     # Plot each data series
     for key, label in percent_complete_types.items():
-        if any(data_series[key]):
-            plt.plot(dates, data_series[key], label=label.split(" (")[0], marker=markers.get(key, 'o'), markersize=ms, linestyle=linestyles.get(key, '-'), linewidth=lw, color=colors.get(key, 'dodgerblue'))
+        if has_values(data_series[key]):
+            ax.plot(dates, data_series[key], label=label.split(" (")[0], marker=markers.get(key, 'o'), markersize=ms, linestyle=linestyles.get(key, '-'), linewidth=lw, color=colors.get(key, 'dodgerblue'))
 
     # Shade the region between early date planned and late date planned lines if available
     if 'PLANNED' in data_series and 'LATE_DATE_PLANNED' in data_series:
-        plt.fill_between(dates, data_series['PLANNED'], data_series.get('LATE_DATE_PLANNED', [None]*len(dates)), color='gray', alpha=0.3)
+        ax.fill_between(dates, data_series['PLANNED'], data_series['LATE_DATE_PLANNED'], color='gray', alpha=0.3)
 
-    plt.title('Planned VS Actual Percent Complete')
+    ax.set_title('Planned VS Actual Percent Complete')
 
-    # Customize x-axis to show the first of every month with the format "mm/dd/yy"
-    plt.gca().xaxis.set_major_formatter(plt.matplotlib.dates.DateFormatter('%m/%d/%y'))
-    plt.gca().xaxis.set_major_locator(plt.matplotlib.dates.MonthLocator(bymonthday=1, interval=2))
-
-    # Rotate the x-axis labels by -30 degrees and align them to the left
-    plt.xticks(rotation=-30, ha='left')
+    _style_date_axis(ax)
 
     # Customize y-axis to show 0, 25, 50, 75, 100
-    plt.yticks([0, 25, 50, 75, 100])
-
-    # Remove top, right, and left spines
-    ax = plt.gca()
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.spines['left'].set_visible(False)
+    ax.set_yticks([0, 25, 50, 75, 100])
 
     # Draw a vertical line for the current date if it is before the last date in predictive completion
     current_date = datetime.datetime.now()
-    if current_date < max(dates):
-        plt.axvline(x=current_date, color='black', linestyle='-', linewidth=lw + 1, label='Current Date')
+    if np.datetime64(current_date) < dates.max():
+        ax.axvline(x=current_date, color='black', linestyle='-', linewidth=lw + 1, label='Current Date')
 
     # Place the legend below the x-axis with no box around it on one line
-    plt.legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), ncol=7, frameon=False)
-    plt.grid(True)
+    ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), ncol=7, frameon=False)
+    ax.grid(True)
 
-    plt.tight_layout()
-    plt.show()
+    fig.tight_layout()
+    if show:
+        plt.show()
 
-def plot_earned_schedule_curve(json_data):
+    return fig
+
+def plot_earned_schedule_curve(json_data, ax=None, show=True, max_points=None, downsample='lttb'):
     """
     Plot the earned days curve from the provided JSON data.
     Reproduces this figure: https://help.smartpmtech.com/earned-baseline-days
@@ -99,52 +172,57 @@ def plot_earned_schedule_curve(json_data):
     ----------
     json_data : dict
         Dictionary containing the date and days data.
+    ax : matplotlib.axes.Axes, default None
+        Axes to draw on. If None, a new figure is created
+    show : bool, default True
+        If True, display the figure. Set to False to render headless and save or release the returned figure
+    max_points : int or 'auto', default None
+        Downsample long series to about this many points before drawing, `auto` uses the figure width in pixels.
+        If None, every point is drawn
+    downsample : str, default 'lttb'
+        Downsampling method, `lttb` or `minmax`, see `smartpm.downsampling`
+
+    Returns
+    -------
+    matplotlib.figure.Figure
+        The plotted figure
     """
-    data = json_data['data']
+    fig, ax = create_figure(FIGURE_SIZES['plot_earned_schedule_curve'], ax, show)
 
     # Extract dates and values for each type of days
-    dates = [datetime.datetime.strptime(point['date'], '%Y-%m-%d') for point in data]
-    earned_days = [point['earnedDays'] for point in data]
-    planned_days = [point['plannedDays'] for point in data]
-    predictive_days = [point['predictiveDays'] if point['predictiveDays'] is not None else None for point in data]
+    dates, days = _downsample(fig, *earned_schedule_series(json_data), max_points, downsample)
+    earned_days = days['earnedDays']
+    planned_days = days['plannedDays']
+    predictive_days = days['predictiveDays']
 
-    plt.figure(figsize=(14, 6))
     ms = 4  # marker size
     lw = 2  # linewidth
 
-    plt.plot(dates, earned_days, label='Earned Days', marker='o', markersize=ms, linestyle='-', linewidth=lw, color="seagreen")
-    plt.plot(dates, planned_days, label='Planned Days', marker='d', markersize=ms, linestyle='-', linewidth=lw, color="firebrick")
-    if any(predictive_days):
-        plt.plot(dates, predictive_days, label='Predictive Days', marker='s', markersize=ms, linestyle='-', linewidth=lw, color="goldenrod")
-
-    plt.title('Earned Baseline Days')
+    ax.plot(dates, earned_days, label='Earned Days', marker='o', markersize=ms, linestyle='-', linewidth=lw, color="seagreen")
+    ax.plot(dates, planned_days, label='Planned Days', marker='d', markersize=ms, linestyle='-', linewidth=lw, color="firebrick")
+    if has_values(predictive_days):
+        ax.plot(dates, predictive_days, label='Predictive Days', marker='s', markersize=ms, linestyle='-', linewidth=lw, color="goldenrod")
 
-    # Customize x-axis to show the first of every month with the format "mm/dd/yy"
-    plt.gca().xaxis.set_major_formatter(plt.matplotlib.dates.DateFormatter('%m/%d/%y'))
-    plt.gca().xaxis.set_major_locator(plt.matplotlib.dates.MonthLocator(bymonthday=1, interval=2))
+    ax.set_title('Earned Baseline Days')
 
-    # Rotate the x-axis labels by -30 degrees and align them to the left
-    plt.xticks(rotation=-30, ha='left')
-
-    # Remove top, right, and left spines
-    ax = plt.gca()
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.spines['left'].set_visible(False)
+    _style_date_axis(ax)
 
     # Draw a vertical line for the current date if it is before the last date in data
     current_date = datetime.datetime.now()
-    if current_date < max(dates):
-        plt.axvline(x=current_date, color='black', linestyle='-', linewidth=lw + 1, label='Current Date')
+    if np.datetime64(current_date) < dates.max():
+        ax.axvline(x=current_date, color='black', linestyle='-', linewidth=lw + 1, label='Current Date')
 
     # Place the legend below the x-axis with no box around it on one line
-    plt.legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), ncol=7, frameon=False)
-    plt.grid(True)
+    ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), ncol=7, frameon=False)
+    ax.grid(True)
+
+    fig.tight_layout()
+    if show:
+        plt.show()
 
-    plt.tight_layout()
-    plt.show()
+    return fig
 
-def plot_schedule_delay(json_data):
+def plot_schedule_delay(json_data, ax=None, show=True, max_points=None, downsample='lttb'):
     """
     Plot the schedule delay curve from the provided JSON data.
 
@@ -152,56 +230,61 @@ def plot_schedule_delay(json_data):
     ----------
     json_data : dict
         Dictionary containing the schedule variance data.
+    ax : matplotlib.axes.Axes, default None
+        Axes to draw on. If None, a new figure is created
+    show : bool, default True
+        If True, display the figure. Set to False to render headless and save or release the returned figure
+    max_points : int or 'auto', default None
+        Downsample long series to about this many points before drawing, `auto` uses the figure width in pixels.
+        If None, every point is drawn
+    downsample : str, default 'lttb'
+        Downsampling method, `lttb` or `minmax`, see `smartpm.downsampling`
+
+    Returns
+    -------
+    matplotlib.figure.Figure
+        The plotted figure
     """
-    data = json_data
+    fig, ax = create_figure(FIGURE_SIZES['plot_schedule_delay'], ax, show)
 
     # Extract dates and values for each type of variance
-    dates = [datetime.datetime.strptime(point['dataDate'], '%Y-%m-%dT%H:%M:%S') for point in data]
-    end_date_variance = [point['endDateVariance']['cumulative'] for point in data]
-    critical_path_delay = [point['criticalPathDelay']['cumulative'] for point in data]
-    acceleration = [point['delayRecovery']['cumulative']*-1 for point in data] # values are inverse in response
+    dates, variance = _downsample(fig, *delay_series(json_data), max_points, downsample)
+    end_date_variance = variance['endDateVariance']
+    critical_path_delay = variance['criticalPathDelay']
+    acceleration = variance['acceleration']
 
-    plt.figure(figsize=(14, 6))
     ms = 4  # marker size
     lw = 2  # linewidth
 
-    plt.plot(dates, end_date_variance, label='End Date Variance', marker='o', markersize=ms, linestyle='-', linewidth=lw, color="goldenrod")
-    plt.plot(dates, critical_path_delay, label='Critical Path Delay', marker='d', markersize=ms, linestyle='-', linewidth=lw, color="firebrick")
-    plt.plot(dates, acceleration, label='Acceleration', marker='s', markersize=ms, linestyle='-', linewidth=lw, color="seagreen")
+    ax.plot(dates, end_date_variance, label='End Date Variance', marker='o', markersize=ms, linestyle='-', linewidth=lw, color="goldenrod")
+    ax.plot(dates, critical_path_delay, label='Critical Path Delay', marker='d', markersize=ms, linestyle='-', linewidth=lw, color="firebrick")
+    ax.plot(dates, acceleration, label='Acceleration', marker='s', markersize=ms, linestyle='-', linewidth=lw, color="seagreen")
 
     # Shade the area between each curve and the x-axis
-    plt.fill_between(dates, end_date_variance, color="goldenrod", alpha=0.7)
-    plt.fill_between(dates, critical_path_delay, color="firebrick", alpha=0.7)
-    plt.fill_between(dates, acceleration, color="seagreen", alpha=0.7)
-
-    plt.title('Schedule Delay Over Time')
-
-    # Customize x-axis to show the first of every month with the format "mm/dd/yy"
-    plt.gca().xaxis.set_major_formatter(plt.matplotlib.dates.DateFormatter('%m/%d/%y'))
-    plt.gca().xaxis.set_major_locator(plt.matplotlib.dates.MonthLocator(bymonthday=1, interval=2))
+    ax.fill_between(dates, end_date_variance, color="goldenrod", alpha=0.7)
+    ax.fill_between(dates, critical_path_delay, color="firebrick", alpha=0.7)
+    ax.fill_between(dates, acceleration, color="seagreen", alpha=0.7)
 
-    # Rotate the x-axis labels by -30 degrees and align them to the left
-    plt.xticks(rotation=-30, ha='left')
+    ax.set_title('Schedule Delay Over Time')
 
-    # Remove top, right, and left spines
-    ax = plt.gca()
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.spines['left'].set_visible(False)
+    _style_date_axis(ax)
 
     # Draw a vertical line for the current date if it is before the last date in data
     current_date = datetime.datetime.now()
-    if current_date < max(dates):
-        plt.axvline(x=current_date, color='black', linestyle='-', linewidth=lw + 1, label='Current Date')
+    if np.datetime64(current_date) < dates.max():
+        ax.axvline(x=current_date, color='black', linestyle='-', linewidth=lw + 1, label='Current Date')
 
     # Place the legend below the x-axis with no box around it on one line
-    plt.legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), ncol=7, frameon=False)
-    plt.grid(True)
+    ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), ncol=7, frameon=False)
+    ax.grid(True)
+
+    fig.tight_layout()
+    if show:
+        plt.show()
 
-    plt.tight_layout()
-    plt.show()
+    return fig
 
-def plot_schedule_changes(json_data):
+def plot_schedule_changes(json_data, ax=None, show=True, max_points=None, downsample='lttb'):
     """
     Plot the schedule changes over time from the provided JSON data.
 
@@ -209,19 +292,23 @@ def plot_schedule_changes(json_data):
     ----------
     json_data : list of dict
         List of dictionaries containing the schedule change data.
+    ax : matplotlib.axes.Axes, default None
+        Axes to draw on. If None, a new figure is created
+    show : bool, default True
+        If True, display the figure. Set to False to render headless and save or release the returned figure
+    max_points : int or 'auto', default None
+        Downsample long series to about this many points before drawing, `auto` uses the figure width in pixels.
+        If None, every point is drawn
+    downsample : str, default 'lttb'
+        Downsampling method, `lttb` or `minmax`, see `smartpm.downsampling`
+
+    Returns
+    -------
+    matplotlib.figure.Figure
+        The plotted figure
     """
-    # Extract dates and metrics
-    dates = [datetime.datetime.strptime(entry['dataDate'], '%Y-%m-%dT%H:%M:%S') for entry in json_data]
-    
-    metrics = json_data[0]['metrics'].keys()
-    
-    # Initialize a dictionary to hold lists of metric values
-    metric_values = {metric: [] for metric in metrics}
-    
-    # Populate the metric values dictionary
-    for entry in json_data:
-        for metric in metrics:
-            metric_values[metric].append(entry['metrics'][metric])
+    # Extract dates and metric values
+    dates, metric_values = change_series(json_data)
 
     # Define colors and linestyles for each metric
     color_linestyle_dict = {
@@ -234,41 +321,34 @@ def plot_schedule_changes(json_data):
         "DelayedActivityChanges": {"color": 'firebrick', "marker": 'd'},
     }
 
-    plt.figure(figsize=(14, 10))
+    fig, ax = create_figure(FIGURE_SIZES['plot_schedule_changes'], ax, show)
+    dates, metric_values = _downsample(fig, dates, metric_values, max_points, downsample)
     ms = 4  # marker size
     lw = 2  # linewidth
     
     for metric, style in color_linestyle_dict.items():
-        plt.plot(dates, metric_values[metric], label=metric, marker=style["marker"], markersize=ms, linewidth=lw, color=style["color"])
+        ax.plot(dates, metric_values[metric], label=metric, marker=style["marker"], markersize=ms, linewidth=lw, color=style["color"])
     
-    plt.title('Schedule Changes Over Time')
+    ax.set_title('Schedule Changes Over Time')
 
-    # Customize x-axis to show the first of every month with the format "mm/dd/yy"
-    plt.gca().xaxis.set_major_formatter(plt.matplotlib.dates.DateFormatter('%m/%d/%y'))
-    plt.gca().xaxis.set_major_locator(plt.matplotlib.dates.MonthLocator(bymonthday=1, interval=2))
-
-    # Rotate the x-axis labels by -30 degrees and align them to the left
-    plt.xticks(rotation=-30, ha='left')
-
-    # Remove top, right, and left spines
-    ax = plt.gca()
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.spines['left'].set_visible(False)
+    _style_date_axis(ax)
 
     # Draw a vertical line for the current date if it is before the last date in data
     current_date = datetime.datetime.now()
-    if current_date < max(dates):
-        plt.axvline(x=current_date, color='black', linestyle='-', linewidth=lw + 1, label='Current Date')
+    if np.datetime64(current_date) < dates.max():
+        ax.axvline(x=current_date, color='black', linestyle='-', linewidth=lw + 1, label='Current Date')
 
     # Place the legend below the x-axis with no box around it on one line
-    plt.legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), ncol=4, frameon=False)
-    plt.grid(True)
+    ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), ncol=4, frameon=False)
+    ax.grid(True)
+
+    fig.tight_layout()
+    if show:
+        plt.show()
 
-    plt.tight_layout()
-    plt.show()
+    return fig
 
-def plot_activity_distribution_by_month(json_data, scenario_details):
+def plot_activity_distribution_by_month(json_data, scenario_details, ax=None, show=True):
     """
     Plot the activity start and finish dates by month from the provided JSON data.
 
@@ -276,6 +356,17 @@ def plot_activity_distribution_by_month(json_data, scenario_details):
     ----------
     json_data : list of dict
         List of dictionaries containing the activity data.
+    scenario_details : dict
+        Scenario details containing the data date
+    ax : matplotlib.axes.Axes, default None
+        Axes to draw on. If None, a new figure is created. Pass axes of your own figure to keep a handle on it
+    show : bool, default True
+        If True, display the figure. Set to False to render headless
+
+    Returns
+    -------
+    pd.DataFrame
+        Counts of each date type by month
     """
     # Data date
     data_date = datetime.datetime.strptime(scenario_details["dataDate"], "%Y-%m-%d")
@@ -323,7 +414,7 @@ def plot_activity_distribution_by_month(json_data, scenario_details):
     }
 
     # Plotting
-    _, ax = plt.subplots(figsize=(14, 8))
+    fig, ax = create_figure(FIGURE_SIZES['plot_activity_distribution_by_month'], ax, show)
     width = 3  # width of the bars
 
     # Plot bars for each date type
@@ -332,11 +423,12 @@ def plot_activity_distribution_by_month(json_data, scenario_details):
         ax.bar(df_counts.index + pd.DateOffset(months=-1, days=offset), df_counts[date_type], width=width, label=date_type, color=colors[date_type])
 
     # Customize x-axis to show the first of every month with the format "mm/yyyy"
-    ax.xaxis.set_major_formatter(plt.matplotlib.dates.DateFormatter('%b-%y'))
-    ax.xaxis.set_major_locator(plt.matplotlib.dates.MonthLocator())
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%b-%y'))
+    ax.xaxis.set_major_locator(mdates.MonthLocator())
 
     # Rotate the x-axis labels by -30 degrees and align them to the right
-    plt.xticks(rotation=-30, ha='right')
+    for label in ax.get_xticklabels():
+        label.set(rotation=-30, horizontalalignment='right')
     
     # Remove top, right, and left spines
     ax.spines['top'].set_visible(False)
@@ -349,11 +441,192 @@ def plot_activity_distribution_by_month(json_data, scenario_details):
     ax.text(data_date + pd.DateOffset(months=-1, days=1), max_height, f"Data Date: {data_date.strftime('%d %b-%y')}", rotation=-90, verticalalignment='top', horizontalalignment='left')
 
     # Place the legend below the x-axis with no box around it on one line
-    plt.legend(loc='upper center', bbox_to_anchor=(0.5, -0.10), ncol=6, frameon=False)
-    plt.grid(True, axis='y')
+    ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.10), ncol=6, frameon=False)
+    ax.grid(True, axis='y')
+
+    ax.set_title('Monthly Activity Start & Finish Distribution')
+    fig.tight_layout()
+    if show:
+        plt.show()
+
+    return df_counts.sort_index()
+
+def _activity_dates(json_data, key, nested=None):
+    # Vectorized parse of one date field of every activity, missing dates become NaN day numbers
+    if nested:
+        values = [(entry.get(nested) or {}).get(key) for entry in json_data]
+    else:
+        values = [entry.get(key) for entry in json_data]
+    return mdates.date2num(to_datetime64(values))
+
+def _bar_collection(rows, starts, finishes, offset, height, **style):
+    # One polygon per bar, all drawn by a single artist
+    mask = ~(np.isnan(starts) | np.isnan(finishes))
+    y0 = rows[mask] + offset
+    x0, x1 = starts[mask], finishes[mask]
+    verts = np.empty((mask.sum(), 4, 2))
+    verts[:, 0] = np.column_stack([x0, y0])
+    verts[:, 1] = np.column_stack([x0, y0 + height])
+    verts[:, 2] = np.column_stack([x1, y0 + height])
+    verts[:, 3] = np.column_stack([x1, y0])
+    return PolyCollection(verts, **style)
+
+def plot_gantt(json_data, scenario_details=None, group_by=None, ax=None, show=True, max_labels=60):
+    """
+    Plot a Gantt chart of baseline, current and actual bars for a list of activities.
+    Each series is drawn as a single collection, so tens of thousands of activities render in a few seconds.
 
-    plt.title('Monthly Activity Start & Finish Distribution')
-    plt.tight_layout()
-    plt.show()
+    Parameters
+    ----------
+    json_data : list of dict
+        List of dictionaries containing the activity data, as returned by `get_activities`.
+    scenario_details : dict, default None
+        Scenario details containing the data date. If given, a data date line is drawn and
+        in-progress activities get an actual bar up to the data date
+    group_by : str or callable, default None
+        Activity key (e.g. a WBS code) or function of an activity to group rows by.
+        Groups are separated by a line and labelled on the y-axis. If None, activities are not grouped
+    ax : matplotlib.axes.Axes, default None
+        Axes to draw on. If None, a new figure is created
+    show : bool, default True
+        If True, display the figure. Set to False to render headless and save or release the returned figure
+    max_labels : int, default 60
+        Activity names are shown on the y-axis when there are at most this many rows
+
+    Returns
+    -------
+    matplotlib.figure.Figure
+        The plotted figure
+    """
+    data_date = None
+    if scenario_details is not None:
+        data_date = mdates.date2num(np.datetime64(str(scenario_details['dataDate'])[:10]))
+
+    starts = _activity_dates(json_data, 'startDate')
+    finishes = _activity_dates(json_data, 'finishDate')
+    baseline_starts = _activity_dates(json_data, 'startDate', nested='baseline')
+    baseline_finishes = _activity_dates(json_data, 'finishDate', nested='baseline')
+    actual_starts = _activity_dates(json_data, 'actualStartDate')
+    actual_finishes = _activity_dates(json_data, 'actualFinishDate')
+
+    # In-progress activities are actual up to the data date
+    if data_date is not None:
+        in_progress = ~np.isnan(actual_starts) & np.isnan(actual_finishes)
+        actual_finishes[in_progress] = data_date
+
+    # Order rows by group, then by start date
+    if callable(group_by):
+        groups = np.array([str(group_by(entry)) for entry in json_data], dtype=object)
+    elif group_by is not None:
+        groups = np.array([str(entry.get(group_by) or '') for entry in json_data], dtype=object)
+    else:
+        groups = np.full(len(json_data), '', dtype=object)
+    sort_start = np.where(np.isnan(starts), baseline_starts, starts)
+    order = np.lexsort((np.nan_to_num(sort_start, nan=np.inf), groups))
+    rows = np.empty(len(json_data))
+    rows[order] = np.arange(len(json_data))
+
+    fig, ax = create_figure(FIGURE_SIZES['plot_gantt'], ax, show)
+    # Vector output of thousands of bars is huge, rasterize the bars but keep text and axes as vectors.
+    # Bars thinner than a pixel would not be drawn at all, so they get an outline in their own color
+    rasterized = len(json_data) > 2000
+    edge_width = 0.5 if rasterized else 0
+
+    series = [
+        ('Baseline', baseline_starts, baseline_finishes, 0.55, 0.35, 'darkgrey'),
+        ('Current', starts, finishes, 0.1, 0.45, 'lightgreen'),
+        ('Actual', actual_starts, actual_finishes, 0.1, 0.45, 'cornflowerblue'),
+    ]
+    for label, series_starts, series_finishes, offset, height, color in series:
+        collection = _bar_collection(rows, series_starts, series_finishes, offset, height, facecolors=color, edgecolors=color, linewidths=edge_width, label=label, rasterized=rasterized)
+        ax.add_collection(collection, autolim=False)  # limits are set from the dates below
+
+    # Separate and label the groups
+    if group_by is not None and len(json_data) > 0:
+        sorted_groups = groups[order]
+        boundaries = np.flatnonzero(sorted_groups[1:] != sorted_groups[:-1]) + 1
+        group_starts = np.concatenate([[0], boundaries])
+        group_ends = np.concatenate([boundaries, [len(json_data)]])
+        ax.hlines(boundaries, 0, 1, transform=ax.get_yaxis_transform(), colors='black', linewidth=0.5)
+        if len(json_data) > max_labels:
+            ax.set_yticks((group_starts + group_ends) / 2)
+            ax.set_yticklabels(sorted_groups[group_starts])
+
+    if len(json_data) <= max_labels:
+        ax.set_yticks(np.arange(len(json_data)) + 0.5)
+        ax.set_yticklabels([json_data[i].get('name') or json_data[i].get('activityId', '') for i in order])
+    elif group_by is None:
+        ax.set_yticks([])
+
+    # Fit the date range of all bars and show the first activity at the top
+    all_dates = np.concatenate([starts, finishes, baseline_starts, baseline_finishes, actual_starts, actual_finishes])
+    if np.isfinite(all_dates).any():
+        margin = max((np.nanmax(all_dates) - np.nanmin(all_dates)) * 0.02, 1)
+        ax.set_xlim(np.nanmin(all_dates) - margin, np.nanmax(all_dates) + margin)
+    ax.set_ylim(max(len(json_data), 1), 0)
+
+    _style_date_axis(ax)
+
+    if data_date is not None:
+        ax.axvline(x=data_date, color='black', linestyle='--', linewidth=1, label='Data Date')
 
-    return df_counts.sort_index()
\ No newline at end of file
+    # Place the legend below the x-axis with no box around it on one line
+    ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.10), ncol=4, frameon=False)
+    ax.grid(True, axis='x')
+
+    ax.set_title('Activity Gantt Chart')
+    fig.tight_layout()
+    if show:
+        plt.show()
+
+    return fig
+
+def render_to_bytes(plot_function, *args, fmt='png', dpi=100, figsize=None, cache=None, **style):
+    """
+    Render a plot headless and return the encoded image.
+    With a cache, an image that was already rendered for the same data and options is returned without running matplotlib.
+
+    Parameters
+    ----------
+    plot_function : callable
+        One of the plotting functions in this module, e.g. `plot_schedule_delay`
+    *args
+        Input data passed to the plotting function
+    fmt : str, default 'png'
+        Image format, e.g. `png`, `svg` or `pdf`
+    dpi : int, default 100
+        Resolution of raster formats
+    figsize : tuple, default None
+        Figure size in inches. If None, uses the plot's default size
+    cache : RenderCache, default None
+        Cache to read from and write to
+    **style
+        Additional keyword arguments passed to the plotting function
+
+    Returns
+    -------
+    bytes
+        The encoded image
+    """
+    figsize = figsize or FIGURE_SIZES.get(plot_function.__name__, (14, 6))
+
+    if cache is not None:
+        key = cache.make_key(plot_function.__name__, args, dict(style, fmt=fmt, dpi=dpi, figsize=figsize))
+        data = cache.get(key)
+        if data is not None:
+            logger.debug("Render cache hit for %s", plot_function.__name__)
+            return data
+
+    fig = Figure(figsize=figsize)
+    try:
+        plot_function(*args, ax=fig.add_subplot(), show=False, **style)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, dpi=dpi)
+    finally:
+        release_figure(fig)
+
+    data = buffer.getvalue()
+    if cache is not None:
+        cache.put(key, data)
+
+    return data
@@ -0,0 +1,193 @@
+import os
+import socket
+import sqlite3
+import time
+import uuid
+
+from smartpm.logging_config import logger
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_id TEXT NOT NULL,
+    scenario_id TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    UNIQUE (project_id, scenario_id, endpoint)
+)
+"""
+
+def default_worker_id():
+    """Worker ID that is unique across processes and machines sharing a queue."""
+    return f'{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}'
+
+class WorkQueue:
+    """
+    SQLite-backed queue of (project, scenario, endpoint) crawl tasks shared by worker processes.
+
+    Workers lease a task for a limited time. A task whose lease expires (for example because its worker
+    died) is handed to another worker, and a failed task is retried until `max_attempts` is reached.
+    Only the worker holding the current lease can complete a task, so each task is marked done once.
+
+    The queue uses SQLite's rollback journal so it can live on a filesystem shared by several machines,
+    as long as that filesystem supports file locking.
+    """
+    def __init__(self, path, lease_seconds=300, max_attempts=3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        with self._connect() as conn:
+            conn.execute(_SCHEMA)
+
+    def _connect(self):
+        # A connection per operation keeps the queue safe to use from threads and forked processes
+        conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return _Connection(conn)
+
+    def enqueue(self, tasks):
+        """
+        Add tasks to the queue. Tasks that are already queued are ignored.
+
+        Parameters
+        ----------
+        tasks : list of tuple
+            (project_id, scenario_id, endpoint) tuples
+
+        Returns
+        -------
+        int
+            Number of tasks added
+        """
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            before = conn.execute('SELECT COUNT(*) FROM tasks').fetchone()[0]
+            conn.executemany(
+                'INSERT OR IGNORE INTO tasks (project_id, scenario_id, endpoint) VALUES (?, ?, ?)',
+                [(str(project_id), str(scenario_id), endpoint) for project_id, scenario_id, endpoint in tasks]
+            )
+            after = conn.execute('SELECT COUNT(*) FROM tasks').fetchone()[0]
+            conn.execute('COMMIT')
+
+        logger.debug("Enqueued %s tasks in %s", after - before, self.path)
+        return after - before
+
+    def lease(self, worker_id):
+        """
+        Lease the next available task.
+
+        Parameters
+        ----------
+        worker_id : str
+            ID of the worker taking the lease
+
+        Returns
+        -------
+        dict or None
+            Task with `id`, `project_id`, `scenario_id`, `endpoint` and `attempts`, or None if no task is available
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            # Tasks whose lease expired on their last attempt will not be retried
+            conn.execute(
+                'UPDATE tasks SET status = ?, last_error = ? WHERE status = ? AND lease_expires < ? AND attempts >= ?',
+                (FAILED, 'lease expired', LEASED, now, self.max_attempts)
+            )
+            row = conn.execute(
+                'SELECT * FROM tasks WHERE status = ? OR (status = ? AND lease_expires < ?) ORDER BY id LIMIT 1',
+                (PENDING, LEASED, now)
+            ).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+
+            conn.execute(
+                'UPDATE tasks SET status = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?',
+                (LEASED, worker_id, now + self.lease_seconds, row['id'])
+            )
+            conn.execute('COMMIT')
+
+        return {
+            'id': row['id'],
+            'project_id': row['project_id'],
+            'scenario_id': row['scenario_id'],
+            'endpoint': row['endpoint'],
+            'attempts': row['attempts'] + 1
+        }
+
+    def complete(self, task_id, worker_id):
+        """
+        Mark a leased task as done.
+
+        Returns
+        -------
+        bool
+            True if the worker still held the lease, False if the task was handed to another worker
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                'UPDATE tasks SET status = ?, lease_expires = NULL, last_error = NULL WHERE id = ? AND status = ? AND lease_owner = ?',
+                (DONE, task_id, LEASED, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, task_id, worker_id, error):
+        """
+        Release a leased task after an error. The task is retried unless it has used all of its attempts.
+
+        Returns
+        -------
+        bool
+            True if the worker still held the lease
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                'UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, lease_owner = NULL, '
+                'lease_expires = NULL, last_error = ? WHERE id = ? AND status = ? AND lease_owner = ?',
+                (self.max_attempts, FAILED, PENDING, str(error), task_id, LEASED, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def counts(self):
+        """
+        Count the tasks in each status.
+
+        Returns
+        -------
+        dict
+            Number of `pending`, `leased`, `done` and `failed` tasks
+        """
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        with self._connect() as conn:
+            for row in conn.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status'):
+                counts[row[0]] = row[1]
+        return counts
+
+    def failed_tasks(self):
+        """List the tasks that used all of their attempts, with their last error."""
+        with self._connect() as conn:
+            rows = conn.execute('SELECT project_id, scenario_id, endpoint, last_error FROM tasks WHERE status = ?', (FAILED,))
+            return [tuple(row) for row in rows]
+
+class _Connection:
+    """Context manager that closes the connection, rolling back an open transaction on error."""
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is not None and self.conn.in_transaction:
+            self.conn.rollback()
+        self.conn.close()
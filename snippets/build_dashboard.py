@@ -0,0 +1,47 @@
+import datetime
+import os
+import sys
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from dotenv import load_dotenv
+load_dotenv()  # Load environment variables from .env file
+
+from smartpm.client import SmartPMClient
+from smartpm.crawl import ResultStore, crawl_portfolio
+from smartpm.dashboard import build_dashboard, load_portfolio
+from smartpm.endpoints.projects import Projects
+from smartpm.journal import CrawlJournal
+from smartpm.render_cache import RenderCache
+from smartpm.logging_config import enable_console_logging
+
+API_KEY = os.getenv("API_KEY")
+COMPANY_ID = os.getenv("COMPANY_ID")
+
+enable_console_logging()  # The SDK is silent by default, print its log records while exploring
+
+def main():
+    # Setup SDK
+    client = SmartPMClient(API_KEY, COMPANY_ID)
+
+    # Crawl the default scenario of every project. The journal is kept per day, so a crawl restarted
+    # on the same day skips what is already journaled while the next day's run fetches fresh data
+    store = ResultStore("crawl")
+    crawl_portfolio(
+        client,
+        store,
+        journal=CrawlJournal(f"crawl/journal-{datetime.date.today().isoformat()}.jsonl"),
+        endpoints=['scenario_details', 'activities', 'percent_complete_curve', 'earned_schedule_curve', 'delay_table', 'changes_summary'],
+        default_scenario_only=True
+    )
+
+    # Build the dashboard, only projects whose data changed since the last build are rendered again
+    projects = Projects(client).get_projects()
+    portfolio = load_portfolio(store, projects)
+    summary = build_dashboard(portfolio, "dashboard", cache=RenderCache("dashboard-cache"))
+    print(f"Built {len(summary['built'])} project pages, {len(summary['skipped'])} unchanged, {len(summary['failed'])} failed")
+    print("Open dashboard/index.html in a browser")
+
+if __name__ == "__main__":
+    main()
@@ -14,10 +14,13 @@ from smartpm.endpoints.projects import Projects # import projects to get project
 from smartpm.endpoints.scenarios import Scenarios
 from smartpm.endpoints.activity import Activity
 from smartpm.endpoints.uploads import Uploads
+from smartpm.logging_config import enable_console_logging
 
 API_KEY = os.getenv("API_KEY")
 COMPANY_ID = os.getenv("COMPANY_ID")
 
+enable_console_logging()  # The SDK is silent by default, print its log records while exploring
+
 def main():
     # Setup SDK
     client = SmartPMClient(API_KEY, COMPANY_ID)
@@ -11,10 +11,13 @@ load_dotenv()  # Load environment variables from .env file
 from smartpm.client import SmartPMClient
 from smartpm.endpoints.projects import Projects # import projects to get project IDs
 from smartpm.endpoints.models import Models
+from smartpm.logging_config import enable_console_logging
 
 API_KEY = os.getenv("API_KEY")
 COMPANY_ID = os.getenv("COMPANY_ID")
 
+enable_console_logging()  # The SDK is silent by default, print its log records while exploring
+
 def main():
     # Setup SDK
     client = SmartPMClient(API_KEY, COMPANY_ID)
@@ -12,10 +12,13 @@ from smartpm.client import SmartPMClient
 from smartpm.endpoints.projects import Projects # import projects to get project IDs
 from smartpm.endpoints.scenarios import Scenarios
 from smartpm.endpoints.schedule import Schedule
+from smartpm.logging_config import enable_console_logging
 
 API_KEY = os.getenv("API_KEY")
 COMPANY_ID = os.getenv("COMPANY_ID")
 
+enable_console_logging()  # The SDK is silent by default, print its log records while exploring
+
 def main():
     # Setup SDK
     client = SmartPMClient(API_KEY, COMPANY_ID)
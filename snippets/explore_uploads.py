@@ -12,10 +12,14 @@ from smartpm.client import SmartPMClient
 from smartpm.endpoints.projects import Projects # import projects to get project IDs
 from smartpm.endpoints.scenarios import Scenarios
 from smartpm.endpoints.uploads import Uploads
+from smartpm.snapshots import SnapshotStore
+from smartpm.logging_config import enable_console_logging
 
 API_KEY = os.getenv("API_KEY")
 COMPANY_ID = os.getenv("COMPANY_ID")
 
+enable_console_logging()  # The SDK is silent by default, print its log records while exploring
+
 def main():
     # Setup SDK
     client = SmartPMClient(API_KEY, COMPANY_ID)
@@ -46,6 +50,18 @@ def main():
     print("Schedule upload data:")
     print(json.dumps(uploads, indent=4))
     # ---------------
+
+    # Backfill Snapshots
+    # ------------------
+    store = SnapshotStore("reference/snapshots")
+    fetched = upload_api.backfill_snapshots(
+        project_id=project_id,
+        scenario_id=scenario_id,
+        store=store
+    )
+    print(f"Fetched {len(fetched)} new snapshots")
+    print(f"Stored data dates: {store.list_data_dates(project_id, scenario_id)}")
+    # ------------------
     
 if __name__ == "__main__":
     main()
@@ -0,0 +1,85 @@
+import pytest
+import os
+import sys
+import logging
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from smartpm.crawl import ResultStore, crawl_portfolio
+from smartpm.exceptions import SmartPMError
+from smartpm.journal import CrawlJournal
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class FakeClient:
+    """Serves a portfolio of two projects with two scenarios each, the second one is the default."""
+    def __init__(self, fail_endpoint=None):
+        self.fail_endpoint = fail_endpoint
+        self.requests = []
+
+    def _get(self, endpoint, params=None):
+        self.requests.append(endpoint)
+        if self.fail_endpoint and endpoint.endswith(self.fail_endpoint):
+            raise SmartPMError('API request failed with status 500')
+        if endpoint == 'v1/projects':
+            return [{'id': 1, 'defaultScenarioId': 12}, {'id': 2, 'defaultScenarioId': 22}]
+        if endpoint.endswith('/scenarios'):
+            project_id = int(endpoint.split('/')[2])
+            return [{'id': project_id * 10 + 1, 'isDefault': False}, {'id': project_id * 10 + 2, 'isDefault': True}]
+        return {'endpoint': endpoint}
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(str(tmp_path / 'results'))
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / 'journal.jsonl')
+
+def test_crawl_portfolio(store, journal_path):
+    """Test that every scenario endpoint is fetched and stored."""
+    summary = crawl_portfolio(FakeClient(), store, CrawlJournal(journal_path), endpoints=['activities', 'delay_table'])
+    logger.info("Summary: %s", summary)
+
+    assert summary == {'completed': 8, 'skipped': 0, 'failed': []}
+    assert store.read_result(2, 22, 'delay_table') == {'endpoint': 'v1/projects/2/scenarios/22/delay'}
+
+def test_crawl_default_scenario_only(store):
+    """Test that the default scenario is crawled, also when it is not listed first or the projects are given."""
+    for project_ids in (None, [1, 2]):
+        client = FakeClient()
+        summary = crawl_portfolio(client, store, endpoints=['delay_table'], project_ids=project_ids, default_scenario_only=True)
+        assert summary == {'completed': 2, 'skipped': 0, 'failed': []}
+        assert sorted(endpoint for endpoint in client.requests if endpoint.endswith('/delay')) == \
+            ['v1/projects/1/scenarios/12/delay', 'v1/projects/2/scenarios/22/delay']
+
+def test_crawl_portfolio_resumes(store, journal_path):
+    """Test that a restarted crawl only fetches the tasks that did not finish."""
+    summary = crawl_portfolio(FakeClient(fail_endpoint='/delay'), store, CrawlJournal(journal_path), endpoints=['activities', 'delay_table'])
+    assert summary['completed'] == 4
+    assert len(summary['failed']) == 4
+
+    client = FakeClient()
+    summary = crawl_portfolio(client, store, CrawlJournal(journal_path), endpoints=['activities', 'delay_table'])
+    logger.info("Requests after restart: %s", client.requests)
+
+    assert summary == {'completed': 4, 'skipped': 4, 'failed': []}
+    assert all(endpoint.endswith('/delay') for endpoint in client.requests)
+
+def test_journal_ignores_partial_entry(journal_path):
+    """Test that a journal cut off mid-write can still be loaded and appended to."""
+    journal = CrawlJournal(journal_path)
+    journal.mark_done(1, 11, 'activities')
+    with open(journal_path, 'a', encoding='utf-8') as f:
+        f.write('{"projectId": 1, "scen')
+
+    journal = CrawlJournal(journal_path)
+    journal.mark_done(1, 12, 'activities')
+
+    journal = CrawlJournal(journal_path)
+    assert journal.is_done(1, 11, 'activities')
+    assert journal.is_done(1, 12, 'activities')
+    assert len(journal) == 2
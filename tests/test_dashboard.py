@@ -0,0 +1,96 @@
+import pytest
+import os
+import sys
+import logging
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from smartpm.dashboard import build_dashboard, load_portfolio, project_summary
+from smartpm.crawl import ResultStore
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def make_entry(project_id, name, shift=0):
+    dates = [f'2024-{month:02d}-01' for month in range(1, 7)]
+    return {
+        'project': {'id': project_id, 'name': name, 'defaultScenarioId': f'{project_id}-s'},
+        'scenario_id': f'{project_id}-s',
+        'data': {
+            'scenario_details': {'dataDate': '2024-06-01'},
+            'percent_complete_curve': {
+                'percentCompleteTypes': {'ACTUAL': 'Actual (Cumulative)', 'PLANNED': 'Planned (Early)'},
+                'data': [{'DATE': date, 'ACTUAL': i * 10.0 + shift, 'PLANNED': i * 12.0} for i, date in enumerate(dates)]
+            },
+            'delay_table': [{
+                'dataDate': f'{date}T00:00:00',
+                'endDateVariance': {'cumulative': i + shift},
+                'criticalPathDelay': {'cumulative': i},
+                'delayRecovery': {'cumulative': 0}
+            } for i, date in enumerate(dates)],
+        }
+    }
+
+@pytest.fixture
+def portfolio():
+    return [make_entry('p1', 'Tower <A>'), make_entry('p2', 'Hospital')]
+
+def test_build_dashboard_incremental(tmp_path, portfolio):
+    """Test that only projects whose data changed are rebuilt."""
+    first = build_dashboard(portfolio, str(tmp_path), use_threads=True)
+    assert sorted(first['built']) == ['p1', 'p2']
+    assert first['failed'] == {}
+    assert os.path.exists(tmp_path / 'charts' / 'p1-percent_complete.png')
+    assert os.path.exists(tmp_path / 'charts' / 'p2-schedule_delay.png')
+
+    index = (tmp_path / 'index.html').read_text()
+    assert 'Tower &lt;A&gt;' in index
+    assert 'projects/p2.html' in index
+    assert '../charts/p1-schedule_delay.png' in (tmp_path / 'projects' / 'p1.html').read_text()
+
+    second = build_dashboard(portfolio, str(tmp_path), use_threads=True)
+    assert second['built'] == []
+    assert sorted(second['skipped']) == ['p1', 'p2']
+
+    portfolio[1] = make_entry('p2', 'Hospital', shift=1)
+    third = build_dashboard(portfolio, str(tmp_path), use_threads=True)
+    assert third['built'] == ['p2']
+    assert third['skipped'] == ['p1']
+
+    # Charts whose data is gone and projects that left the portfolio are removed
+    del portfolio[1]['data']['delay_table']
+    fourth = build_dashboard(portfolio[1:], str(tmp_path), use_threads=True)
+    assert fourth['built'] == ['p2'] and fourth['removed'] == ['p1']
+    assert not os.path.exists(tmp_path / 'charts' / 'p2-schedule_delay.png')
+    assert not os.path.exists(tmp_path / 'charts' / 'p1-percent_complete.png')
+    assert not os.path.exists(tmp_path / 'projects' / 'p1.html')
+
+def test_failed_render_keeps_previous_page(tmp_path, portfolio):
+    """Test that a project whose render fails keeps its previous page and the charts it links to."""
+    build_dashboard(portfolio, str(tmp_path), use_threads=True)
+
+    portfolio[0]['data']['percent_complete_curve'] = {'data': [{'unexpected': 1}]}
+    summary = build_dashboard(portfolio, str(tmp_path), use_threads=True)
+    assert list(summary['failed']) == ['p1']
+
+    page = (tmp_path / 'projects' / 'p1.html').read_text()
+    for chart in ('percent_complete', 'schedule_delay'):
+        assert f'../charts/p1-{chart}.png' in page
+        assert os.path.exists(tmp_path / 'charts' / f'p1-{chart}.png')
+
+def test_load_portfolio_from_result_store(tmp_path, portfolio):
+    """Test collecting crawled responses and summarizing them for the index."""
+    store = ResultStore(str(tmp_path))
+    entry = portfolio[0]
+    for endpoint, data in entry['data'].items():
+        store.write_result('p1', 'p1-s', endpoint, data)
+
+    loaded = load_portfolio(store, [entry['project']])
+    assert loaded[0]['data'] == entry['data']
+
+    summary = project_summary(loaded[0])
+    assert summary['actualPercentComplete'] == 50.0
+    assert summary['endDateVariance'] == 5
+    assert summary['activities'] is None
@@ -0,0 +1,50 @@
+import pytest
+import os
+import sys
+import logging
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from smartpm.diff import diff_activities
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest.fixture
+def old_activities():
+    return [
+        {'activityId': 'A100', 'name': 'Mobilize', 'startDate': '2024-01-01T00:00:00', 'finishDate': '2024-01-05T00:00:00', 'plannedDuration': 5, 'percentComplete': 100.0},
+        {'activityId': 'A200', 'name': 'Foundations', 'startDate': '2024-01-08T00:00:00', 'finishDate': '2024-02-01T00:00:00', 'plannedDuration': 18, 'percentComplete': 20.0},
+        {'activityId': 'A300', 'name': 'Framing', 'startDate': '2024-02-02T00:00:00', 'finishDate': '2024-03-01T00:00:00', 'plannedDuration': 20, 'percentComplete': 0.0},
+    ]
+
+@pytest.fixture
+def new_activities():
+    return [
+        {'activityId': 'A100', 'name': 'Mobilize', 'startDate': '2024-01-01T00:00:00', 'finishDate': '2024-01-05T00:00:00', 'plannedDuration': 5, 'percentComplete': 100.0},
+        {'activityId': 'A200', 'name': 'Foundations', 'startDate': '2024-01-08T00:00:00', 'finishDate': '2024-02-11T00:00:00', 'plannedDuration': 25, 'percentComplete': 60.0},
+        {'activityId': 'A400', 'name': 'Roofing', 'startDate': None, 'finishDate': None, 'plannedDuration': None, 'percentComplete': None},
+    ]
+
+def test_diff_activities(old_activities, new_activities):
+    """Test added, removed and changed activities with per-field deltas."""
+    diff = diff_activities(old_activities, new_activities)
+    logger.info("Changed: %s", diff['changed'].to_dict(orient='index'))
+
+    assert list(diff['added'].index) == ['A400']
+    assert list(diff['removed'].index) == ['A300']
+    assert list(diff['changed'].index) == ['A200']
+
+    changed = diff['changed'].loc['A200']
+    assert changed['startDate_delta'] == 0
+    assert changed['finishDate_delta'] == 10
+    assert changed['plannedDuration_delta'] == 7
+    assert changed['percentComplete_delta'] == 40
+
+def test_diff_activities_identical(old_activities):
+    """Test that identical payloads produce an empty diff."""
+    diff = diff_activities(old_activities, old_activities)
+
+    assert all(len(frame) == 0 for frame in diff.values())
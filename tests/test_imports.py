@@ -0,0 +1,57 @@
+import pytest
+import os
+import sys
+import json
+import logging
+import subprocess
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PACKAGE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../'))
+
+# Modules that only plotting and DataFrame helpers need
+HEAVY_MODULES = ['numpy', 'pandas', 'matplotlib']
+
+LIGHT_MODULES = [
+    'smartpm.client',
+    'smartpm.endpoints.activity',
+    'smartpm.endpoints.changes',
+    'smartpm.endpoints.delay',
+    'smartpm.endpoints.models',
+    'smartpm.endpoints.projects',
+    'smartpm.endpoints.scenarios',
+    'smartpm.endpoints.schedule',
+    'smartpm.endpoints.uploads',
+    'smartpm.crawl',
+    'smartpm.dashboard',
+    'smartpm.render_cache',
+    'smartpm.rendering',
+]
+
+def import_in_subprocess(modules):
+    # A fresh interpreter, so modules imported by other tests do not count
+    code = (
+        "import sys, json\n"
+        f"for module in {modules!r}: __import__(module)\n"
+        f"print(json.dumps({{'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    output = subprocess.run([sys.executable, '-c', code], cwd=PACKAGE_ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+def test_endpoints_do_not_import_heavy_dependencies():
+    """Test that importing the endpoints does not load pandas, matplotlib or numpy. Import time is benchmarked in benchmarks/bench_imports.py."""
+    result = import_in_subprocess(LIGHT_MODULES)
+
+    assert result['loaded'] == []
+
+def test_plotting_imports_on_first_use():
+    """Test that the heavy dependencies are still available through the plotting modules."""
+    result = import_in_subprocess(['smartpm.visuals'])
+
+    assert 'matplotlib' in result['loaded']
+    assert 'pandas' in result['loaded']
@@ -0,0 +1,88 @@
+import pytest
+import os
+import sys
+import logging
+import timeit
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from smartpm import instrumentation
+from smartpm.decorators import api_wrapper, utility
+from smartpm.instrumentation import Hook, subscribe, unsubscribe
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class FakeEndpoint:
+    @api_wrapper
+    def get_items(self, count, prefix='item'):
+        """Return a list of items."""
+        return [{'id': f'{prefix}-{i}'} for i in range(count)]
+
+    @utility
+    def fail(self):
+        raise ValueError("boom")
+
+class RecordingHook(Hook):
+    def __init__(self):
+        self.events = []
+
+    def on_call_start(self, event):
+        self.events.append(('start', event.name))
+
+    def on_call_end(self, event):
+        self.events.append(('end', event.name, event.args, event.kwargs, event.payload_size, event.duration))
+
+    def on_call_error(self, event):
+        self.events.append(('error', event.name, type(event.error)))
+
+@pytest.fixture
+def hook():
+    hook = subscribe(RecordingHook())
+    yield hook
+    unsubscribe(hook)
+
+def test_hooks_see_calls_and_errors(hook):
+    """Test that hooks get start, end and error events with duration and payload size."""
+    endpoint = FakeEndpoint()
+    items = endpoint.get_items(2, prefix='a')
+
+    assert items == [{'id': 'a-0'}, {'id': 'a-1'}]
+    assert hook.events[0] == ('start', 'FakeEndpoint.get_items')
+    _, name, args, kwargs, payload_size, duration = hook.events[1]
+    assert (name, args, kwargs) == ('FakeEndpoint.get_items', (2,), {'prefix': 'a'})
+    assert payload_size == len('[{"id":"a-0"},{"id":"a-1"}]')
+    assert duration >= 0
+
+    with pytest.raises(ValueError):
+        endpoint.fail()
+    assert hook.events[-1] == ('error', 'FakeEndpoint.fail', ValueError)
+    assert FakeEndpoint.get_items.__doc__ == "Return a list of items."
+
+def test_broken_hook_does_not_break_calls(hook):
+    """Test that an exception in a hook is logged and the call still returns."""
+    class BrokenHook(Hook):
+        def on_call_end(self, event):
+            raise RuntimeError("hook bug")
+
+    broken = subscribe(BrokenHook())
+    try:
+        assert len(FakeEndpoint().get_items(3)) == 3
+    finally:
+        unsubscribe(broken)
+    assert hook.events[-1][0] == 'end'
+
+def test_no_hooks_fast_path():
+    """Test that nothing is recorded without subscribers and log the wrapper overhead."""
+    assert instrumentation.subscribed_hooks() == ()
+
+    def plain(self, count):
+        return count
+    wrapped = api_wrapper(plain)
+
+    direct = min(timeit.repeat(lambda: plain(None, 1), number=100000, repeat=3))
+    decorated = min(timeit.repeat(lambda: wrapped(None, 1), number=100000, repeat=3))
+    logger.info("Decorator overhead without hooks: %.0fns per call", (decorated - direct) / 100000 * 1e9)
+    assert decorated < direct * 10
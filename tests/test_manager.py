@@ -0,0 +1,96 @@
+import pytest
+import os
+import sys
+import logging
+import tempfile
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from smartpm.cache import MemoryCache, cache_key
+from smartpm.client import create_session
+from smartpm.crawl import ResultStore
+from smartpm.endpoints.projects import Projects
+from smartpm.manager import ClientManager
+from smartpm.metrics import ListSink
+from smartpm.testing.stub_server import StubServer
+from smartpm.testing.synthetic import SyntheticPortfolio
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest.fixture(scope='module')
+def portfolio():
+    return SyntheticPortfolio(projects=2, scenarios=1, activities=10, seed=11)
+
+def test_clients_share_pool_cache_and_sinks(portfolio):
+    """Test that per-company clients share infrastructure while their cache entries and rate limits stay apart."""
+    sink = ListSink()
+    with StubServer(portfolio) as server, ClientManager('stub-key', base_url=server.base_url, rate=1000) as manager:
+        manager.add_event_sink(sink)
+        first, second = manager.client('company-a'), manager.client('company-b')
+        assert manager.client('company-a') is first
+        assert first.session is second.session and first.cache is second.cache
+        assert first.headers['X-COMPANY-ID'] == 'company-a'
+
+        projects = Projects(first).get_projects()
+        assert Projects(first).get_projects() == projects
+        Projects(second).get_projects()
+
+    assert [event.cache_hit for event in sink.events] == [False, True, False]
+    assert set(manager.stats()) == {('company-a', 'stub-key'), ('company-b', 'stub-key')}
+    assert manager.stats()[('company-a', 'stub-key')]['interactive']['requests'] == 1
+
+def test_cache_is_separate_per_api_key(portfolio):
+    """Test that a second API key of the same company is not served responses fetched with the first."""
+    sink = ListSink()
+    with StubServer(portfolio) as server, ClientManager('stub-key', base_url=server.base_url) as manager:
+        manager.add_event_sink(sink)
+        first, second = manager.client('company-a'), manager.client('company-a', api_key='other-key')
+        assert first is not second
+
+        Projects(first).get_projects()
+        Projects(second).get_projects()
+        Projects(second).get_projects()
+
+    assert [event.cache_hit for event in sink.events] == [False, False, True]
+
+def test_close_leaves_passed_session_open(monkeypatch):
+    """Test that closing the manager only closes a session it created."""
+    closed = []
+    session = create_session()
+    monkeypatch.setattr(session, 'close', lambda: closed.append(session))
+    with ClientManager('stub-key', session=session):
+        pass
+    assert closed == []
+
+    with ClientManager('stub-key') as manager:
+        monkeypatch.setattr(manager.session, 'close', lambda: closed.append(manager.session))
+    assert closed == [manager.session]
+
+def test_memory_cache_evicts_and_expires():
+    """Test that the cache keeps to its size limit, least recently used first, and drops expired entries."""
+    cache = MemoryCache(max_bytes=10)
+    cache.set('a', b'12345')
+    cache.set('b', b'12345')
+    cache.get('a')
+    cache.set('c', b'12345')
+    assert cache.get('b') is None and cache.get('a') == b'12345' and cache.size == 10
+
+    cache = MemoryCache(ttl=0)
+    cache.set('a', b'1')
+    assert cache.get('a') is None
+    key = cache_key('secret-key', 'company', 'v1/projects', {'b': 2, 'a': 1, 'c': None})
+    assert key.endswith(':company:v1/projects?a=1&b=2') and 'secret-key' not in key
+
+def test_crawl_companies(portfolio):
+    """Test that several companies are crawled in parallel into their own stores."""
+    with StubServer(portfolio) as server, ClientManager('stub-key', base_url=server.base_url, cache=False) as manager, \
+            tempfile.TemporaryDirectory() as root:
+        summaries = manager.crawl_companies(['company-a', 'company-b'], root, endpoints=['scenario_details'], max_workers=2)
+
+        project_id = portfolio.project_ids()[0]
+        for company_id in ('company-a', 'company-b'):
+            assert summaries[company_id]['completed'] == 2
+            assert ResultStore(os.path.join(root, company_id)).has_result(project_id, project_id * 100, 'scenario_details')
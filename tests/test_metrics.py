@@ -0,0 +1,115 @@
+import pytest
+import os
+import sys
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from smartpm.client import SmartPMClient
+from smartpm.endpoints.projects import Projects
+from smartpm.endpoints.scenarios import Scenarios
+from smartpm.exceptions import NotFoundError
+from smartpm.metrics import HistogramSink, ListSink, OpenTelemetrySink, endpoint_template
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    throttled = set()
+
+    def do_GET(self):
+        if self.path.startswith('/public/v1/projects/1/scenarios') and self.path not in self.throttled:
+            # Throttle the first request to each scenarios URL
+            self.throttled.add(self.path)
+            self.reply(429, {'message': 'slow down'}, {'Retry-After': '0'})
+        elif self.path.startswith('/public/v1/projects/1/scenarios'):
+            self.reply(200, [{'id': 's1', 'name': 'Full Schedule'}])
+        elif self.path.startswith('/public/v1/projects/'):
+            self.reply(404, {'message': 'not found'})
+        else:
+            self.reply(200, [{'id': str(i), 'name': f'Project {i}'} for i in range(100)])
+
+    def reply(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def client():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = SmartPMClient('key', 'company', base_url=f'http://127.0.0.1:{server.server_address[1]}/public', max_retries=2)
+    yield client
+    server.shutdown()
+    server.server_close()
+
+def test_endpoint_template():
+    """Test that IDs in endpoint paths are replaced with placeholders."""
+    assert endpoint_template('v1/projects') == 'v1/projects'
+    assert endpoint_template('v1/projects/123/scenarios/456/delay') == 'v1/projects/{project_id}/scenarios/{scenario_id}/delay'
+    assert endpoint_template('v1/quality-profiles/9') == 'v1/quality-profiles/{quality_profile_id}'
+
+def test_request_events(client):
+    """Test that every call emits an event with timings, size, status and retries."""
+    sink = client.add_event_sink(ListSink())
+    histogram = client.add_event_sink(HistogramSink())
+
+    assert len(Projects(client).get_projects()) == 100
+    assert len(Projects(client).get_projects()) == 100
+    assert Scenarios(client).get_scenarios('1')[0]['id'] == 's1'
+    with pytest.raises(NotFoundError):
+        Projects(client).get_project('2')
+
+    first, second, scenarios, missing = sink.events
+    assert first.endpoint_template == 'v1/projects'
+    assert first.status == 200 and first.response_bytes > 1000 and first.retries == 0
+    assert first.connect > 0
+    assert second.connect == 0  # pooled connection reused
+    assert scenarios.retries == 1 and scenarios.status == 200
+    assert missing.endpoint_template == 'v1/projects/{project_id}' and missing.error == 'NotFoundError'
+    assert all(not event.cache_hit for event in sink.events)
+
+    assert histogram.quantile(0.5, 'v1/projects') > 0
+    text = histogram.to_prometheus()
+    assert 'smartpm_request_duration_seconds_count{method="GET",endpoint="v1/projects",status="200"} 2' in text
+    assert 'smartpm_request_retries_total{method="GET",endpoint="v1/projects/{project_id}/scenarios",status="200"} 1' in text
+
+def test_opentelemetry_sink(client):
+    """Test that events are recorded as spans on the given tracer."""
+    class Span:
+        def __init__(self, name, start_time, attributes):
+            self.name, self.start_time, self.attributes = name, start_time, attributes
+
+        def end(self, end_time):
+            self.end_time = end_time
+
+    class Tracer:
+        spans = []
+
+        def start_span(self, name, start_time=None, attributes=None):
+            self.spans.append(Span(name, start_time, attributes))
+            return self.spans[-1]
+
+    tracer = Tracer()
+    client.add_event_sink(OpenTelemetrySink(tracer))
+    Projects(client).get_projects()
+
+    span = tracer.spans[0]
+    assert span.name == 'GET v1/projects'
+    assert span.attributes['http.response.status_code'] == 200
+    assert span.end_time >= span.start_time
@@ -0,0 +1,66 @@
+import pytest
+import os
+import sys
+import logging
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from smartpm.client import SmartPMClient
+from smartpm.endpoints.activity import Activity
+from smartpm.endpoints.schedule import Schedule
+from smartpm.metrics import ListSink
+from smartpm.planner import QueryPlanner, register_output, OUTPUTS
+from smartpm.testing.stub_server import StubServer
+from smartpm.testing.synthetic import SyntheticPortfolio
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest.fixture(scope='module')
+def portfolio():
+    return SyntheticPortfolio(projects=2, scenarios=2, activities=40, seed=5)
+
+@pytest.fixture(scope='module')
+def scenarios(portfolio):
+    return [(project_id, scenario_id) for project_id in portfolio.project_ids() for scenario_id in portfolio.scenario_ids(project_id)]
+
+def test_plan_deduplicates_requests(scenarios):
+    """Test that outputs computed from the same response share one request per scenario."""
+    plan = QueryPlanner(None).plan(scenarios + scenarios[:1], ['completion_counts', 'activity_count', 'activities', 'quality_grade'])
+    assert plan.scenarios == scenarios
+    assert len(plan) == 2 * len(scenarios)
+    assert plan.naive_requests == 4 * (len(scenarios) + 1)
+    assert '4 outputs' in plan.describe()
+
+    with pytest.raises(ValueError):
+        QueryPlanner(None).plan(scenarios, ['unknown'])
+
+def test_query_matches_sdk_methods(portfolio, scenarios):
+    """Test that a query makes one request per planned response and returns what the SDK methods return."""
+    outputs = ['completion_counts', 'activity_count', 'quality_grade', 'delay_series', 'data_date']
+    sink = ListSink()
+    with StubServer(portfolio) as server:
+        client = SmartPMClient('stub-key', 'stub-company', base_url=server.base_url)
+        planner = QueryPlanner(client)
+        plan = planner.plan(scenarios, outputs)
+
+        client.add_event_sink(sink)
+        results = planner.execute(plan)
+        client.remove_event_sink(sink)
+
+        assert len(sink.events) == len(plan) == 4 * len(scenarios)
+        for project_id, scenario_id in scenarios:
+            result = results[(project_id, scenario_id)]
+            assert result['completion_counts'] == Activity(client).count_activities_by_completion(project_id, scenario_id)
+            assert result['activity_count'] == sum(result['completion_counts'].values())
+            assert result['quality_grade'] == Schedule(client).get_schedule_quality(project_id, scenario_id).get('grade')
+            assert len(result['delay_series'][0]) > 0
+
+        register_output('critical_count', ['activities'], lambda activities: sum(bool(a.get('critical')) for a in activities))
+        try:
+            results = planner.query(scenarios[:1], ['critical_count', 'activity_count'])
+            assert set(results[scenarios[0]]) == {'critical_count', 'activity_count'}
+        finally:
+            del OUTPUTS['critical_count']
@@ -0,0 +1,63 @@
+import pytest
+import os
+import sys
+import logging
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from smartpm.client import SmartPMClient
+from smartpm.endpoints.activity import Activity
+from smartpm.endpoints.projects import Projects
+from smartpm.instrumentation import subscribed_hooks
+from smartpm.profiling import CallProfiler
+from smartpm.testing.stub_server import StubServer
+from smartpm.testing.synthetic import SyntheticPortfolio
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest.fixture(scope='module')
+def portfolio():
+    return SyntheticPortfolio(projects=3, activities=100, seed=2)
+
+@pytest.fixture(scope='module')
+def client(portfolio):
+    with StubServer(portfolio) as server:
+        yield SmartPMClient('stub-key', 'stub-company', base_url=server.base_url)
+
+def test_call_tree(client, portfolio):
+    """Test that requests are attributed to the calls that made them and the profiler detaches on exit."""
+    project_id = portfolio.project_ids()[0]
+    with CallProfiler(client) as profiler:
+        Activity(client).count_activities_by_completion(project_id, project_id * 100)
+
+    assert profiler not in subscribed_hooks()
+    assert profiler not in client.event_sinks
+    (root,) = profiler.roots
+    assert root.name == 'Activity.count_activities_by_completion'
+    assert root.requests == []
+    (child,) = root.children
+    assert child.name == 'Activity.get_activities'
+    assert [request.endpoint_template for request in child.requests] == ['v1/projects/{project_id}/scenarios/{scenario_id}/activities']
+    assert profiler.duplicates() == []
+
+def test_repeated_fetches(client, portfolio):
+    """Test that identical requests within a section are reported as wasted and repeats across calls are counted."""
+    with CallProfiler(client) as profiler:
+        for name in ('first', 'second'):
+            with profiler.section(f'lookup {name}'):
+                Projects(client).find_project_by_name(name)
+                Projects(client).get_projects_dataframe()
+
+    duplicates = profiler.duplicates()
+    assert [root.name for root, _ in duplicates] == ['lookup first', 'lookup second']
+    assert duplicates[0][1]['wasted'] == 1
+    assert duplicates[0][1]['callers'] == ['Projects.find_project_by_name', 'Projects.get_projects_dataframe']
+
+    summary = profiler.summary()
+    assert summary['requests'] == 4
+    assert summary['wasted_requests'] == 2
+    assert summary['repeated_across_calls'] == 1
+    assert 'Wasted 2 of 4 requests' in profiler.format_report()
@@ -0,0 +1,105 @@
+import pytest
+import os
+import sys
+import logging
+import threading
+import time
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from smartpm.client import SmartPMClient
+from smartpm.endpoints.activity import Activity
+from smartpm.endpoints.projects import Projects
+from smartpm.exceptions import RateLimitExceededError
+from smartpm.metrics import ListSink
+from smartpm.scheduler import BATCH, INTERACTIVE, RequestScheduler, request_priority
+from smartpm.testing.faults import FaultProfile
+from smartpm.testing.stub_server import StubServer
+from smartpm.testing.synthetic import SyntheticPortfolio
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def test_interactive_requests_jump_ahead():
+    """Test that an interactive request is sent ahead of a batch backlog and that queue times are tracked per class."""
+    scheduler = RequestScheduler(rate=50, burst=1)
+    order = []
+
+    def send(priority):
+        scheduler.acquire(priority)
+        order.append(priority)
+
+    batch = [threading.Thread(target=send, args=(BATCH,)) for _ in range(20)]
+    for thread in batch:
+        thread.start()
+    time.sleep(0.05)
+    send(INTERACTIVE)
+    for thread in batch:
+        thread.join()
+
+    # About two batch requests were sent while the interactive one was being queued
+    assert order.index(INTERACTIVE) <= 5
+    stats = scheduler.stats()
+    assert stats[BATCH]['requests'] == 20 and stats[INTERACTIVE]['requests'] == 1
+    assert stats[INTERACTIVE]['max'] < stats[BATCH]['max']
+    assert stats[BATCH]['waiting'] == 0
+
+    with pytest.raises(ValueError):
+        scheduler.acquire('unknown')
+
+def test_interrupted_wait_leaves_the_queue(monkeypatch):
+    """Test that a request interrupted while queued does not block the requests after it."""
+    scheduler = RequestScheduler(rate=1000, burst=1)
+    scheduler.pause(0.05)
+
+    def interrupt(timeout=None):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(scheduler._condition, 'wait', interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        scheduler.acquire(BATCH)
+    monkeypatch.undo()
+
+    assert scheduler.stats()[BATCH]['waiting'] == 0
+    # Queued behind the interrupted request, it would wait forever if that one were still at the head
+    thread = threading.Thread(target=scheduler.acquire, args=(BATCH,), daemon=True)
+    thread.start()
+    thread.join(timeout=2)
+    assert not thread.is_alive()
+
+def test_client_requests_are_scheduled():
+    """Test that the client queues its requests in the class of the calling context, also inside composite utilities."""
+    portfolio = SyntheticPortfolio(projects=1, activities=20, seed=9)
+    project_id = portfolio.project_ids()[0]
+    scheduler = RequestScheduler(rate=1000)
+    sink = ListSink()
+    with StubServer(portfolio) as server:
+        client = SmartPMClient('stub-key', 'stub-company', base_url=server.base_url, scheduler=scheduler)
+        client.add_event_sink(sink)
+
+        Activity(client).get_activities(project_id, project_id * 100)
+        with request_priority(BATCH):
+            dates = [date.isoformat() for date in portfolio.data_dates(project_id)]
+            Activity(client).diff_data_dates(project_id, project_id * 100, dates[0], dates[-1])
+
+    assert [event.priority for event in sink.events] == [INTERACTIVE, BATCH, BATCH]
+    assert all(event.queue_wait >= 0.0 for event in sink.events)
+    assert scheduler.stats()[BATCH]['requests'] == 2
+
+def test_rate_limited_request_pauses_scheduler(monkeypatch):
+    """Test that a 429 pauses the shared scheduler for its Retry-After also when the request is not retried."""
+    portfolio = SyntheticPortfolio(projects=1, activities=10, seed=9)
+    project_id = portfolio.project_ids()[0]
+    scheduler = RequestScheduler(rate=1000)
+    pauses = []
+    monkeypatch.setattr(scheduler, 'pause', pauses.append)
+
+    throttled = FaultProfile('throttled', rate_limit_every=1, rate_limit_burst=1, retry_after=3)
+    with StubServer(portfolio, faults=throttled) as server:
+        projects = Projects(SmartPMClient('stub-key', 'stub-company', base_url=server.base_url, scheduler=scheduler))
+        projects.get_project(project_id)
+        with pytest.raises(RateLimitExceededError):
+            projects.get_project(project_id)
+
+    assert pauses == [3.0]
@@ -0,0 +1,71 @@
+import pytest
+import os
+import sys
+import logging
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from smartpm.endpoints.uploads import Uploads
+from smartpm.exceptions import SnapshotExistsError, SmartPMError
+from smartpm.snapshots import SnapshotStore
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DATA_DATES = ['2024-01-01T00:00:00', '2024-02-01T00:00:00', '2024-03-01T00:00:00']
+
+class FakeClient:
+    """Serves canned responses for the endpoints used by the backfill."""
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.requests = []
+
+    def _get(self, endpoint, params=None):
+        params = params or {}
+        self.requests.append((endpoint, params.get('dataDate')))
+        if endpoint.endswith('/schedules'):
+            return [{'dataDate': data_date} for data_date in DATA_DATES]
+        if params.get('dataDate') == self.fail_on:
+            raise SmartPMError('API request failed with status 500')
+        if endpoint.endswith('/activities'):
+            return [{'activityId': 'A100', 'dataDate': params['dataDate']}]
+        return {'dataDate': params['dataDate']}
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(str(tmp_path))
+
+def test_backfill_snapshots(store):
+    """Test that every upload is stored as a snapshot."""
+    uploads = Uploads(FakeClient())
+    fetched = uploads.backfill_snapshots(1, 2, store)
+    logger.info("Fetched: %s", fetched)
+
+    assert fetched == ['2024-01-01', '2024-02-01', '2024-03-01']
+    assert store.list_data_dates(1, 2) == fetched
+
+    snapshot = store.read_snapshot(1, 2, '2024-02-01')
+    assert snapshot['details'] == {'dataDate': '2024-02-01'}
+    assert snapshot['activities'][0]['activityId'] == 'A100'
+
+def test_backfill_snapshots_resumes(store):
+    """Test that a failed backfill keeps finished snapshots and a rerun only fetches the rest."""
+    with pytest.raises(SmartPMError):
+        Uploads(FakeClient(fail_on='2024-02-01')).backfill_snapshots(1, 2, store, max_workers=1)
+
+    assert store.list_data_dates(1, 2) == ['2024-01-01', '2024-03-01']
+
+    client = FakeClient()
+    fetched = Uploads(client).backfill_snapshots(1, 2, store)
+
+    assert fetched == ['2024-02-01']
+    assert {data_date for _, data_date in client.requests if data_date} == {'2024-02-01'}
+
+def test_snapshot_is_immutable(store):
+    """Test that a stored snapshot cannot be overwritten."""
+    store.write_snapshot(1, 2, '2024-01-01', {}, [])
+
+    with pytest.raises(SnapshotExistsError):
+        store.write_snapshot(1, 2, '2024-01-01T00:00:00', {}, [])
@@ -0,0 +1,139 @@
+import pytest
+import os
+import sys
+import gc
+import logging
+import requests
+import weakref
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from smartpm.client import SmartPMClient
+from smartpm.endpoints.activity import Activity
+from smartpm.endpoints.changes import Changes
+from smartpm.endpoints.delay import Delay
+from smartpm.endpoints.models import Models
+from smartpm.endpoints.projects import Projects
+from smartpm.endpoints.scenarios import Scenarios
+from smartpm.endpoints.schedule import Schedule
+from smartpm.endpoints.uploads import Uploads
+from smartpm.exceptions import AuthenticationError, BadRequestError, NotFoundError, RateLimitExceededError
+from smartpm.metrics import ListSink
+from smartpm.testing.faults import FaultProfile
+from smartpm.testing.stub_server import StubServer
+from smartpm.testing.synthetic import SyntheticPortfolio
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest.fixture(scope='module')
+def server():
+    with StubServer(SyntheticPortfolio(projects=8, scenarios=3, activities=200, uploads=6, seed=1)) as server:
+        yield server
+
+@pytest.fixture
+def client(server):
+    return SmartPMClient('stub-key', 'stub-company', base_url=server.base_url)
+
+def test_synthetic_portfolio_is_deterministic():
+    """Test that the same seed generates the same responses and sizes scale with the parameters."""
+    first = SyntheticPortfolio(projects=3, activities=50, seed=7)
+    second = SyntheticPortfolio(projects=3, activities=50, seed=7)
+    project_id = first.project_ids()[0]
+    scenario_id = first.scenario_ids(project_id)[0]
+
+    assert first.projects() == second.projects()
+    assert first.activities(project_id, scenario_id) == second.activities(project_id, scenario_id)
+    assert len(first.activities(project_id, scenario_id)) == 50
+    assert first.projects() != SyntheticPortfolio(projects=3, activities=50, seed=8).projects()
+
+def test_synthetic_portfolio_is_freed():
+    """Test that the cached activity plans do not keep a portfolio alive once it is dropped."""
+    portfolio = SyntheticPortfolio(projects=1, activities=50, seed=7)
+    project_id = portfolio.project_ids()[0]
+    portfolio.activities(project_id, project_id * 100)
+    reference = weakref.ref(portfolio)
+    del portfolio
+    gc.collect()
+    assert reference() is None
+
+def test_endpoints_against_stub(client):
+    """Test the endpoint classes end to end against the local stub."""
+    projects = Projects(client).get_projects()
+    assert len(projects) == 8
+    assert 0 < len(Projects(client).get_active_projects()) < 8
+
+    project = Projects(client).get_project(projects[0]['id'])
+    project_id, scenario_id = project['id'], project['defaultScenarioId']
+    assert Projects(client).find_project_by_name(project['name'])['id'] == project_id
+    assert len(Projects(client).get_project_comments(project_id)) == 6
+    assert Models(client).find_baseline_model(project_id)['isOriginalModel']
+
+    assert len(Scenarios(client).get_scenarios(project_id)) == 3
+    assert Scenarios(client).find_scenario_by_name(project_id, 'Full Schedule')[0]['id'] == scenario_id
+    details = Scenarios(client).get_scenario_details(project_id, scenario_id)
+    assert 'percentCompleteTypes' in Scenarios(client).get_percent_complete_curve(project_id, scenario_id)
+    assert len(Scenarios(client).get_earned_schedule_curve(project_id, scenario_id)['data']) == 6
+
+    uploads = Uploads(client).get_schedule_uploads(project_id, scenario_id)
+    first_date, last_date = uploads[0]['dataDate'], uploads[-1]['dataDate']
+    assert last_date[:10] == details['dataDate']
+
+    early = Activity(client).get_activities(project_id, scenario_id, data_date=first_date[:10])
+    late = Activity(client).get_activities(project_id, scenario_id)
+    assert len(early) == len(late) == 200
+    assert sum(activity['actualStartDate'] is not None for activity in early) < sum(activity['actualStartDate'] is not None for activity in late)
+    counts = Activity(client).count_activities_by_completion(project_id, scenario_id)
+    assert counts['complete'] + counts['incomplete'] == 200
+
+    delay = Delay(client).get_delay_table(project_id, scenario_id)
+    assert {'period', 'scheduleName', 'dataDate', 'endDate', 'endDateVariance', 'criticalPathDelay'} <= set(delay[0])
+    assert 'metrics' in Changes(client).get_changes_summary(project_id, scenario_id)[0]
+
+    quality = Schedule(client).get_schedule_quality(project_id, scenario_id)
+    assert {'mark', 'indicator'} <= set(Schedule(client).get_schedule_grade(quality))
+    assert Schedule(client).get_metric_by_name(quality, 'RELATIONSHIPS_FINISH_TO_FINISH') is not None
+    assert 'scheduleCompressionIndex' in Schedule(client).get_schedule_compression(project_id, scenario_id)
+    assert len(Schedule(client).get_all_quality_profiles()) == 2
+
+def test_stub_errors(client, server):
+    """Test that unknown resources and missing API keys get the real API's errors."""
+    with pytest.raises(NotFoundError):
+        Projects(client).get_project(1)
+    with pytest.raises(NotFoundError):
+        Activity(client).get_activities(Projects(client).get_projects()[0]['id'], 1)
+    with pytest.raises(AuthenticationError):
+        Projects(SmartPMClient('', 'stub-company', base_url=server.base_url)).get_projects()
+
+def test_injected_faults_are_retried():
+    """Test that 429 bursts with Retry-After and truncated bodies are retried, and that injected errors surface without retries."""
+    portfolio = SyntheticPortfolio(projects=2, activities=100, seed=1)
+    project_id = portfolio.project_ids()[0]
+
+    throttled = FaultProfile('throttled', rate_limit_every=1, rate_limit_burst=2, retry_after=0)
+    with StubServer(portfolio, faults=throttled) as server:
+        sink = ListSink()
+        client = SmartPMClient('stub-key', 'stub-company', base_url=server.base_url, max_retries=2, backoff_factor=0)
+        client.add_event_sink(sink)
+        no_retries = Projects(SmartPMClient('stub-key', 'stub-company', base_url=server.base_url))
+
+        assert no_retries.get_project(project_id)['id'] == project_id
+        with pytest.raises(RateLimitExceededError):
+            no_retries.get_project(project_id)
+        assert Projects(client).get_project(project_id)['id'] == project_id
+        assert sink.events[-1].retries == 1
+
+    with StubServer(portfolio, faults=FaultProfile('truncated', truncate_rate=1.0)) as server:
+        sink = ListSink()
+        client = SmartPMClient('stub-key', 'stub-company', base_url=server.base_url, max_retries=1, backoff_factor=0)
+        client.add_event_sink(sink)
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            Activity(client).get_activities(project_id, project_id * 100)
+        assert sink.events[0].retries == 1
+
+    with StubServer(portfolio, faults=FaultProfile('failing', error_rate=1.0, error_statuses=(503,))) as server:
+        client = SmartPMClient('stub-key', 'stub-company', base_url=server.base_url)
+        with pytest.raises(BadRequestError):
+            Projects(client).get_projects()
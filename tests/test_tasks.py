@@ -0,0 +1,84 @@
+import pytest
+import os
+import sys
+import logging
+import contextvars
+import threading
+import time
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from smartpm.client import SmartPMClient
+from smartpm.endpoints.activity import Activity
+from smartpm.profiling import CallProfiler
+from smartpm.tasks import TaskGraph
+from smartpm.testing.stub_server import StubServer
+from smartpm.testing.synthetic import SyntheticPortfolio
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def sleep_and_return(value, seconds=0.1):
+    time.sleep(seconds)
+    return value
+
+def test_independent_tasks_run_concurrently():
+    """Test that independent tasks overlap, dependents get their results and sequential mode keeps the order."""
+    graph = TaskGraph()
+    graph.add('a', sleep_and_return, 1)
+    graph.add('b', sleep_and_return, 2)
+    graph.add('total', lambda a, b: a + b, after=['a', 'b'])
+    start = time.perf_counter()
+    assert graph.run() == {'a': 1, 'b': 2, 'total': 3}
+    assert time.perf_counter() - start < 0.18
+
+    order = []
+    graph = TaskGraph(sequential=True)
+    for name in ('a', 'b', 'c'):
+        graph.add(name, lambda name=name: order.append((name, threading.current_thread() is threading.main_thread())))
+    graph.run()
+    assert order == [('a', True), ('b', True), ('c', True)]
+
+def test_failure_and_nesting():
+    """Test that a failed task raises and skips its dependents, and that nested graphs cannot starve the pool."""
+    ran = []
+    graph = TaskGraph()
+    graph.add('fails', lambda: 1 / 0)
+    graph.add('dependent', lambda fails: ran.append(fails), after=['fails'])
+    with pytest.raises(ZeroDivisionError):
+        graph.run()
+    assert ran == []
+
+    def inner(i):
+        graph = TaskGraph()
+        for j in range(3):
+            graph.add(str(j), sleep_and_return, j, 0.01)
+        return sum(graph.run().values())
+
+    graph = TaskGraph()
+    for i in range(30):
+        graph.add(str(i), inner, i)
+    assert sum(graph.run().values()) == 90
+
+    variable = contextvars.ContextVar('variable')
+    variable.set('caller')
+    graph = TaskGraph()
+    graph.add('value', variable.get)
+    assert graph.run()['value'] == 'caller'
+
+def test_utility_fetches_concurrently():
+    """Test that a composite utility's requests are still attributed to it when fetched on the pool."""
+    import matplotlib.pyplot as plt
+
+    portfolio = SyntheticPortfolio(projects=1, activities=50, seed=3)
+    project_id = portfolio.project_ids()[0]
+    with StubServer(portfolio) as server:
+        client = SmartPMClient('stub-key', 'stub-company', base_url=server.base_url)
+        with CallProfiler(client) as profiler:
+            plt.close(Activity(client).plot_activity_gantt(project_id, project_id * 100))
+
+    (root,) = profiler.roots
+    assert sorted(child.name for child in root.children) == ['Activity.get_activities', 'Scenarios.get_scenario_details']
+    assert len(root.all_requests()) == 2
@@ -0,0 +1,82 @@
+import pytest
+import os
+import sys
+import logging
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from smartpm.snapshots import SnapshotStore
+from smartpm.timeline import ActivityTimeline
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def make_activity(activity_id, finish_date, percent_complete):
+    return {
+        'activityId': activity_id,
+        'name': f'Activity {activity_id}',
+        'startDate': '2024-01-01T00:00:00',
+        'finishDate': finish_date,
+        'plannedDuration': 10,
+        'percentComplete': percent_complete,
+        'actualStartDate': None,
+        'actualFinishDate': None
+    }
+
+@pytest.fixture
+def store(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.write_snapshot(1, 2, '2024-01-01', {}, [
+        make_activity('A100', '2024-03-10T00:00:00', 0.0),
+        make_activity('A200', '2024-04-10T00:00:00', 0.0),
+    ])
+    store.write_snapshot(1, 2, '2024-02-01', {}, [
+        make_activity('A100', '2024-03-20T00:00:00', 40.0),
+        make_activity('A200', '2024-04-10T00:00:00', 0.0),
+        make_activity('A300', '2024-03-05T00:00:00', 0.0),
+    ])
+    store.write_snapshot(1, 2, '2024-03-01', {}, [
+        make_activity('A100', '2024-04-02T00:00:00', 80.0),
+        make_activity('A300', '2024-03-05T00:00:00', 10.0),
+    ])
+    return store
+
+def test_as_of(store):
+    """Test point-in-time lookups of an activity."""
+    timeline = ActivityTimeline(store, 1, 2)
+
+    assert timeline.as_of('A100', '2023-12-31') is None
+    assert timeline.as_of('A100', '2024-01-15')['percentComplete'] == 0.0
+    assert timeline.as_of('A100', '2024-02-01')['percentComplete'] == 40.0
+    assert timeline.as_of('A200', '2024-02-15') is not None
+    assert timeline.as_of('A200', '2024-03-01') is None  # removed in the March update
+
+def test_unchanged_activity_shares_version(store):
+    """Test that an activity that did not change between updates is stored once."""
+    timeline = ActivityTimeline(store, 1, 2)
+
+    assert len(timeline.evolution('A200')) == 1
+    assert len(timeline.evolution('A100')) == 3
+    assert len(timeline.activities_as_of('2024-02-15')) == 3
+
+def test_forecast_between(store):
+    """Test which activities were forecast to finish in March as of each update."""
+    timeline = ActivityTimeline(store, 1, 2)
+    forecast = timeline.forecast_between('2024-03-01', '2024-03-31')
+    logger.info("Forecast: %s", forecast)
+
+    by_date = forecast.groupby('dataDate')['activityId'].apply(sorted).to_dict()
+    assert [by_date[date] for date in sorted(by_date)] == [['A100'], ['A100', 'A300'], ['A300']]
+
+def test_refresh_reads_only_new_snapshots(store):
+    """Test that a saved index is reused and extended with new snapshots."""
+    ActivityTimeline(store, 1, 2)
+    store.write_snapshot(1, 2, '2024-04-01', {}, [make_activity('A100', '2024-04-02T00:00:00', 100.0)])
+
+    timeline = ActivityTimeline(store, 1, 2)
+
+    assert timeline.data_dates[-1] == '2024-04-01'
+    assert timeline.as_of('A100', '2024-04-15')['percentComplete'] == 100.0
+    assert timeline.refresh() == []
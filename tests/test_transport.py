@@ -0,0 +1,87 @@
+import pytest
+import os
+import sys
+import logging
+import time
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from smartpm.client import SmartPMClient
+from smartpm.endpoints.activity import Activity
+from smartpm.endpoints.projects import Projects
+from smartpm.exceptions import NotFoundError, RecordingNotFoundError
+from smartpm.metrics import ListSink
+from smartpm.testing.faults import FaultProfile
+from smartpm.testing.stub_server import StubServer
+from smartpm.testing.synthetic import SyntheticPortfolio
+from smartpm.transport import BODIES_DIR, INDEX_FILE, RecordingTransport, ReplayTransport, RequestsTransport
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest.fixture
+def recording(tmp_path):
+    """Record a short session against the stub server and return the recording directory."""
+    directory = str(tmp_path / 'recording')
+    with StubServer(SyntheticPortfolio(projects=3, activities=300, seed=5)) as server:
+        client = SmartPMClient('stub-key', 'stub-company', base_url=server.base_url)
+        client.transport = RecordingTransport(directory, RequestsTransport(client.session))
+        projects = Projects(client).get_projects()
+        Projects(client).get_projects()
+        project_id = projects[0]['id']
+        Activity(client).count_activities_by_completion(project_id, project_id * 100)
+        with pytest.raises(NotFoundError):
+            Projects(client).get_project(999)
+    return directory, projects
+
+def test_record_deduplicates_bodies(recording):
+    """Test that every response is indexed and identical bodies are stored once."""
+    directory, _ = recording
+    with open(os.path.join(directory, INDEX_FILE)) as f:
+        lines = f.read().splitlines()
+
+    assert len(lines) == 4
+    assert 'stub-key' not in ''.join(lines)
+    assert len(os.listdir(os.path.join(directory, BODIES_DIR))) == 3
+
+def test_replay_without_network(recording):
+    """Test that a replay answers the recorded requests, including errors, from any base URL."""
+    directory, projects = recording
+    client = SmartPMClient('other-key', 'stub-company', base_url='http://127.0.0.1:9/public', transport=ReplayTransport(directory))
+
+    assert Projects(client).get_projects() == projects
+    project_id = projects[0]['id']
+    counts = Activity(client).count_activities_by_completion(project_id, project_id * 100)
+    assert counts['complete'] + counts['incomplete'] == 300
+    with pytest.raises(NotFoundError):
+        Projects(client).get_project(999)
+    with pytest.raises(RecordingNotFoundError):
+        Projects(client).get_project(998)
+
+def test_replay_latency(recording, monkeypatch):
+    """Test that a fixed replay latency is applied and that the environment selects the replay transport."""
+    directory, _ = recording
+    monkeypatch.setenv('SMARTPM_REPLAY_DIR', directory)
+    monkeypatch.setenv('SMARTPM_REPLAY_LATENCY', '0.05')
+    client = SmartPMClient('stub-key', 'stub-company', base_url='http://127.0.0.1:9/public')
+    assert isinstance(client.transport, ReplayTransport)
+
+    start = time.perf_counter()
+    Projects(client).get_projects()
+    assert time.perf_counter() - start >= 0.05
+
+def test_recording_keeps_download_timing(tmp_path):
+    """Test that recording does not read the body early, so its download time is not counted as time to first byte."""
+    sink = ListSink()
+    with StubServer(SyntheticPortfolio(projects=1, activities=300, seed=5), faults=FaultProfile(bandwidth=1024 * 1024)) as server:
+        client = SmartPMClient('stub-key', 'stub-company', base_url=server.base_url)
+        client.transport = RecordingTransport(str(tmp_path), RequestsTransport(client.session))
+        client.add_event_sink(sink)
+        project_id = Projects(client).get_projects()[0]['id']
+        Activity(client).get_activities(project_id, project_id * 100)
+
+    event = sink.events[-1]
+    assert event.response_bytes > 50000
+    assert event.download > event.ttfb
@@ -0,0 +1,247 @@
+import pytest
+import os
+import sys
+import logging
+import datetime
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+import numpy as np
+
+from smartpm.downsampling import downsample_series, lttb_indices, minmax_indices
+from smartpm.preprocessing import delay_series, earned_schedule_series, change_series
+from smartpm.rendering import render_batch
+from smartpm import visuals
+from smartpm import render_cache
+from smartpm.render_cache import RenderCache
+from smartpm.visuals import plot_percent_complete_curve, plot_schedule_delay, plot_activity_distribution_by_month, plot_gantt, release_figure, render_to_bytes
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHANGE_METRICS = [
+    "CriticalChanges", "NearCriticalChanges", "ActivityChanges", "LogicChanges",
+    "CalendarChanges", "DurationChanges", "DelayedActivityChanges"
+]
+
+def month_starts(count, start=datetime.date(2024, 1, 1)):
+    return [datetime.date(start.year + (start.month - 1 + i) // 12, (start.month - 1 + i) % 12 + 1, 1) for i in range(count)]
+
+@pytest.fixture
+def percent_complete_curve():
+    dates = month_starts(12)
+    return {
+        'percentCompleteTypes': {'ACTUAL': 'Actual (Cumulative)', 'PLANNED': 'Planned (Early)', 'LATE_DATE_PLANNED': 'Planned (Late)'},
+        'data': [{'DATE': date.isoformat(), 'ACTUAL': i * 7.0, 'PLANNED': i * 8.0, 'LATE_DATE_PLANNED': i * 6.0} for i, date in enumerate(dates)]
+    }
+
+@pytest.fixture
+def earned_schedule_curve():
+    dates = month_starts(12)
+    return {'data': [{'date': date.isoformat(), 'earnedDays': i * 25, 'plannedDays': i * 30, 'predictiveDays': None} for i, date in enumerate(dates)]}
+
+@pytest.fixture
+def delay_table():
+    dates = month_starts(12)
+    return [{
+        'dataDate': f'{date.isoformat()}T00:00:00',
+        'endDateVariance': {'cumulative': i * 2},
+        'criticalPathDelay': {'cumulative': i * 3},
+        'delayRecovery': {'cumulative': i}
+    } for i, date in enumerate(dates)]
+
+@pytest.fixture
+def changes_summary():
+    dates = month_starts(12)
+    return [{'dataDate': f'{date.isoformat()}T00:00:00', 'metrics': {metric: i + j for j, metric in enumerate(CHANGE_METRICS)}} for i, date in enumerate(dates)]
+
+@pytest.fixture
+def activities():
+    return [{
+        'activityId': f'A{i}',
+        'baseline': {'startDate': f'2024-{i % 12 + 1:02d}-01T00:00:00', 'finishDate': f'2024-{i % 12 + 1:02d}-20T00:00:00'},
+        'startDate': f'2024-{i % 12 + 1:02d}-03T00:00:00',
+        'finishDate': f'2024-{i % 12 + 1:02d}-25T00:00:00',
+        'actualStartDate': f'2024-{i % 12 + 1:02d}-03T00:00:00' if i % 12 < 5 else None,
+        'actualFinishDate': f'2024-{i % 12 + 1:02d}-25T00:00:00' if i % 12 < 4 else None
+    } for i in range(60)]
+
+@pytest.fixture
+def scenario_details():
+    return {'dataDate': '2024-06-01'}
+
+def test_render_batch(tmp_path, percent_complete_curve, earned_schedule_curve, delay_table, changes_summary, activities, scenario_details):
+    """Test rendering every plot headless in a process pool."""
+    jobs = [
+        ('percent_complete', 'percent_complete_curve', (percent_complete_curve,)),
+        ('earned_schedule', 'earned_schedule_curve', (earned_schedule_curve,)),
+        ('delay', 'schedule_delay', (delay_table,)),
+        ('changes', 'schedule_changes', (changes_summary,)),
+        ('distribution', 'activity_distribution', (activities, scenario_details)),
+        ('gantt', 'gantt', (activities, scenario_details)),
+    ]
+    results = render_batch(jobs, str(tmp_path), formats=('png', 'svg'), max_workers=2)
+    logger.info("Timings: %s", {result['name']: result['seconds'] for result in results})
+
+    assert [result['name'] for result in results] == [name for name, _, _ in jobs]
+    for result in results:
+        assert result['error'] is None
+        assert result['seconds'] > 0
+        assert all(os.path.getsize(path) > 0 for path in result['files'])
+        assert len(result['files']) == 2
+
+def test_render_batch_reports_errors(tmp_path):
+    """Test that a failing figure is reported without stopping the batch."""
+    results = render_batch([('broken', 'schedule_delay', ([{}],))], str(tmp_path), max_workers=1)
+
+    assert results[0]['error'] is not None
+    assert results[0]['files'] == []
+
+def test_plot_returns_standalone_figure(delay_table):
+    """Test that headless plots are not registered with pyplot."""
+    fig = plot_schedule_delay(delay_table, show=False)
+
+    assert isinstance(fig, Figure)
+    assert plt.get_fignums() == []
+    release_figure(fig)
+    assert fig.axes == []
+
+def test_plot_on_existing_axes(activities, scenario_details):
+    """Test drawing onto axes supplied by the caller."""
+    fig = Figure(figsize=(14, 8))
+    ax = fig.add_subplot()
+    counts = plot_activity_distribution_by_month(activities, scenario_details, ax=ax, show=False)
+
+    assert len(ax.patches) > 0
+    assert counts.values.sum() > 0
+    release_figure(fig)
+
+def test_render_batch_threads(tmp_path, delay_table, changes_summary):
+    """Test rendering in a thread pool."""
+    jobs = [(f'delay-{i}', 'schedule_delay', (delay_table,)) for i in range(4)]
+    jobs += [(f'changes-{i}', 'schedule_changes', (changes_summary,)) for i in range(4)]
+    results = render_batch(jobs, str(tmp_path), max_workers=4, use_threads=True)
+
+    assert all(result['error'] is None for result in results)
+    assert plt.get_fignums() == []
+
+def test_render_cache_hit_skips_matplotlib(tmp_path, monkeypatch, delay_table):
+    """Test that a cached render returns the stored bytes without drawing."""
+    cache = RenderCache(str(tmp_path))
+    image = render_to_bytes(plot_schedule_delay, delay_table, cache=cache)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("matplotlib should not be used on a cache hit")
+    monkeypatch.setattr(visuals, 'Figure', fail)
+
+    assert render_to_bytes(plot_schedule_delay, delay_table, cache=cache) == image
+    assert image.startswith(b'\x89PNG')
+
+    # The current date line moves every day, so images rendered on an earlier day are not reused
+    monkeypatch.setattr(render_cache, '_today', lambda: datetime.date(2000, 1, 1))
+    with pytest.raises(AssertionError):
+        render_to_bytes(plot_schedule_delay, delay_table, cache=cache)
+    monkeypatch.undo()
+    monkeypatch.setattr(visuals, 'Figure', fail)
+
+    delay_table[0]['endDateVariance']['cumulative'] += 1
+    with pytest.raises(AssertionError):
+        render_to_bytes(plot_schedule_delay, delay_table, cache=cache)
+
+def test_render_cache_eviction(tmp_path):
+    """Test that the least recently used entries are evicted past the size limit."""
+    cache = RenderCache(str(tmp_path), max_bytes=250)
+    cache.put('first', b'x' * 100)
+    os.utime(tmp_path / 'first', (1, 1))
+    cache.put('second', b'x' * 100)
+    cache.put('third', b'x' * 100)
+
+    assert cache.get('first') is None
+    assert cache.get('second') is not None
+    assert cache.get('third') is not None
+
+def test_render_batch_uses_cache(tmp_path, delay_table):
+    """Test that a second batch is served from the cache."""
+    cache = RenderCache(str(tmp_path / 'cache'))
+    jobs = [('delay', 'schedule_delay', (delay_table,))]
+    first = render_batch(jobs, str(tmp_path / 'out'), cache=cache, use_threads=True)
+    second = render_batch(jobs, str(tmp_path / 'out'), cache=cache, use_threads=True)
+
+    assert first[0]['cached'] is False
+    assert second[0]['cached'] is True
+
+def test_preprocessing_arrays(delay_table, earned_schedule_curve, changes_summary):
+    """Test that responses are converted into datetime64 and float arrays."""
+    dates, variance = delay_series(delay_table)
+    assert dates.dtype == np.dtype('datetime64[s]')
+    assert dates[1] == np.datetime64('2024-02-01T00:00:00')
+    assert variance['acceleration'][3] == -3.0
+
+    _, days = earned_schedule_series(earned_schedule_curve)
+    assert np.isnan(days['predictiveDays']).all()
+
+    _, metrics = change_series(changes_summary)
+    assert list(metrics) == CHANGE_METRICS
+    assert metrics['LogicChanges'].dtype == np.float64
+
+def test_downsampling_keeps_shape():
+    """Test that LTTB and min-max keep the end points and the extremes of a long series."""
+    dates = np.arange(np.datetime64('2000-01-01'), np.datetime64('2000-01-01') + 20000).astype('datetime64[s]')
+    values = np.sin(np.linspace(0, 20, len(dates)))
+    values[5000] = 10.0
+
+    for indices in (lttb_indices(dates, values, 500), minmax_indices(dates, values, 125)):
+        assert len(indices) <= 500
+        assert indices[0] == 0 and indices[-1] == len(dates) - 1
+        assert 5000 in indices
+        assert np.all(np.diff(indices) > 0)
+
+    with pytest.raises(ValueError):
+        downsample_series(dates, {'values': values}, 500, method='mean')
+
+def test_downsample_series_shares_dates():
+    """Test that downsampled series keep the same dates and short series are left alone."""
+    dates = np.arange(10000).astype('datetime64[D]')
+    series = {'up': np.linspace(0, 1, 10000), 'noise': np.random.default_rng(0).normal(size=10000)}
+    sampled_dates, sampled = downsample_series(dates, series, 200)
+
+    assert len(sampled_dates) <= 200
+    assert all(len(values) == len(sampled_dates) for values in sampled.values())
+
+    # A series without values keeps its first and last point instead of vanishing
+    empty_dates, empty = downsample_series(dates, {'empty': np.full(10000, np.nan)}, 50)
+    assert list(empty_dates) == [dates[0], dates[-1]] and empty['empty'].shape == (2,)
+    short_dates, short = downsample_series(dates[:100], {'up': series['up'][:100]}, 200)
+    assert len(short_dates) == 100 and len(short['up']) == 100
+
+def test_plot_with_max_points():
+    """Test plotting a long curve at the figure's pixel width."""
+    start = datetime.date(2000, 1, 1)
+    curve = {
+        'percentCompleteTypes': {'ACTUAL': 'Actual (Cumulative)', 'PLANNED': 'Planned (Early)'},
+        'data': [{'DATE': (start + datetime.timedelta(days=i)).isoformat(), 'ACTUAL': i / 50, 'PLANNED': i / 40} for i in range(5000)]
+    }
+    fig = plot_percent_complete_curve(curve, show=False, max_points='auto')
+
+    assert all(len(line.get_xdata()) <= fig.get_figwidth() * fig.dpi * 2 for line in fig.axes[0].get_lines())
+    release_figure(fig)
+
+def test_gantt_one_collection_per_series(activities, scenario_details):
+    """Test that the Gantt chart draws each bar series as a single artist, grouped by WBS."""
+    for i, activity in enumerate(activities):
+        activity['wbs'] = f'WBS.{i % 3}'
+    fig = plot_gantt(activities, scenario_details, group_by='wbs', show=False, max_labels=10)
+    ax = fig.axes[0]
+    bars = {collection.get_label(): collection for collection in ax.collections if collection.get_label() in ('Baseline', 'Current', 'Actual')}
+
+    assert len(bars['Baseline'].get_paths()) == 60
+    assert len(bars['Current'].get_paths()) == 60
+    # Started activities have an actual bar, in-progress ones up to the data date
+    assert len(bars['Actual'].get_paths()) == sum(1 for activity in activities if activity['actualStartDate'])
+    assert [label.get_text() for label in ax.get_yticklabels()] == ['WBS.0', 'WBS.1', 'WBS.2']
+    release_figure(fig)
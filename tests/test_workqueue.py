@@ -0,0 +1,92 @@
+import pytest
+import os
+import sys
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the package root directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from smartpm.crawl import ResultStore, run_crawl_worker, seed_work_queue
+from smartpm.exceptions import SmartPMError
+from smartpm.workqueue import WorkQueue
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class FakeClient:
+    """Serves two projects with two scenarios each and counts requests per endpoint."""
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def _get(self, endpoint, params=None):
+        with self._lock:
+            self.requests.append(endpoint)
+            if self.failures and endpoint.endswith('/delay'):
+                self.failures -= 1
+                raise SmartPMError('API request failed with status 503')
+        if endpoint == 'v1/projects':
+            return [{'id': 1}, {'id': 2}]
+        if endpoint.endswith('/scenarios'):
+            project_id = int(endpoint.split('/')[2])
+            return [{'id': project_id * 10 + 1}, {'id': project_id * 10 + 2}]
+        return {'endpoint': endpoint}
+
+@pytest.fixture
+def queue(tmp_path):
+    return WorkQueue(str(tmp_path / 'queue.db'), lease_seconds=60, max_attempts=2)
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(str(tmp_path / 'results'))
+
+def test_seed_is_idempotent(queue, store):
+    """Test that seeding twice does not duplicate tasks."""
+    client = FakeClient()
+
+    assert seed_work_queue(client, queue, store, endpoints=['activities', 'delay_table']) == 8
+    assert seed_work_queue(client, queue, store, endpoints=['activities', 'delay_table']) == 0
+    assert queue.counts()['pending'] == 8
+
+def test_expired_lease_is_reassigned(queue):
+    """Test that only the current lease holder can complete a task."""
+    queue.enqueue([(1, 11, 'activities')])
+    queue.lease_seconds = -1  # leases expire immediately
+    first = queue.lease('worker-a')
+    second = queue.lease('worker-b')
+
+    assert first['id'] == second['id']
+    assert queue.complete(first['id'], 'worker-a') is False
+    assert queue.complete(second['id'], 'worker-b') is True
+    assert queue.counts()['done'] == 1
+
+def test_failed_task_is_retried(queue, store):
+    """Test that failures are retried until max_attempts."""
+    queue.enqueue([(1, 11, 'delay_table'), (1, 12, 'delay_table')])
+    client = FakeClient(failures=3)
+
+    stats = run_crawl_worker(client, queue, store, worker_id='worker-a')
+    logger.info("Stats: %s", stats)
+
+    counts = queue.counts()
+    assert counts['done'] + counts['failed'] == 2
+    assert counts['failed'] == 1
+    assert len(queue.failed_tasks()) == 1
+
+def test_workers_complete_each_task_once(queue, store):
+    """Test that concurrent workers drain the queue without fetching a task twice."""
+    client = FakeClient()
+    seed_work_queue(client, queue, store, endpoints=['activities', 'delay_table', 'schedule_quality'])
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda i: run_crawl_worker(client, queue, store, worker_id=f'worker-{i}'), range(4)))
+
+    scenario_requests = [endpoint for endpoint in client.requests if endpoint.count('/') > 3]
+    assert sum(result['completed'] for result in results) == 12
+    assert len(scenario_requests) == len(set(scenario_requests)) == 12
+    assert queue.counts()['done'] == 12
+    assert store.read_result(2, 21, 'schedule_quality') == {'endpoint': 'v1/projects/2/scenarios/21/schedule-quality'}